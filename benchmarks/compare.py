@@ -0,0 +1,53 @@
+"""Сравнение двух JSON-файлов с результатами benchmarks.run.
+
+    python -m benchmarks.compare baseline.json current.json
+"""
+
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+
+Key = Tuple[str, int, str]
+
+
+def load(path: str) -> Dict[Key, dict]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {(r["generator"], r["size"], r["operation"]): r for r in data["results"]}
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="compare benchmark results")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    print(
+        f"{'generator':<10} {'size':>8} {'operation':<16} "
+        f"{'time':>8} {'peak mem':>9} {'retained':>9}"
+    )
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key], current[key]
+        # Файлы benchmarks.memory не содержат времени, benchmarks.run — retained.
+        speed = ratio(old.get("best_s"), new.get("best_s"))
+        memory = ratio(new["peak_bytes"], old["peak_bytes"])
+        retained = ratio(new.get("retained_bytes"), old.get("retained_bytes"))
+        generator, size, operation = key
+        print(
+            f"{generator:<10} {size:>8} {operation:<16} "
+            f"{speed:>8} {memory:>9} {retained:>9}"
+        )
+
+
+def ratio(numerator: float | None, denominator: float | None) -> str:
+    if numerator is None or denominator is None:
+        return "-"
+    if not denominator:
+        return "inf" if numerator else "1.00x"
+    return f"{numerator / denominator:.2f}x"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Генераторы синтетических документов для бенчмарков.
+
+Каждый генератор принимает размер (число записей) и возвращает `Sample`:
+текст документа, текст схемы для validate и набор SPath-запросов.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+
+@dataclass
+class Sample:
+    name: str
+    size: int
+    text: str
+    schema: str
+    paths: Dict[str, str] = field(default_factory=dict)
+
+
+def _element(name: str, body: str = "", attrs: str = "") -> str:
+    parts = [f'(:name "{name}")']
+    if body:
+        parts.append(body)
+    if attrs:
+        parts.append(f"(attrs {attrs})")
+    return f"(element {' '.join(parts)})"
+
+
+def _attr(name: str, value_type: str, required: bool = True) -> str:
+    return (
+        f'(attr (:name "{name}") (type "{value_type}") '
+        f'(required {"true" if required else "false"}))'
+    )
+
+
+def _schema(root: str) -> str:
+    return f"(schema {root})"
+
+
+def wide(size: int) -> Sample:
+    items = " ".join(f"(item (:id {i}) {i})" for i in range(size))
+    item = _element("item", '(type "number") (min_occurs 0)', _attr("id", "number"))
+    return Sample(
+        name="wide",
+        size=size,
+        text=f"(root {items})",
+        schema=_schema(_element("root", f"(children {item})")),
+        paths={
+            "absolute": "/root/item",
+            "recursive": "//item",
+            "filtered": f"//item[:id={size // 2}]",
+        },
+    )
+
+
+def deep(size: int, depth: int = 100) -> Sample:
+    chains = max(1, size // depth)
+    chain = "(level " * depth + "(leaf 1)" + ")" * depth
+    text = f"(root {' '.join([chain] * chains)})"
+
+    body = _element("leaf", '(type "number")')
+    for _ in range(depth):
+        body = _element("level", f"(children {body})")
+    root = _element("root", f"(children {body})")
+    return Sample(
+        name="deep",
+        size=size,
+        text=text,
+        schema=_schema(root),
+        paths={
+            "absolute": "/root/level/level/level",
+            "recursive": "//leaf",
+            "filtered": "//level[leaf=1]",
+        },
+    )
+
+
+def attrs_heavy(size: int, attrs: int = 10) -> Sample:
+    def record(i: int) -> str:
+        pairs = " ".join(f'(:a{k} "{i}-{k}")' for k in range(attrs))
+        return f"(record (:id {i}) {pairs})"
+
+    records = " ".join(record(i) for i in range(size))
+    declared = _attr("id", "number") + " " + " ".join(
+        _attr(f"a{k}", "string", required=False) for k in range(attrs)
+    )
+    element = _element("record", "(min_occurs 0)", declared)
+    return Sample(
+        name="attrs",
+        size=size,
+        text=f"(root {records})",
+        schema=_schema(_element("root", f"(children {element})")),
+        paths={
+            "absolute": "/root/record",
+            "recursive": "//record",
+            "filtered": f'//record[:a3="{size // 2}-3"]',
+        },
+    )
+
+
+def strings_heavy(size: int, length: int = 200) -> Sample:
+    rnd = random.Random(size)
+    alphabet = "abcdefghijklmnopqrstuvwxyz ()"
+    texts = [
+        "".join(rnd.choice(alphabet) for _ in range(length)) for _ in range(size)
+    ]
+    body = " ".join(f'(text "{t}")' for t in texts)
+    text = _element("text", '(type "string") (min_occurs 0)')
+    return Sample(
+        name="strings",
+        size=size,
+        text=f"(root {body})",
+        schema=_schema(_element("root", f"(children {text})")),
+        paths={
+            "absolute": "/root/text",
+            "recursive": "//text",
+            "filtered": f'//root[text="{texts[0]}"]',
+        },
+    )
+
+
+def numeric_heavy(size: int) -> Sample:
+    rnd = random.Random(size)
+    readings = " ".join(
+        f"(reading (:sensor {i % 100}) (value {rnd.uniform(-100, 100):.4f}) "
+        f"(ts {1_700_000_000 + i}))"
+        for i in range(size)
+    )
+    reading = _element(
+        "reading",
+        "(min_occurs 0) (children "
+        + _element("value", '(type "number")')
+        + " "
+        + _element("ts", '(type "number")')
+        + ")",
+        _attr("sensor", "number"),
+    )
+    return Sample(
+        name="numeric",
+        size=size,
+        text=f"(root {readings})",
+        schema=_schema(_element("root", f"(children {reading})")),
+        paths={
+            "absolute": "/root/reading/value",
+            "recursive": "//ts",
+            "filtered": "//reading[:sensor=42]",
+        },
+    )
+
+
+GENERATORS: Dict[str, Callable[[int], Sample]] = {
+    "wide": wide,
+    "deep": deep,
+    "attrs": attrs_heavy,
+    "strings": strings_heavy,
+    "numeric": numeric_heavy,
+}
+
+
+def generate(names: List[str], sizes: List[int]) -> List[Sample]:
+    return [GENERATORS[name](size) for name in names for size in sizes]
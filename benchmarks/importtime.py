@@ -0,0 +1,93 @@
+"""Время импорта модулей библиотеки по `python -X importtime`.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.importtime --modules src.api.core src.api --repeat 5
+
+Каждый импорт выполняется в новом интерпретаторе, из отчёта importtime
+вычитаются модули, загруженные при старте самого интерпретатора (site).
+Для каждого модуля печатается лучшее суммарное время, число загруженных
+модулей и самые дорогие из них (собственное время, без вложенных импортов).
+Короткоживущие CLI-процессы платят это время при каждом запуске.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from .run import metadata
+
+DEFAULT_MODULES = [
+    "src.api.core",
+    "src.api",
+    "src.spath.engine",
+    "src.sexp_schema.validator",
+    "src.visualizer.cli",
+]
+
+
+def importtime(statement: str) -> List[Tuple[int, int, str]]:
+    """Строки отчёта importtime: (собственное время, суммарное время, имя с отступом)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), name[1:]))
+    return rows
+
+
+def measure(module: str, startup: set, repeat: int) -> Dict[str, object]:
+    best: List[Tuple[int, int, str]] | None = None
+    best_total = 0
+    for _ in range(repeat):
+        rows = [row for row in importtime(f"import {module}") if row[2].strip() not in startup]
+        # Вложенные импорты в отчёте идут с отступом; суммируем верхний уровень.
+        total = sum(cumulative for _, cumulative, name in rows if not name.startswith(" "))
+        if best is None or total < best_total:
+            best, best_total = rows, total
+    modules = [(self_us, name.strip()) for self_us, _, name in best or []]
+    return {
+        "module": module,
+        "total_us": best_total,
+        "modules": len(modules),
+        "top": sorted(modules, reverse=True),
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="import time benchmark")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest modules to show")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    startup = {name.strip() for _, _, name in importtime("pass")}
+    results = []
+    print(f"{'module':<28} {'total ms':>9} {'modules':>8}  slowest (self ms)")
+    for module in args.modules:
+        result = measure(module, startup, args.repeat)
+        result["top"] = result["top"][: args.top]
+        results.append(result)
+        slowest = ", ".join(f"{name} {us / 1000:.1f}" for us, name in result["top"])
+        print(
+            f"{module:<28} {result['total_us'] / 1000:>9.1f} "
+            f"{result['modules']:>8}  {slowest}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""loads(lazy=True) против обычного разбора значений.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.lazy --generator numeric --size 20000
+
+Токены строятся один раз, замеряется только сборка дерева Parser'ом:
+лексер одинаков в обоих режимах и занимает большую часть времени loads,
+поэтому в полном loads разница теряется в шуме. Для каждого режима
+печатаются время сборки дерева, время сборки с чтением всех значений и
+память, которую удерживает дерево после loads. Ленивый режим выигрывает, когда значения
+в основном не читаются; если прочитать все, он медленнее, а непрочитанное
+число хранится текстом и занимает больше места, чем int.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from src.shared.model import Node
+from src.shared.parser import Lexer, Parser
+
+from .generators import GENERATORS
+from .run import metadata
+
+
+def read_values(root: Node) -> None:
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for value in node.attrs.values():
+            value.value
+        if node.scalar is not None:
+            node.scalar.value
+        stack.extend(node.children)
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Лучшее время при выключенном сборщике мусора, как в timeit:
+    иначе паузы GC на больших деревьях заглушают разницу режимов."""
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def retained(func: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        current = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def measure(text: str, tokens: list, lazy: bool, repeat: int) -> Dict[str, object]:
+    def build() -> Node:
+        return Parser(tokens, lazy=lazy).parse()
+
+    def build_and_read() -> None:
+        read_values(build())
+
+    # Память — вместе с лексером: ленивый скаляр удерживает текст токена,
+    # который при готовых токенах уже выделен и в замер бы не попал.
+    return {
+        "lazy": lazy,
+        "build_s": best_time(build, repeat),
+        "build_read_s": best_time(build_and_read, repeat),
+        "retained_bytes": retained(
+            lambda: Parser(Lexer(text).tokenize(), lazy=lazy).parse()
+        ),
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="lazy scalar benchmark")
+    parser.add_argument("--generator", default="numeric", choices=list(GENERATORS))
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    text = GENERATORS[args.generator](args.size).text
+    tokens = Lexer(text).tokenize()
+
+    print(f"{'mode':>5} {'build':>9} {'build+read':>11} {'retained':>10}")
+    results = []
+    for lazy in (False, True):
+        result = measure(text, tokens, lazy, args.repeat)
+        results.append(result)
+        print(
+            f"{'lazy' if lazy else 'eager':>5} {result['build_s']:>8.3f}s "
+            f"{result['build_read_s']:>10.3f}s "
+            f"{result['retained_bytes'] / 2**20:>7.2f}MiB"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Память loads, dumps, path и validate на синтетических документах (tracemalloc).
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.memory --sizes 1000 10000 --output memory.json
+    python -m benchmarks.compare memory_baseline.json memory.json
+
+Для каждой операции замеряются:
+
+* peak — пик памяти во время вызова (входные данные уже созданы и не учитываются);
+* retained — сколько памяти удерживает результат после вызова (для loads — дерево);
+* байты на узел документа и на токен входа;
+* самые крупные места выделения удерживаемой памяти (top tracemalloc traces,
+  файл:строка), чтобы при регрессии было видно, откуда она.
+
+Время не замеряется — для него есть benchmarks.run. Формат JSON совместим
+с benchmarks.compare.
+"""
+
+import argparse
+import gc
+import json
+import linecache
+import os
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List
+
+from src.api.core import dumps, loads, path, validate
+from src.shared.parser import Lexer
+
+from .generators import GENERATORS, Sample, generate
+from .run import count_nodes, metadata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class MemoryResult:
+    generator: str
+    size: int
+    operation: str
+    nodes: int
+    tokens: int
+    peak_bytes: int
+    retained_bytes: int
+    peak_per_node: float
+    peak_per_token: float
+    retained_per_node: float
+    top: List[Dict[str, object]] = field(default_factory=list)
+
+
+def trace(func: Callable[[], object], top: int) -> tuple:
+    """(peak, retained, top) для одного вызова func."""
+    func()  # прогрев: ленивые импорты и кэши не должны попасть в замер
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+    traces = []
+    for stat in diff[:top]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        traces.append(
+            {
+                "where": f"{os.path.relpath(frame.filename, ROOT)}:{frame.lineno}",
+                "code": linecache.getline(frame.filename, frame.lineno).strip(),
+                "bytes": stat.size_diff,
+                "count": stat.count_diff,
+            }
+        )
+    return peak - start, max(current - start, 0), traces
+
+
+def operations(sample: Sample) -> Dict[str, Callable[[], object]]:
+    document = loads(sample.text)
+    schema = loads(sample.schema)
+    ops: Dict[str, Callable[[], object]] = {
+        "loads": lambda: loads(sample.text),
+        "dumps": lambda: dumps(document),
+        "validate": lambda: validate(document, schema),
+    }
+    for kind, spath in sample.paths.items():
+        ops[f"path_{kind}"] = lambda spath=spath: path(document, spath)
+    return ops
+
+
+def run_sample(sample: Sample, top: int, only: List[str] | None) -> List[MemoryResult]:
+    nodes = count_nodes(loads(sample.text))
+    tokens = len(Lexer(sample.text).tokenize())
+    results = []
+    for operation, func in operations(sample).items():
+        if only and operation not in only:
+            continue
+        peak, retained, traces = trace(func, top)
+        results.append(
+            MemoryResult(
+                generator=sample.name,
+                size=sample.size,
+                operation=operation,
+                nodes=nodes,
+                tokens=tokens,
+                peak_bytes=peak,
+                retained_bytes=retained,
+                peak_per_node=peak / nodes,
+                peak_per_token=peak / tokens,
+                retained_per_node=retained / nodes,
+                top=traces,
+            )
+        )
+    return results
+
+
+def print_table(results: List[MemoryResult], hot_spots: int) -> None:
+    header = (
+        f"{'generator':<10} {'size':>8} {'operation':<16} {'peak KiB':>10} "
+        f"{'kept KiB':>10} {'peak B/node':>12} {'peak B/token':>13} {'kept B/node':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.generator:<10} {r.size:>8} {r.operation:<16} {r.peak_bytes / 1024:>10.1f} "
+            f"{r.retained_bytes / 1024:>10.1f} {r.peak_per_node:>12.1f} "
+            f"{r.peak_per_token:>13.1f} {r.retained_per_node:>12.1f}"
+        )
+        for spot in r.top[:hot_spots]:
+            print(f"{'':>37}{spot['bytes'] / 1024:>9.1f} KiB  {spot['where']}  {spot['code']}")
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="sexp-repr memory benchmarks")
+    parser.add_argument(
+        "--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--only", nargs="+", help="operations to run, e.g. loads dumps")
+    parser.add_argument("--top", type=int, default=5, help="allocation sites to keep")
+    parser.add_argument(
+        "--hot-spots", type=int, default=3, help="allocation sites to print per operation"
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results: List[MemoryResult] = []
+    for sample in generate(args.generators, args.sizes):
+        results.extend(run_sample(sample, args.top, args.only))
+
+    print_table(results, args.hot_spots)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"meta": metadata(), "results": [asdict(r) for r in results]},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Параллельный разбор многих записей верхнего уровня (loads_many с workers).
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.processes --generator numeric --size 60000 --workers 1 2 4 8
+
+Записями служат дети корня документа выбранного генератора. Для каждого
+числа процессов печатаются время, число записей в секунду и ускорение
+относительно workers=1, а с --transport ещё и время, которое родительский
+процесс тратит на сборку деревьев из ответов воркеров. Ускорение
+ограничено числом ядер: на одноядерной машине параллельный разбор медленнее.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+from itertools import islice
+from typing import Dict, List
+
+from src.api.core import _build_batch, _loads_batch, loads, loads_many
+from src.shared.scanner import iter_record_spans
+
+from .generators import GENERATORS
+from .run import metadata
+
+
+def records_text(generator: str, size: int) -> str:
+    text = GENERATORS[generator](size).text
+    return text[text.index(" ") + 1 : -1]
+
+
+def measure(text: str, workers: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    count = len(loads_many(text, workers=workers))
+    elapsed = time.perf_counter() - start
+    return {"workers": workers, "seconds": elapsed, "records_per_s": count / elapsed}
+
+
+def transport(text: str, records: int = 2000) -> Dict[str, float]:
+    """Время разбора записей и время, которое родитель тратит на их приём:
+    pickle-ответ с Node против плоского списка _loads_batch.
+    """
+    texts = [text[start:end] for start, end in islice(iter_record_spans(text), records)]
+    start = time.perf_counter()
+    nodes = [loads(t) for t in texts]
+    parse = time.perf_counter() - start
+
+    payload = pickle.dumps(nodes)
+    start = time.perf_counter()
+    pickle.loads(payload)
+    nodes_time = time.perf_counter() - start
+
+    payload = pickle.dumps(_loads_batch(texts))
+    start = time.perf_counter()
+    list(_build_batch(pickle.loads(payload)))
+    flat_time = time.perf_counter() - start
+    return {"parse_s": parse, "unpickle_nodes_s": nodes_time, "build_flat_s": flat_time}
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="parallel loads_many benchmark")
+    parser.add_argument("--generator", default="numeric", choices=list(GENERATORS))
+    parser.add_argument("--size", type=int, default=60000)
+    parser.add_argument(
+        "--workers", nargs="+", type=int, default=[1, 2, 4, os.cpu_count() or 1]
+    )
+    parser.add_argument(
+        "--transport", action="store_true", help="also time the result transport"
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    text = records_text(args.generator, args.size)
+
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'workers':>7} {'seconds':>9} {'records/s':>11} {'speedup':>8}")
+    results = []
+    for workers in sorted(set(args.workers)):
+        result = measure(text, workers)
+        results.append(result)
+        speedup = result["records_per_s"] / results[0]["records_per_s"]
+        print(
+            f"{workers:>7} {result['seconds']:>9.3f} "
+            f"{result['records_per_s']:>11.1f} {speedup:>8.2f}"
+        )
+
+    report: Dict[str, object] = {"meta": metadata(), "results": results}
+    if args.transport:
+        costs = transport(text)
+        report["transport"] = costs
+        print(
+            f"parse {costs['parse_s']:.3f}s, parent side: "
+            f"unpickle Node {costs['unpickle_nodes_s']:.3f}s, "
+            f"flat list {costs['build_flat_s']:.3f}s"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
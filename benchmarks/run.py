@@ -0,0 +1,168 @@
+"""Бенчмарки loads, dumps, path, validate и преобразований в Python/JSON
+(в сравнении с json.dumps/json.loads на тех же данных) на синтетических документах.
+
+Запуск из корня репозитория (после `pip install -e .`):
+
+    python -m benchmarks.run --sizes 1000 10000 --output bench.json
+
+Для каждой операции сохраняется лучшее и среднее время, пропускная способность
+в MB/s и nodes/s, а также пиковая память по tracemalloc (замеряется отдельным
+прогоном, чтобы не искажать время).
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List
+
+from src.api.core import dumps, loads, path, validate
+from src.shared.convert import from_json, from_python, to_json, to_python
+from src.shared.model import Node
+
+from .generators import GENERATORS, Sample, generate
+
+
+@dataclass
+class Result:
+    generator: str
+    size: int
+    operation: str
+    best_s: float
+    mean_s: float
+    bytes: int
+    nodes: int
+    mb_per_s: float
+    nodes_per_s: float
+    peak_bytes: int
+
+
+def count_nodes(root: Node) -> int:
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def measure(func: Callable[[], object], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def operations(sample: Sample) -> Dict[str, Callable[[], object]]:
+    document = loads(sample.text)
+    schema = loads(sample.schema)
+    data = to_python(document)
+    json_text = to_json(document)
+    ops: Dict[str, Callable[[], object]] = {
+        "loads": lambda: loads(sample.text),
+        "dumps": lambda: dumps(document),
+        "validate": lambda: validate(document, schema),
+        "to_python": lambda: to_python(document),
+        "from_python": lambda: from_python(data),
+        "to_json": lambda: to_json(document),
+        "from_json": lambda: from_json(json_text),
+        "json.dumps": lambda: json.dumps(data, ensure_ascii=False),
+        "json.loads": lambda: json.loads(json_text),
+    }
+    for kind, spath in sample.paths.items():
+        ops[f"path_{kind}"] = lambda spath=spath: path(document, spath)
+    return ops
+
+
+def run_sample(sample: Sample, repeat: int, only: List[str] | None) -> List[Result]:
+    size_bytes = len(sample.text.encode("utf-8"))
+    nodes = count_nodes(loads(sample.text))
+    results = []
+    for operation, func in operations(sample).items():
+        if only and operation not in only:
+            continue
+        timings = measure(func, repeat)
+        best = min(timings)
+        results.append(
+            Result(
+                generator=sample.name,
+                size=sample.size,
+                operation=operation,
+                best_s=best,
+                mean_s=sum(timings) / len(timings),
+                bytes=size_bytes,
+                nodes=nodes,
+                mb_per_s=size_bytes / best / 1e6 if best else 0.0,
+                nodes_per_s=nodes / best if best else 0.0,
+                peak_bytes=peak_memory(func),
+            )
+        )
+    return results
+
+
+def metadata() -> Dict[str, str]:
+    return {
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def print_table(results: List[Result]) -> None:
+    header = (
+        f"{'generator':<10} {'size':>8} {'operation':<16} {'best ms':>10} "
+        f"{'MB/s':>9} {'nodes/s':>12} {'peak KiB':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.generator:<10} {r.size:>8} {r.operation:<16} {r.best_s * 1e3:>10.2f} "
+            f"{r.mb_per_s:>9.2f} {r.nodes_per_s:>12.0f} {r.peak_bytes / 1024:>10.1f}"
+        )
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="sexp-repr benchmarks")
+    parser.add_argument(
+        "--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="operations to run, e.g. loads dumps")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results: List[Result] = []
+    for sample in generate(args.generators, args.sizes):
+        results.extend(run_sample(sample, args.repeat, args.only))
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"meta": metadata(), "results": [asdict(r) for r in results]},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
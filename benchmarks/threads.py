@@ -0,0 +1,92 @@
+"""Многопоточные SPath-запросы к одному замороженному документу.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.threads --generator wide --size 10000 --threads 1 2 4 8
+
+Документ загружается и замораживается один раз (Node.freeze), затем один и
+тот же набор запросов выполняется пулом из N потоков. Для каждого N
+печатается пропускная способность (запросов в секунду) и ускорение
+относительно одного потока. На сборках CPython со свободной многопоточностью
+(3.13t и новее) ускорение должно расти с числом ядер; на обычной сборке GIL
+ограничивает его примерно единицей.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from src.api.core import loads, path
+from src.shared.model import Node
+
+from .generators import GENERATORS
+from .run import metadata
+
+
+def run_queries(document: Node, queries: List[str]) -> int:
+    found = 0
+    for query in queries:
+        result = path(document, query)
+        found += len(result) if isinstance(result, list) else 1
+    return found
+
+
+def measure(
+    document: Node, queries: List[str], threads: int, rounds: int
+) -> Dict[str, float]:
+    work = [queries] * (threads * rounds)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(run_queries, [document] * threads, [queries] * threads))
+        start = time.perf_counter()
+        counts = list(executor.map(run_queries, [document] * len(work), work))
+        elapsed = time.perf_counter() - start
+    if len(set(counts)) != 1:
+        raise RuntimeError(f"Threads returned different results: {set(counts)}")
+    total = len(work) * len(queries)
+    return {"threads": threads, "seconds": elapsed, "queries_per_s": total / elapsed}
+
+
+def gil_enabled() -> bool:
+    check = getattr(sys, "_is_gil_enabled", None)
+    return True if check is None else check()
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="concurrent SPath benchmark")
+    parser.add_argument("--generator", default="wide", choices=list(GENERATORS))
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument(
+        "--threads", nargs="+", type=int, default=[1, 2, 4, os.cpu_count() or 1]
+    )
+    parser.add_argument("--rounds", type=int, default=4, help="query batches per thread")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    sample = GENERATORS[args.generator](args.size)
+    document = loads(sample.text).freeze()
+    queries = list(sample.paths.values())
+
+    print(f"gil enabled: {gil_enabled()}, cpus: {os.cpu_count()}")
+    print(f"{'threads':>7} {'seconds':>9} {'queries/s':>11} {'speedup':>8}")
+    results = []
+    for threads in sorted(set(args.threads)):
+        result = measure(document, queries, threads, args.rounds)
+        results.append(result)
+        speedup = result["queries_per_s"] / results[0]["queries_per_s"]
+        print(
+            f"{threads:>7} {result['seconds']:>9.3f} "
+            f"{result['queries_per_s']:>11.1f} {speedup:>8.2f}"
+        )
+
+    if args.output:
+        meta = dict(metadata(), gil_enabled=str(gil_enabled()))
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
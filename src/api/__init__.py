@@ -1 +1,38 @@
-from .core import loads, dumps, validate, tree, path
+from .core import (
+    loads,
+    loads_many,
+    iterload,
+    dumps,
+    validate,
+    decode,
+    tree,
+    path,
+    path_many,
+    iterpath,
+    explain,
+    collect_metrics,
+    add_callback,
+    remove_callback,
+)
+from importlib import import_module
+
+# asyncio и json нужны не всем: асинхронный API и преобразования
+# импортируются при первом обращении к ним.
+_LAZY = {
+    "aload": "src.api.aio",
+    "aiterload": "src.api.aio",
+    "avalidate": "src.api.aio",
+    "apath": "src.api.aio",
+    "to_python": "src.shared.convert",
+    "from_python": "src.shared.convert",
+    "to_json": "src.shared.convert",
+    "from_json": "src.shared.convert",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY[name]), name)
+    globals()[name] = value
+    return value
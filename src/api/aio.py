@@ -0,0 +1,137 @@
+import asyncio
+import codecs
+from concurrent.futures import Executor
+from typing import AsyncIterator, List
+from src.api.core import loads, path, validate
+from src.errors.sexp_erros import ParserError
+from src.shared.events import EventParser, TreeBuilder
+from src.shared.model import Node
+from src.spath.ast import SPath
+
+CHUNK_SIZE = 1 << 16
+
+
+async def aiterload(
+    reader: asyncio.StreamReader,
+    chunk_size: int = CHUNK_SIZE,
+    offload: bool = False,
+    executor: Executor | None = None,
+) -> AsyncIterator[Node]:
+    """
+    Asynchronously parse top-level S-expressions as they arrive on a stream.
+
+    Every chunk read from the stream is fed to an incremental ``EventParser``
+    and the tree is built from its events as they come, so the event loop is
+    blocked for at most one chunk at a time and records are never buffered as
+    text. A record is yielded as soon as its closing paren is received.
+    Scalar values are ``LazyScalar`` objects, decoded on first access.
+
+    Parameters
+    ----------
+    reader: asyncio.StreamReader
+        Stream of UTF-8 encoded S-expressions.
+    chunk_size: int
+        Maximum number of bytes read and parsed at once.
+    offload: bool
+        Parse chunks in ``executor`` instead of on the event loop thread.
+    executor: Executor | None
+        Executor for offloaded parsing. ``None`` means the loop's default executor.
+
+    Returns
+    -------
+    AsyncIterator[Node]
+        Root nodes of the records, in stream order.
+
+    Example
+    --------
+    >>> async for doc in aiterload(reader):
+    ...     handle(doc)
+    """
+    loop = asyncio.get_running_loop()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parser = EventParser()
+    builder = TreeBuilder()
+
+    def parse(chunk: str, final: bool) -> List[Node]:
+        roots = builder.feed(parser.feed(chunk)) if chunk else []
+        if final:
+            roots.extend(builder.feed(parser.close()))
+        return roots
+
+    while True:
+        data = await reader.read(chunk_size)
+        chunk = decoder.decode(data, final=not data)
+        if offload:
+            roots = await loop.run_in_executor(executor, parse, chunk, not data)
+        else:
+            roots = parse(chunk, not data)
+        for root in roots:
+            yield root
+        if not data:
+            break
+        if not offload:
+            await asyncio.sleep(0)
+
+
+async def aload(
+    reader: asyncio.StreamReader,
+    chunk_size: int = CHUNK_SIZE,
+    offload: bool = False,
+    executor: Executor | None = None,
+) -> Node:
+    """
+    Asynchronously read a stream holding exactly one S-expression and parse it.
+
+    Parameters
+    ----------
+    reader: asyncio.StreamReader
+        Stream of a UTF-8 encoded S-expression.
+    chunk_size, offload, executor
+        See ``aiterload``.
+
+    Returns
+    -------
+    Node
+        Root node of the parsed AST.
+
+    Example
+    --------
+    >>> node = await aload(reader)
+    """
+    result: Node | None = None
+    async for node in aiterload(reader, chunk_size, offload, executor):
+        if result is not None:
+            raise ParserError("Expected end of input (EOF)")
+        result = node
+    if result is None:
+        raise ParserError("Unexpected end of input")
+    return result
+
+
+async def avalidate(
+    document: Node, schema_document: Node, executor: Executor | None = None
+) -> bool:
+    """
+    Validate a document against a schema in an executor, see ``validate``.
+
+    Example
+    --------
+    >>> await avalidate(document, schema)
+    True
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, validate, document, schema_document)
+
+
+async def apath(
+    document: Node | str, spath: SPath | str, executor: Executor | None = None
+) -> Node | list[Node]:
+    """
+    Evaluate a path on a document in an executor, see ``path``.
+
+    Example
+    --------
+    >>> await apath(document, "//title")
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, path, document, spath)
@@ -1,15 +1,72 @@
+from __future__ import annotations
+
 from src.shared.parser import Lexer, Parser
-from src.sexp_schema.interpreter import Interpreter
-from src.sexp_schema.validator import Validator
-from src.shared.model import Node
-from src.visualizer.cli import TreeRenderer
-from src.spath.engine import SPathEngine
-from src.spath.ast import SPath
-from src.spath.spath_parser import SPathParser
-from src.spath.spath_lexer import SPathLexer
+from src.shared.model import Node, Scalar
+from src.shared.events import CHUNK_SIZE
+from src.shared import metrics
+from src.shared.metrics import collect_metrics, add_callback, remove_callback
+from time import perf_counter
+from collections import deque
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+if TYPE_CHECKING:
+    from src.sexp_schema.codegen import Record
+    from src.spath.ast import Aggregate, SPath
+    from src.spath.engine import SPathEngine
+    from src.spath.explain import ExplainReport
+
+# Подсистемы SPath, схем, визуализатора (rich) и пула процессов импортируются
+# при первом вызове функции, которой они нужны: `import src.api.core` ради
+# loads/dumps не тянет их и не имеет побочных эффектов.
+_LAZY = {
+    "Interpreter": "src.sexp_schema.interpreter",
+    "Validator": "src.sexp_schema.validator",
+    "Decoder": "src.sexp_schema.codegen",
+    "Record": "src.sexp_schema.codegen",
+    "TreeRenderer": "src.visualizer.cli",
+    "SPathEngine": "src.spath.engine",
+    "Aggregate": "src.spath.ast",
+    "SPath": "src.spath.ast",
+    "ExplainReport": "src.spath.explain",
+    "SPathParser": "src.spath.spath_parser",
+    "SPathLexer": "src.spath.spath_lexer",
+    "StreamMatcher": "src.spath.stream",
+    "iter_record_spans": "src.shared.scanner",
+    "iter_events": "src.shared.events",
+    "ProcessPoolExecutor": "concurrent.futures",
+}
+_LAZY_MODULES = {
+    "projection": "src.spath.projection",
+    "hashing": "src.shared.hashing",
+}
+
+
+def __getattr__(name: str) -> Any:
+    # Совместимость: имена, которые раньше импортировались в модуль сразу.
+    if name in _LAZY_MODULES:
+        return import_module(_LAZY_MODULES[name])
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _parse_path(path: str) -> SPath | Aggregate:
+    from src.spath.spath_lexer import SPathLexer
+    from src.spath.spath_parser import SPathParser
+
+    return SPathParser(SPathLexer(path).tokenize()).parse()
+
 
+_BATCH_CHARS = 1 << 20
 
-def loads(text: str) -> Node:
+
+def loads(
+    text: str,
+    share_subtrees: bool = False,
+    lazy: bool = False,
+    project: SPath | str | None = None,
+) -> Node:
     """
     Parse an S-expression string into an AST.
 
@@ -17,6 +74,24 @@ def loads(text: str) -> Node:
     ----------
     text: str
         Input string containing an S-expression.
+    share_subtrees: bool
+        Store identical subtrees and scalars once (hash-consing). Shared nodes
+        are the same objects in every place they occur, so the result should
+        be treated as read-only.
+    lazy: bool
+        Keep numbers as raw token text and convert them to int or float
+        only on first access. Speeds up parsing when most values are never
+        read; an unread number takes more memory than the int it stands for.
+    project: SPath | str | None
+        Build only the subtrees selected by this path and their ancestors;
+        every other subtree is skipped by counting parens, without tokens or
+        nodes. ``path(loads(text, project=p), p)`` returns the same nodes as
+        on the full document. Supports the streaming subset of SPath, see
+        ``iterpath``. Skipped subtrees are only checked for balanced parens
+        and closed strings, not for syntax: ``(a (b 1 2) (z 1))`` with
+        ``project="/a/z"`` loads without an error, although ``loads``
+        without projection rejects it. A value after skipped children,
+        as in ``(a (b 1) 2)``, is still rejected.
 
     Returns
     -------
@@ -40,7 +115,181 @@ def loads(text: str) -> Node:
         value=None
     )
     """
-    return Parser(Lexer(text).tokenize()).parse()
+    if project is not None:
+        from src.spath import projection
+    if share_subtrees:
+        from src.shared import hashing
+
+    record = metrics.start("loads")
+    if record is None:
+        if project is not None:
+            node = projection.project(text, project, lazy=lazy)
+        else:
+            node = Parser(Lexer(text).tokenize(), lazy=lazy).parse()
+        return hashing.share_subtrees(node) if share_subtrees else node
+
+    started = perf_counter()
+    if project is not None:
+        tokens = []
+        tokenized = started
+        node = projection.project(text, project, lazy=lazy)
+    else:
+        tokens = Lexer(text).tokenize()
+        tokenized = perf_counter()
+        node = Parser(tokens, lazy=lazy).parse()
+    if share_subtrees:
+        node = hashing.share_subtrees(node)
+    record.tokenize_time = tokenized - started
+    record.parse_time = perf_counter() - tokenized
+    record.token_count = len(tokens)
+    record.node_count, record.max_depth = metrics.tree_stats(node)
+    metrics.finish(record)
+    return node
+
+
+def iterload(text: str, workers: int | None = None) -> Iterator[Node]:
+    """
+    Lazily parse a text holding several concatenated top-level S-expressions.
+
+    Record boundaries are found by a fast pre-scan that only balances parens
+    and string literals. With ``workers > 1`` the records are parsed in
+    batches by a pool of worker processes; results are still yielded in
+    input order. Workers send trees back as flat lists of names and values
+    rather than pickled ``Node`` objects, which are nearly as expensive to
+    unpickle as to parse.
+
+    Parameters
+    ----------
+    text: str
+        Input string containing zero or more S-expressions.
+    workers: int | None
+        Number of worker processes. ``None`` or ``1`` parses in-process.
+
+    Returns
+    -------
+    Iterator[Node]
+        Root nodes of the parsed records, in input order.
+
+    Example
+    --------
+    >>> [dumps(n) for n in iterload('(a 1) (b 2)', workers=2)]
+    ['(a 1)', '(b 2)']
+    """
+    from src.shared.scanner import iter_record_spans
+
+    spans = iter_record_spans(text)
+    if workers is None or workers <= 1:
+        for start, end in spans:
+            yield loads(text[start:end])
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for batch in _batches(text, spans):
+            pending.append(executor.submit(_loads_batch, batch))
+            if len(pending) >= workers * 2:
+                yield from _build_batch(pending.popleft().result())
+        while pending:
+            yield from _build_batch(pending.popleft().result())
+
+
+def loads_many(text: str, workers: int | None = None) -> List[Node]:
+    """
+    Parse a text holding several concatenated top-level S-expressions.
+
+    Parameters
+    ----------
+    text: str
+        Input string containing zero or more S-expressions.
+    workers: int | None
+        Number of worker processes, see ``iterload``.
+
+    Returns
+    -------
+    List[Node]
+        Root nodes of the parsed records, in input order.
+
+    Example
+    --------
+    >>> loads_many('(a 1) (b 2)')
+    [Node(name='a', ...), Node(name='b', ...)]
+    """
+    return list(iterload(text, workers=workers))
+
+
+def _batches(text: str, spans: Iterator[Tuple[int, int]]) -> Iterator[List[str]]:
+    batch: List[str] = []
+    size = 0
+    for start, end in spans:
+        batch.append(text[start:end])
+        size += end - start
+        if size >= _BATCH_CHARS:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def _loads_batch(texts: List[str]) -> List[Any]:
+    """Разбирает записи в процессе-воркере и возвращает их деревья одним
+    плоским списком в прямом порядке обхода: для каждого узла имя, атрибуты
+    (кортеж ключ, значение, ... или None) и затем None и значение у листа
+    либо число детей. Такой список pickle передаёт в разы быстрее, чем Node.
+    """
+    flat: List[Any] = []
+    append = flat.append
+    for text in texts:
+        stack = [loads(text)]
+        while stack:
+            node = stack.pop()
+            attrs = node.attrs
+            append(node._name)
+            append(
+                tuple([x for k, v in attrs.items() for x in (k, v._value)])
+                if attrs
+                else None
+            )
+            if node.scalar is not None:
+                append(None)
+                append(node.scalar._value)
+            else:
+                append(len(node.children))
+                stack.extend(reversed(node.children))
+    return flat
+
+
+def _build_batch(flat: List[Any]) -> Iterator[Node]:
+    """Собирает деревья из списка _loads_batch и выдаёт корни по одному."""
+    items = iter(flat)
+    take = items.__next__
+    # Открытые узлы: [узел, сколько детей ещё не прочитано].
+    stack: List[list] = []
+    for name in items:
+        attrs = take()
+        count = take()
+        node = Node(
+            name,
+            {attrs[i]: Scalar(attrs[i + 1]) for i in range(0, len(attrs), 2)}
+            if attrs
+            else None,
+        )
+        if count is None:
+            node.scalar = Scalar(take())
+        if stack:
+            top = stack[-1]
+            top[0].children.append(node)
+            top[1] -= 1
+        else:
+            root = node
+        if count:
+            stack.append([node, count])
+        else:
+            while stack and not stack[-1][1]:
+                stack.pop()
+        if not stack:
+            yield root
 
 
 def dumps(node: Node) -> str:
@@ -77,7 +326,7 @@ def dumps(node: Node) -> str:
     return node.to_sexp()
 
 
-def validate(document: Node, schema_document: Node) -> bool:
+def validate(document: Node, schema_document: Node, memo_size: int = 0) -> bool:
     """
     Validate a document against a schema.
 
@@ -87,6 +336,10 @@ def validate(document: Node, schema_document: Node) -> bool:
         Document to validate.
     schema_document: Node
         Schema to validate against.
+    memo_size: int
+        Validate structurally identical subtrees once, remembering up to this
+        many (subtree, schema element) pairs. 0 disables the memo; enable it
+        for documents with many repeated records.
 
     Returns
     -------
@@ -100,11 +353,65 @@ def validate(document: Node, schema_document: Node) -> bool:
     # True
     """
 
+    from src.sexp_schema.interpreter import Interpreter
+    from src.sexp_schema.validator import Validator
+
+    record = metrics.start("validate")
+    if record is None:
+        schema = Interpreter(schema_document).interpret()
+        return Validator(document, schema, memo_size).validate()
+
+    started = perf_counter()
     schema = Interpreter(schema_document).interpret()
-    return Validator(document, schema).validate()
+    interpreted = perf_counter()
+    result = Validator(document, schema, memo_size).validate()
+    record.schema_interpret_time = interpreted - started
+    record.validate_time = perf_counter() - interpreted
+    metrics.finish(record)
+    return result
 
 
-def tree(document: Node | str) -> None:
+def decode(text: str, schema_document: Node) -> Record:
+    """
+    Parse a document straight into classes generated from a schema.
+
+    Parameters
+    ----------
+    text: str
+        S-expression string to parse.
+    schema_document: Node
+        Schema describing the document.
+
+    Returns
+    -------
+    Record
+        Instance of the class generated for the schema's root element.
+        The document is validated while it is parsed; errors raise
+        ValidationError exactly like `validate`. Compiled schemas are
+        cached, so structurally equal schemas share the generated classes
+        with `generate_classes` and results of repeated calls compare equal.
+
+    Example
+    --------
+    >>> decode('(person (:name "Alice"))', loads('(schema (element (:name "person") \
+        (attrs (attr (:name "name") (type "string")))))'))
+    # Person(name='Alice')
+    """
+
+    from src.sexp_schema.codegen import decoder_for
+    from src.sexp_schema.interpreter import Interpreter
+
+    return decoder_for(Interpreter(schema_document).interpret()).decode(text)
+
+
+def tree(
+    document: Node | str,
+    stream: bool = False,
+    file: TextIO | None = None,
+    max_depth: int | None = None,
+    max_children: int | None = None,
+    color: bool = True,
+) -> None:
     """
     Print document as a tree to stdout. \
     You can put the document as a raw S-exp string or as a Node.
@@ -113,6 +420,17 @@ def tree(document: Node | str) -> None:
     ----------
     document: Node | str
         Document to print. If it is a string, it is parsed into a Node.
+    stream: bool
+        Write the tree line by line instead of building it in memory first.
+        Use it for documents with hundreds of thousands of nodes.
+    file: TextIO | None
+        Where to write the tree. Defaults to stdout.
+    max_depth: int | None
+        Do not descend below this depth; hidden children are shown as "… N more".
+    max_children: int | None
+        Show at most this many children per node, followed by "… N more".
+    color: bool
+        Set to False for plain text output (the fastest streaming path).
 
     Returns
     -------
@@ -125,13 +443,24 @@ def tree(document: Node | str) -> None:
 
     >>> tree('(:name "Alice")')
     # Print the document as a tree
+
+    >>> tree(huge_document, stream=True, max_children=10, color=False)
+    # Print the first 10 children of every node, line by line
     """
+    from src.visualizer.cli import TreeRenderer
+
     if isinstance(document, str):
         document = loads(document)
-    TreeRenderer().render(document)
+    renderer = TreeRenderer(
+        max_depth=max_depth, max_children=max_children, color=color
+    )
+    if stream:
+        renderer.stream(document, file)
+    else:
+        renderer.render(document, file)
 
 
-def path(document: Node | str, path: SPath | str) -> Node:
+def path(document: Node | str, path: SPath | Aggregate | str) -> Any:
     """
     Evaluate a path on a document.
 
@@ -139,23 +468,198 @@ def path(document: Node | str, path: SPath | str) -> Node:
     ----------
     document: Node | str
         Document to evaluate the path on. If it is a string, it is parsed into a Node.
-    path: SPath | str
+    path: SPath | Aggregate | str
         Path to evaluate. If it is a string, it is parsed into a SPath.
+        Aggregates (``count``, ``sum``, ``avg``, ``min``, ``max``, ``distinct``)
+        are evaluated over a stream of matches without building a node list.
 
     Returns
     -------
-    Node
-        Result of the evaluation.
+    Node | list[Node] | Scalar | list[Scalar] | Any
+        Result of the evaluation: nodes, attribute values for a path ending
+        with ``/:name``, or the aggregate value.
 
     Example
     --------
     >>> path(Node(name="person", attrs={"name": Scalar("Alice")}), \
         '/person')
     # Node(name='person', attrs={'name': Scalar('Alice')}, children=None, value=None)
+
+    >>> path('(orders (order (total 10)) (order (total 5)))', 'sum(//order/total)')
+    15
     """
     if isinstance(document, str):
         document = loads(document)
+    record = metrics.start("path")
+    if record is None:
+        if isinstance(path, str):
+            path = _parse_path(path)
+        return _evaluate(document, path)
+
+    started = perf_counter()
     if isinstance(path, str):
-        path = SPathParser(SPathLexer(path).tokenize()).parse()
-    result = SPathEngine().evaluate(document, path)
+        path = _parse_path(path)
+    parsed = perf_counter()
+    result = _evaluate(document, path, stats=record)
+    record.spath_parse_time = parsed - started
+    record.spath_eval_time = perf_counter() - parsed
+    metrics.finish(record)
+    return result
+
+
+def _evaluate(
+    document: Node, path: SPath | Aggregate, stats: metrics.Metrics | None = None
+) -> Any:
+    from src.spath.ast import Aggregate
+    from src.spath.engine import SPathEngine
+
+    engine = SPathEngine()
+    if isinstance(path, Aggregate):
+        return engine.aggregate(document, path, stats=stats)
+    if path.attribute is not None:
+        return _finish(engine, path, engine.iterate(document, path, stats=stats))
+    return _finish(engine, path, engine.evaluate(document, path, stats=stats))
+
+
+def _finish(engine: SPathEngine, path: SPath | Aggregate, nodes: Iterable[Node]) -> Any:
+    from src.spath.ast import Aggregate
+
+    if isinstance(path, Aggregate):
+        return engine.fold(path, nodes)
+    if path.attribute is not None:
+        result: list = [
+            node.attrs[path.attribute] for node in nodes if path.attribute in node.attrs
+        ]
+    else:
+        result = nodes if isinstance(nodes, list) else list(nodes)
     return result[0] if len(result) == 1 else result
+
+
+def path_many(document: Node | str, paths: Sequence[SPath | Aggregate | str]) -> List[Any]:
+    """
+    Evaluate many paths on a document in a shared traversal.
+
+    Paths are merged into a trie of steps: a common prefix is evaluated once
+    for all paths that start with it, and recursive steps (``//name``) taken
+    from the same nodes share one walk over the descendants. The cost is
+    close to one traversal per document instead of one per path.
+
+    Parameters
+    ----------
+    document: Node | str
+        Document to evaluate the paths on. If it is a string, it is parsed into a Node.
+    paths: Sequence[SPath | Aggregate | str]
+        Paths to evaluate, see ``path``.
+
+    Returns
+    -------
+    List[Any]
+        Results in the order of ``paths``; each one equals ``path(document, p)``.
+
+    Example
+    --------
+    >>> path_many('(shop (order (total 10)) (order (total 5)))', \
+        ['count(//order)', 'sum(//order/total)', '//total'])
+    [2, 15, [Node(name='total', ...), Node(name='total', ...)]]
+    """
+    if isinstance(document, str):
+        document = loads(document)
+    record = metrics.start("path")
+    started = perf_counter()
+    compiled = [_parse_path(p) if isinstance(p, str) else p for p in paths]
+    parsed = perf_counter()
+
+    from src.spath.ast import Aggregate
+    from src.spath.engine import SPathEngine
+
+    engine = SPathEngine()
+    matches = engine.evaluate_many(
+        document,
+        [p.path if isinstance(p, Aggregate) else p for p in compiled],
+        stats=record,
+    )
+    results = [_finish(engine, p, nodes) for p, nodes in zip(compiled, matches)]
+
+    if record is not None:
+        record.spath_parse_time = parsed - started
+        record.spath_eval_time = perf_counter() - parsed
+        metrics.finish(record)
+    return results
+
+
+def iterpath(
+    source: Any, path: SPath | str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Evaluate a path over a streaming parse of the input.
+
+    The input is read in chunks and never turned into a full tree: only
+    subtrees that can match the path are built, and each match is yielded
+    as soon as its closing paren is read. Memory use is bounded by the size
+    of the largest match, not of the input. Every top-level expression of
+    the input is matched as a separate document.
+
+    Supported paths: ``name``, ``//name`` and ``.`` steps, attribute filters
+    on any step, field filters on the last step only, and a trailing
+    ``/:attr``. Each matching node is yielded once, in closing-paren order.
+
+    Parameters
+    ----------
+    source: str | file object | Iterable[str | bytes]
+        Input text, a text or binary (UTF-8) file, or an iterable of chunks.
+    path: SPath | str
+        Path to evaluate. If it is a string, it is parsed into a SPath.
+    chunk_size: int
+        Number of characters or bytes read at once from a string or file.
+
+    Returns
+    -------
+    Iterator[Node] | Iterator[Scalar]
+        Matching nodes, or attribute values for a path ending with ``/:attr``.
+
+    Example
+    --------
+    >>> with open("app.log", "rb") as f:
+    ...     for event in iterpath(f, '//event[:level="error"]'):
+    ...         handle(event)
+    """
+    from src.shared.events import iter_events
+    from src.spath.stream import StreamMatcher
+
+    return StreamMatcher(path).match(iter_events(source, chunk_size))
+
+
+def explain(document: Node | str, path: SPath | str) -> ExplainReport:
+    """
+    Evaluate a path on a document and report how each step was executed.
+
+    Parameters
+    ----------
+    document: Node | str
+        Document to evaluate the path on. If it is a string, it is parsed into a Node.
+    path: SPath | str
+        Path to evaluate. If it is a string, it is parsed into a SPath.
+
+    Returns
+    -------
+    ExplainReport
+        Per-step input size, candidates, filter counts, output size, elapsed
+        time and a hint about applicable shortcuts. ``str(report)`` renders a table.
+
+    Example
+    --------
+    >>> print(explain('(book (title "S-Exp"))', '//title'))
+    EXPLAIN ANALYZE //title
+    step    source       input    cands   named  filters  passed  output  ms  shortcut
+    //title descendants      1        2       1        0       0       1  ...
+    """
+    if isinstance(document, str):
+        document = loads(document)
+    from src.spath.ast import Aggregate
+    from src.spath.engine import SPathEngine
+
+    if isinstance(path, str):
+        path = _parse_path(path)
+    if isinstance(path, Aggregate):
+        path = path.path
+    return SPathEngine().explain(document, path)
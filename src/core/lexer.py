@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from errors.sexp_erros import ParserError
+from ..errors.sexp_erros import ParserError
 from typing import List
 
 
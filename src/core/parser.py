@@ -1,4 +1,4 @@
-from errors.sexp_erros import ParserError
+from ..errors.sexp_erros import ParserError
 from .lexer import Token
 from typing import List
 
@@ -15,4 +15,6 @@ class SPathTypes(Enum):
     COLON = ":"
     LBRACKET = "["
     RBRACKET = "]"
+    LPAREN = "("
+    RPAREN = ")"
     EOF = "EOF"
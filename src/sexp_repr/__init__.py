@@ -1,3 +1,12 @@
-from api import loads, dumps, validate, tree, path
+from api import loads, loads_many, iterload, dumps, validate, tree, path, path_many
 
-__all__ = ["loads", "dumps", "validate", "tree", "path"]
+__all__ = [
+    "loads",
+    "loads_many",
+    "iterload",
+    "dumps",
+    "validate",
+    "tree",
+    "path",
+    "path_many",
+]
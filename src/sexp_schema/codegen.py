@@ -0,0 +1,373 @@
+"""Классы и декодер, построенные по скомпилированной схеме (SchemaNode).
+
+Для каждого `element` схемы создаётся класс со __slots__:
+
+* атрибут `(attr (:name "lang") ...)`  -> поле `lang`;
+* значение элемента (`type`)          -> поле `value`;
+* дочерний лист (только `type`, без attrs и children) -> поле со значением
+  Python, у повторяющегося (max_occurs > 1) — список значений;
+* остальные дочерние элементы         -> поле с объектом их класса
+  (или список объектов).
+
+Отсутствующие необязательные поля равны None (повторяющиеся — []).
+Decoder собирает такие объекты из событий разбора (shared.events) и
+проверяет документ по схеме в том же проходе: дерево Node не строится,
+ошибки те же, что у Validator (ValidationError), ошибки синтаксиса —
+ParserError.
+"""
+
+import keyword
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+from .interpreter import Constraint, SchemaNode
+from .validator import (
+    MISSING,
+    TYPE_MAP,
+    ConstraintScope,
+    Matcher,
+    advance_selectors,
+    check_max_occurs,
+    check_min_occurs,
+)
+from ..errors.sexp_erros import InterpreterError, ParserError, ValidationError
+from ..shared.events import END, START, Event, iter_events
+from ..shared.model import Scalar
+
+
+class Record:
+    """Базовый класс сгенерированных классов.
+    Поля задаются именованными аргументами конструктора.
+    """
+
+    __slots__ = ()
+    _schema: SchemaNode
+    _fields: Tuple[str, ...] = ()
+    _repeated: frozenset = frozenset()
+    _types: Dict[str, type] = {}
+
+    def __init__(self, **values: Any):
+        for name in self._fields:
+            if name in values:
+                value = values.pop(name)
+            else:
+                value = [] if name in self._repeated else None
+            object.__setattr__(self, name, value)
+        if values:
+            raise TypeError(
+                f"{type(self).__name__} has no fields {', '.join(sorted(values))}"
+            )
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self._fields)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+def _field_name(name: str) -> str:
+    field = re.sub(r"\W", "_", name)
+    if not field.isidentifier() or keyword.iskeyword(field):
+        field += "_"
+    return field if field.isidentifier() else "_" + field
+
+
+def _class_name(name: str) -> str:
+    parts = re.split(r"[\W_]+", name)
+    return "".join(p[:1].upper() + p[1:] for p in parts if p) or "Element"
+
+
+def _is_leaf(schema: SchemaNode) -> bool:
+    return schema.value_type is not None and not schema.attrs and not schema.children
+
+
+def _is_repeated(schema: SchemaNode) -> bool:
+    return schema.max_occurs == "unbounded" or schema.max_occurs > 1
+
+
+def _py_type(schema: SchemaNode):
+    return None if schema.value_type is None else TYPE_MAP.get(schema.value_type.value)
+
+
+class _Plan:
+    """Скомпилированное описание элемента для декодера."""
+
+    __slots__ = ("schema", "cls", "attrs", "required", "value_type", "children")
+
+    def __init__(self, schema: SchemaNode, cls: type | None):
+        self.schema = schema
+        self.cls = cls
+        # имя атрибута -> (поле, тип Python или None)
+        self.attrs: Dict[str, Tuple[str, Any]] = {}
+        self.required: List[str] = [n for n, a in schema.attrs.items() if a.required]
+        self.value_type = _py_type(schema)
+        # имя ребёнка -> (план, поле, повторяется ли)
+        self.children: Dict[str, Tuple["_Plan", str, bool]] = {}
+
+
+class Decoder:
+    """Разбор текста в объекты классов, сгенерированных по схеме.
+    >>> decode(text: str) -> Record: объект класса корневого элемента.
+    >>> classes: Dict[str, type]: сгенерированные классы по именам.
+    """
+
+    def __init__(self, schema: SchemaNode):
+        self.schema: SchemaNode = schema
+        self.classes: Dict[str, type] = {}
+        self._plan: _Plan = self._compile(schema)
+
+    @property
+    def root(self) -> type:
+        return self._plan.cls  # type: ignore
+
+    def _compile(self, schema: SchemaNode) -> _Plan:
+        # Схема — дерево небольшой глубины; компиляция рекурсивна, как в Interpreter.
+        if schema is not self.schema and _is_leaf(schema):
+            return _Plan(schema, None)
+
+        fields: List[str] = []
+        repeated = set()
+        types: Dict[str, type] = {}
+
+        def add(name: str) -> str:
+            field = _field_name(name)
+            if field in fields:
+                raise InterpreterError(
+                    f"Field '{field}' is defined twice in element '{schema.name}'"
+                )
+            fields.append(field)
+            return field
+
+        attrs = {name: add(name) for name in schema.attrs}
+        if schema.value_type is not None:
+            add("value")
+        children = []
+        for child_schema in schema.children:
+            child = self._compile(child_schema)
+            field = add(child_schema.name)
+            if _is_repeated(child_schema):
+                repeated.add(field)
+            if child.cls is not None:
+                types[field] = child.cls
+            children.append((child, field))
+
+        name = _class_name(schema.name)
+        while name in self.classes:
+            name += "_"
+        cls = type(
+            name,
+            (Record,),
+            {
+                "__slots__": tuple(fields),
+                "_schema": schema,
+                "_fields": tuple(fields),
+                "_repeated": frozenset(repeated),
+                "_types": types,
+            },
+        )
+        self.classes[name] = cls
+
+        plan = _Plan(schema, cls)
+        for attr_name, field in attrs.items():
+            plan.attrs[attr_name] = (field, _py_type(schema.attrs[attr_name]))
+        for child, field in children:
+            plan.children[child.schema.name] = (child, field, field in repeated)
+        return plan
+
+    def decode(self, text: str) -> Record:
+        return self.decode_events(iter_events(text))
+
+    def decode_events(self, events: Iterable[Event]) -> Record:
+        """Объект корневого элемента из событий EventParser (одно выражение)."""
+
+        def open_element(
+            plan: _Plan, attrs: dict, matchers: List[Matcher], selected: list
+        ) -> list:
+            schema = plan.schema
+            values: Dict[str, Any] = {}
+            for name, scalar in attrs.items():
+                if name not in plan.attrs:
+                    raise ValidationError(
+                        f"Attribute '{name}' is not allowed in element '{schema.name}'"
+                    )
+                field, py_type = plan.attrs[name]
+                attr_value = scalar.value
+                if py_type is not None and not isinstance(attr_value, py_type):
+                    raise ValidationError(
+                        f"Attribute '{name}' must have a value of type "
+                        f"{schema.attrs[name].value_type}"
+                    )
+                values[field] = attr_value
+            for name in plan.required:
+                if name not in attrs:
+                    raise ValidationError(
+                        f"Attribute '{name}' is required in element '{schema.name}'"
+                    )
+            scope = ConstraintScope(schema) if schema.constraints else None
+            if scope is not None:
+                matchers = scope.matchers(matchers)
+            # Кадр: [план, поля, число вхождений детей, есть ли значение,
+            #        селекторы ограничений, своя область, выбравшие узел ограничения]
+            return [plan, values, {}, False, matchers, scope, selected]
+
+        stack: List[list] = []
+        result: Any = None
+        done = False
+
+        for event in events:
+            kind = event[0]
+
+            if kind == START:
+                name = event[1]
+                if not stack:
+                    if done:
+                        raise ParserError("Expected end of input (EOF)")
+                    if name != self._plan.schema.name:
+                        raise ValidationError(
+                            f"Document name {name} does not match schema name "
+                            f"{self._plan.schema.name}"
+                        )
+                    stack.append(open_element(self._plan, event[2], [], []))
+                    continue
+                frame = stack[-1]
+                plan: _Plan = frame[0]
+                entry = plan.children.get(name)
+                if entry is None:
+                    raise ValidationError(
+                        f"Unexpected child element '{name}' in element '{plan.schema.name}'"
+                    )
+                child, field, _ = entry
+                counts = frame[2]
+                occurrences = counts[field] = counts.get(field, 0) + 1
+                check_max_occurs(child.schema, occurrences, plan.schema.name)
+                matchers, selected = (
+                    advance_selectors(frame[4], name) if frame[4] else ([], [])
+                )
+                stack.append(open_element(child, event[2], matchers, selected))
+
+            elif kind == END:
+                frame = stack.pop()
+                plan = frame[0]
+                schema = plan.schema
+                values = frame[1]
+                if plan.value_type is not None and not frame[3]:
+                    raise ValidationError(f"Element '{schema.name}' must have a value")
+                counts = frame[2]
+                for child, field, _ in plan.children.values():
+                    check_min_occurs(child.schema, counts.get(field, 0), schema.name)
+                if frame[5] is not None:
+                    frame[5].close()
+                for constraint, scope in frame[6]:
+                    scope.record(
+                        constraint, self._field_value(plan, values, constraint), schema.name
+                    )
+                result = values.get("value") if plan.cls is None else plan.cls(**values)
+                if stack:
+                    parent = stack[-1]
+                    _, field, repeated = parent[0].children[schema.name]
+                    if repeated:
+                        parent[1].setdefault(field, []).append(result)
+                    else:
+                        parent[1][field] = result
+                else:
+                    done = True
+
+            else:
+                frame = stack[-1]
+                plan = frame[0]
+                schema = plan.schema
+                if plan.value_type is None:
+                    raise ValidationError(f"Element '{schema.name}' must not have a value")
+                element_value = event[1].value
+                if not isinstance(element_value, plan.value_type):
+                    raise ValidationError(
+                        f"Element '{schema.name}' must have a value of type {schema.value_type}"
+                    )
+                frame[1]["value"] = element_value
+                frame[3] = True
+
+        if not done:
+            raise ParserError("Unexpected end of input")
+        return result
+
+    def _field_value(self, plan: _Plan, values: Dict[str, Any], constraint: Constraint) -> Any:
+        field = constraint.field
+        if field == ".":
+            return values.get("value", MISSING)
+        if field.startswith(":"):
+            entry = plan.attrs.get(field[1:])
+            return values.get(entry[0], MISSING) if entry else MISSING
+        entry = plan.children.get(field)
+        if entry is None or entry[1] not in values:
+            return MISSING
+        value = values[entry[1]]
+        if entry[2]:
+            if len(value) > 1:
+                raise ValidationError(
+                    f"Field '{field}' of constraint '{constraint.name}' occurs "
+                    f"{len(value)} times in element '{plan.schema.name}'"
+                )
+            value = value[0]
+        if isinstance(value, Record):
+            return getattr(value, "value") if "value" in value._fields else MISSING
+        return value
+
+
+DECODER_CACHE_SIZE = 32
+
+_DECODERS: "OrderedDict[tuple, Decoder]" = OrderedDict()
+_DECODERS_LOCK = threading.Lock()
+
+
+def _plain(value: Any) -> Any:
+    # Interpreter оставляет часть полей схемы (имя атрибута, тип) Scalar'ами.
+    return value.value if isinstance(value, Scalar) else value
+
+
+def _schema_key(schema: SchemaNode) -> tuple:
+    # Структурный ключ схемы: сравнивается в словаре целиком, поэтому
+    # одинаковый ключ — у схем, одинаковых во всём, что видит Decoder.
+    return (
+        _plain(schema.name),
+        _plain(schema.value_type),
+        schema.required,
+        schema.min_occurs,
+        schema.max_occurs,
+        tuple((name, _schema_key(attr)) for name, attr in schema.attrs.items()),
+        tuple(_schema_key(child) for child in schema.children),
+        tuple(
+            (c.kind, c.name, c.selector, c.field, c.refer) for c in schema.constraints
+        ),
+    )
+
+
+def decoder_for(schema: SchemaNode) -> Decoder:
+    """Decoder для схемы из общего кэша (LRU на DECODER_CACHE_SIZE схем).
+    Ключ — структура схемы, поэтому структурно одинаковые схемы, в том числе
+    заново полученные из Interpreter, дают один Decoder и одни и те же
+    классы: результаты decode сравниваются между собой и проходят
+    isinstance с классами generate_classes.
+    """
+    key = _schema_key(schema)
+    with _DECODERS_LOCK:
+        decoder = _DECODERS.get(key)
+        if decoder is not None:
+            _DECODERS.move_to_end(key)
+            return decoder
+    decoder = Decoder(schema)
+    with _DECODERS_LOCK:
+        # Другой поток мог скомпилировать ту же схему раньше — берём его Decoder.
+        decoder = _DECODERS.setdefault(key, decoder)
+        _DECODERS.move_to_end(key)
+        if len(_DECODERS) > DECODER_CACHE_SIZE:
+            _DECODERS.popitem(last=False)
+    return decoder
+
+
+def generate_classes(schema: SchemaNode) -> Dict[str, type]:
+    """Классы элементов схемы по именам (корневой — decoder_for(schema).root)."""
+    return decoder_for(schema).classes
@@ -4,6 +4,24 @@ from typing import Literal
 from ..errors.sexp_erros import InterpreterError
 
 
+@dataclass
+class Constraint:
+    """Ограничение идентичности (unique, key, keyref), объявленное в элементе.
+    selector — путь от объявляющего элемента к выбираемым элементам: имена
+    через `/`, с необязательным префиксом `//` (на любой глубине).
+    field — `:attr` (атрибут), имя дочернего листа или `.` (значение элемента).
+    """
+
+    kind: Literal["unique", "key", "keyref"]
+    name: str
+    selector: str
+    field: str
+    refer: str | None = None
+
+    steps: tuple[str, ...] = ()
+    descendant: bool = False
+
+
 @dataclass
 class SchemaNode:
     name: str
@@ -15,6 +33,7 @@ class SchemaNode:
 
     attrs: dict[str, "SchemaNode"] = field(default_factory=dict)
     children: list["SchemaNode"] = field(default_factory=list)
+    constraints: list[Constraint] = field(default_factory=list)
 
 
 class Interpreter:
@@ -28,7 +47,6 @@ class Interpreter:
         return self._interpret_node(self.ast.children[0])
 
     def _interpret_node(self, node: Node) -> SchemaNode:
-        print(node)
         name = node.name
         attr = node.attrs
         children = node.children
@@ -36,8 +54,6 @@ class Interpreter:
         if name != "element":
             raise InterpreterError(f"Expected 'element' node, got '{name}'")
         element_name = attr.get("name")
-        print(element_name, element_name.value, type(element_name))
-        print(isinstance(element_name, Scalar))
         if not isinstance(element_name, Scalar):
             raise InterpreterError("Schema element must have name attribute")
 
@@ -69,8 +85,73 @@ class Interpreter:
                     self._collect_attrs(child, schema)
                 case "children":
                     self._collect_children(child, schema)
+                case "unique" | "key" | "keyref":
+                    schema.constraints.append(self._interpret_constraint(child))
+        self._check_constraints(schema)
         return schema
 
+    def _interpret_constraint(self, node: Node) -> Constraint:
+        name = node.attrs.get("name")
+        if not isinstance(name, Scalar) or not isinstance(name.value, str) or not name.value:
+            raise InterpreterError(f"Constraint '{node.name}' must have name attribute")
+        props = {}
+        for prop in node.children:
+            if prop.name not in ("selector", "field") or prop.name in props:
+                raise InterpreterError(
+                    f"Constraint '{name.value}' can only contain one selector and one field"
+                )
+            if prop.scalar is None or not isinstance(prop.scalar.value, str):
+                raise InterpreterError(f"{prop.name.capitalize()} must be a string")
+            props[prop.name] = prop.scalar.value
+        if len(props) != 2:
+            raise InterpreterError(
+                f"Constraint '{name.value}' must have selector and field"
+            )
+
+        refer = node.attrs.get("refer")
+        if node.name == "keyref":
+            if not isinstance(refer, Scalar) or not isinstance(refer.value, str):
+                raise InterpreterError(f"Keyref '{name.value}' must have refer attribute")
+            refer = refer.value
+        elif refer is not None:
+            raise InterpreterError("Only keyref can have refer attribute")
+
+        selector = props["selector"]
+        descendant = selector.startswith("//")
+        steps = tuple(selector[2:].split("/") if descendant else selector.split("/"))
+        if not all(steps):
+            raise InterpreterError(f"Invalid selector {selector!r}")
+        field_name = props["field"]
+        if not field_name or field_name == ":":
+            raise InterpreterError(f"Invalid field {field_name!r}")
+
+        return Constraint(
+            kind=node.name,
+            name=name.value,
+            selector=selector,
+            field=field_name,
+            refer=refer,
+            steps=steps,
+            descendant=descendant,
+        )
+
+    def _check_constraints(self, schema: SchemaNode) -> None:
+        names = {}
+        for constraint in schema.constraints:
+            if constraint.name in names:
+                raise InterpreterError(
+                    f"Constraint '{constraint.name}' is defined twice in element '{schema.name}'"
+                )
+            names[constraint.name] = constraint
+        for constraint in schema.constraints:
+            if constraint.kind == "keyref":
+                target = names.get(constraint.refer)
+                if target is None or target.kind == "keyref":
+                    raise InterpreterError(
+                        f"Keyref '{constraint.name}' must refer to a key or unique "
+                        f"declared in element '{schema.name}'"
+                    )
+
     def _collect_attrs(self, node: Node, schema: SchemaNode):
         for attr in node.children:
             if attr.name != "attr":
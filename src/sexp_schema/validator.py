@@ -1,7 +1,8 @@
-from .interpreter import SchemaNode
-from ..shared.model import Node
+from .interpreter import Constraint, SchemaNode
+from ..shared.model import Node, subtree_classes
 from ..errors.sexp_erros import ValidationError
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 
 TYPE_MAP = {
@@ -12,20 +13,165 @@ TYPE_MAP = {
 }
 
 
+# Значение поля ограничения, которого нет в элементе.
+MISSING = object()
+
+# Состояние сопоставления селектора: (ограничение, область, номер следующего шага).
+Matcher = Tuple[Constraint, "ConstraintScope", int]
+
+
+def _key(value: Any) -> Tuple[bool, Any]:
+    # True == 1 в Python, но для ключей это разные значения.
+    return type(value) is bool, value
+
+
+class ConstraintScope:
+    """Значения ограничений одного экземпляра объявляющего элемента:
+    множества для unique/key и ссылки keyref, проверяемые при закрытии области.
+    Общая часть Validator и codegen.Decoder:
+    >>> matchers(inherited) -> List[Matcher]: селекторы для детей элемента.
+    >>> record(constraint, value, element) -> None: значение поля выбранного элемента (MISSING, если поля нет).
+    >>> close() -> None: проверяет keyref, когда элемент закрыт.
+    """
+
+    __slots__ = ("schema", "values", "refs")
+
+    def __init__(self, schema: SchemaNode):
+        self.schema = schema
+        self.values = {c.name: set() for c in schema.constraints if c.kind != "keyref"}
+        self.refs = {c.name: [] for c in schema.constraints if c.kind == "keyref"}
+
+    def matchers(self, inherited: Iterable[Matcher]) -> List[Matcher]:
+        return [*inherited, *((c, self, 0) for c in self.schema.constraints)]
+
+    def record(self, constraint: Constraint, value: Any, element: str) -> None:
+        if value is MISSING:
+            if constraint.kind == "key":
+                raise ValidationError(
+                    f"Key '{constraint.name}' requires field '{constraint.field}' "
+                    f"in element '{element}'"
+                )
+            return
+        if constraint.kind == "keyref":
+            self.refs[constraint.name].append(value)
+            return
+        seen = self.values[constraint.name]
+        key = _key(value)
+        if key in seen:
+            raise ValidationError(
+                f"Duplicate value {value!r} for {constraint.kind} '{constraint.name}' "
+                f"in element '{self.schema.name}'"
+            )
+        seen.add(key)
+
+    def close(self) -> None:
+        for constraint in self.schema.constraints:
+            if constraint.kind == "keyref":
+                keys = self.values[constraint.refer]
+                for value in self.refs[constraint.name]:
+                    if _key(value) not in keys:
+                        raise ValidationError(
+                            f"Keyref '{constraint.name}' value {value!r} does not match "
+                            f"any '{constraint.refer}' in element '{self.schema.name}'"
+                        )
+
+
+def advance_selectors(
+    matchers: Iterable[Matcher], name: str
+) -> Tuple[List[Matcher], List[Tuple[Constraint, ConstraintScope]]]:
+    """Состояния селекторов для ребёнка name и ограничения, которые его выбирают."""
+    inherited: List[Matcher] = []
+    selected: List[Tuple[Constraint, ConstraintScope]] = []
+    for matcher in matchers:
+        constraint, scope, i = matcher
+        if constraint.descendant and i == 0:
+            inherited.append(matcher)
+        if constraint.steps[i] == name:
+            if i + 1 == len(constraint.steps):
+                selected.append((constraint, scope))
+            else:
+                inherited.append((constraint, scope, i + 1))
+    return inherited, selected
+
+
+def check_min_occurs(child_schema: SchemaNode, occurrences: int, parent: str) -> None:
+    if occurrences < child_schema.min_occurs:
+        raise ValidationError(
+            f"Element '{child_schema.name}' occurs {occurrences} times, "
+            f"minimum is {child_schema.min_occurs} (parent '{parent}')"
+        )
+
+
+def check_max_occurs(child_schema: SchemaNode, occurrences: int, parent: str) -> None:
+    if child_schema.max_occurs != "unbounded" and occurrences > child_schema.max_occurs:
+        raise ValidationError(
+            f"Element '{child_schema.name}' occurs {occurrences} times, "
+            f"maximum is {child_schema.max_occurs} (parent '{parent}')"
+        )
+
+
 class Validator:
-    def __init__(self, document: Node, schema: SchemaNode):
+    """Проверка документа по схеме.
+    >>> Validator(document, schema, memo_size=0).validate() -> bool
+
+    При memo_size > 0 одинаковые поддеревья (model.subtree_classes: имена,
+    атрибуты, значения с учётом типа и дети совпадают) проверяются по одной
+    схеме один раз: успешные пары (класс поддерева, id(SchemaNode)) хранятся
+    в LRU-кэше не более чем из memo_size записей. Внутри области
+    unique/key/keyref, селектор которой ещё может выбрать узлы поддерева,
+    кэш не используется: значения ограничений собираются при обходе.
+    Классы считаются без рекурсии и только для поддеревьев, на которых кэш
+    спрашивают; таблица классов освобождается в конце validate.
+    """
+
+    def __init__(self, document: Node, schema: SchemaNode, memo_size: int = 0):
         self.document: Node = document
         self.schema: SchemaNode = schema
+        self.memo_size: int = memo_size
+        self._classes: Dict[int, int] = {}
+        self._numbers: Dict[tuple, int] = {}
+        self._memo: OrderedDict[Tuple[int, int], None] = OrderedDict()
 
     def validate(self) -> bool:
-        self._validate_node(self.document, self.schema)
+        try:
+            self._validate_node(self.document, self.schema)
+        finally:
+            self._classes = {}
+            self._numbers = {}
+            self._memo.clear()
         return True
 
-    def _validate_node(self, document: Node, schema: SchemaNode) -> None:
+    def _validate_node(
+        self, document: Node, schema: SchemaNode, matchers: Sequence[Matcher] = ()
+    ) -> None:
+        key = None
+        if self.memo_size > 0 and document.children and not matchers:
+            key = (self._class_of(document), id(schema))
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return
+
         self._check_name(document.name, schema.name)
         self._check_value(document, schema)
         self._check_attrs(document, schema)
-        self._check_children(document, schema)
+        scope = ConstraintScope(schema) if schema.constraints else None
+        if scope is not None:
+            matchers = scope.matchers(matchers)
+        self._check_children(document, schema, matchers)
+        if scope is not None:
+            scope.close()
+
+        if key is not None:
+            self._memo[key] = None
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def _class_of(self, document: Node) -> int:
+        known = self._classes.get(id(document))
+        if known is None:
+            subtree_classes(document, classes=self._classes, numbers=self._numbers)
+            known = self._classes[id(document)]
+        return known
 
     def _check_name(self, document_name: str, schema_name: str) -> None:
         if document_name != schema_name:
@@ -66,7 +212,9 @@ class Validator:
                     f"Attribute '{name}' must have a value of type {attr_schema.value_type}"
                 )
 
-    def _check_children(self, document: Node, schema: SchemaNode) -> None:
+    def _check_children(
+        self, document: Node, schema: SchemaNode, matchers: Sequence[Matcher]
+    ) -> None:
         doc_children = defaultdict(list)
         schema_child_names = set()
         for child in document.children:
@@ -76,31 +224,21 @@ class Validator:
             schema_child_names.add(child_schema.name)
             occurrences = len(doc_children.get(child_schema.name, []))
 
-            self._check_min_occurs(child_schema, occurrences)
-            self._check_max_occurs(child_schema, occurrences)
+            check_min_occurs(child_schema, occurrences, schema.name)
+            check_max_occurs(child_schema, occurrences, schema.name)
 
             for child in doc_children.get(child_schema.name, []):
-                self._validate_node(child, child_schema)
+                child_matchers: List[Matcher] = []
+                if matchers:
+                    child_matchers, selected = advance_selectors(matchers, child.name)
+                    for constraint, scope in selected:
+                        scope.record(
+                            constraint, self._field_value(child, constraint), child.name
+                        )
+                self._validate_node(child, child_schema, child_matchers)
 
         self._check_unexpected(doc_children.keys(), schema_child_names, schema.name)
 
-    def _check_min_occurs(self, child_schema: SchemaNode, occurrences: int) -> None:
-        if occurrences < child_schema.min_occurs:
-            raise ValidationError(
-                f"Element '{child_schema.name}' occurs {occurrences} times, "
-                f"minimum is {child_schema.min_occurs} (parent '{child_schema.name}')"
-            )
-
-    def _check_max_occurs(self, child_schema: SchemaNode, occurrences: int) -> None:
-        if (
-            child_schema.max_occurs != "unbounded"
-            and occurrences > child_schema.max_occurs
-        ):
-            raise ValidationError(
-                f"Element '{child_schema.name}' occurs {occurrences} times, "
-                f"maximum is {child_schema.max_occurs} (parent '{child_schema.name}')"
-            )
-
     def _check_unexpected(
         self, doc_children: list[str], schema_child_names: set[str], schema_name: str
     ):
@@ -109,3 +247,19 @@ class Validator:
                 raise ValidationError(
                     f"Unexpected child element '{name}' in element '{schema_name}'"
                 )
+
+    def _field_value(self, document: Node, constraint: Constraint) -> Any:
+        field = constraint.field
+        if field.startswith(":"):
+            scalar = document.attrs.get(field[1:])
+        elif field == ".":
+            scalar = document.scalar
+        else:
+            children = document.children_named(field)
+            if len(children) > 1:
+                raise ValidationError(
+                    f"Field '{field}' of constraint '{constraint.name}' occurs "
+                    f"{len(children)} times in element '{document.name}'"
+                )
+            scalar = children[0].scalar if children else None
+        return MISSING if scalar is None else scalar.value
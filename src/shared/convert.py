@@ -0,0 +1,97 @@
+"""Преобразование дерева Node в структуры Python/JSON и обратно.
+
+Соответствие:
+
+    (person (:name "Alice") (age 30) (tags))
+    <->
+    {"name": "person", "attrs": {"name": "Alice"},
+     "children": [{"name": "age", "value": 30}, {"name": "tags"}]}
+
+* "name" — имя узла, обязательно;
+* "attrs" — словарь атрибутов, опускается, если атрибутов нет;
+* "value" — значение листа (str, int, float, bool или None); наличие ключа
+  означает, что узел — лист, поэтому значение null сохраняется;
+* "children" — список дочерних узлов, опускается, если он пуст.
+
+to_python/from_python обходят дерево итеративно и работают для любой глубины.
+to_json/from_json — это json.dumps(to_python(node)) и from_python(json.loads(text)):
+C-реализация модуля json рекурсивна, поэтому на деревьях глубже примерно
+sys.getrecursionlimit() уровней они выбрасывают RecursionError.
+"""
+
+import json
+from typing import Any, Dict, List
+from .model import Node, Scalar
+
+_NODE_KEYS = {"name", "attrs", "value", "children"}
+
+
+def to_python(node: Node) -> Dict[str, Any]:
+    root = _to_dict(node)
+    stack = [(node, root)] if node.children else []
+    while stack:
+        current, out = stack.pop()
+        children: List[Dict[str, Any]] = []
+        for child in current.children:
+            data = _to_dict(child)
+            children.append(data)
+            if child.children:
+                stack.append((child, data))
+        out["children"] = children
+    return root
+
+
+def from_python(obj: Dict[str, Any]) -> Node:
+    root = _from_dict(obj)
+    stack = [(obj, root)]
+    while stack:
+        data, node = stack.pop()
+        children = data.get("children")
+        if not children:
+            continue
+        if not isinstance(children, list):
+            raise ValueError(f"Children of '{node.name}' must be a list")
+        for child_data in children:
+            child = _from_dict(child_data)
+            node.children.append(child)
+            stack.append((child_data, child))
+    return root
+
+
+def to_json(node: Node, ensure_ascii: bool = False) -> str:
+    """JSON-текст дерева в формате to_python (разделители как у json.dumps)."""
+    return json.dumps(to_python(node), ensure_ascii=ensure_ascii)
+
+
+def from_json(text: str) -> Node:
+    """Дерево из JSON-текста в формате to_python."""
+    return from_python(json.loads(text))
+
+
+def _to_dict(node: Node) -> Dict[str, Any]:
+    # Значения читаются напрямую из _value, минуя свойство Scalar.value.
+    data: Dict[str, Any] = {"name": node.name}
+    if node.attrs:
+        data["attrs"] = {k: v._value for k, v in node.attrs.items()}
+    if node.scalar is not None:
+        data["value"] = node.scalar._value
+    return data
+
+
+def _from_dict(data: Any) -> Node:
+    if not isinstance(data, dict) or "name" not in data:
+        raise ValueError(f"Node must be a dict with a 'name' key, got {data!r}")
+    unknown = data.keys() - _NODE_KEYS
+    if unknown:
+        raise ValueError(f"Unknown node keys: {sorted(unknown)}")
+    if "value" in data and data.get("children"):
+        raise ValueError("A node cannot have both value and children")
+
+    attrs = data.get("attrs")
+    if attrs is not None and not isinstance(attrs, dict):
+        raise ValueError(f"Attributes of '{data['name']}' must be a dict")
+    return Node(
+        name=data["name"],
+        attrs={k: Scalar(v) for k, v in attrs.items()} if attrs else None,
+        scalar=Scalar(data["value"]) if "value" in data else None,
+    )
@@ -0,0 +1,242 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from .model import Node, Scalar, scalar_key, subtree_classes
+from .parser import Lexer, Parser
+from ..errors.sexp_erros import ParserError
+
+
+Path = Tuple[int, ...]
+
+REPLACE = "replace"
+ATTRS = "attrs"
+VALUE = "value"
+INSERT = "insert"
+DELETE = "delete"
+
+
+@dataclass
+class PatchOp:
+    kind: str
+    path: Path
+    index: int | None = None
+    node: Node | None = None
+    attrs: Dict[str, Scalar] | None = None
+    value: Scalar | None = None
+
+
+@dataclass
+class Patch:
+    """Последовательность операций, превращающая одно дерево в другое.
+    Пути — индексы дочерних узлов от корня; каждая операция адресует дерево
+    в том состоянии, в котором его оставили предыдущие операции.
+    >>> to_sexp() -> str: компактная запись патча в виде S-выражения.
+    >>> Patch.from_sexp(text: str) -> Patch: обратное преобразование.
+    """
+
+    ops: List[PatchOp] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.ops)
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def to_sexp(self) -> str:
+        return Node("patch", children=[_encode_op(op) for op in self.ops]).to_sexp()
+
+    @classmethod
+    def from_sexp(cls, text: str) -> "Patch":
+        root = Parser(Lexer(text).tokenize()).parse()
+        if root.name != "patch":
+            raise ParserError(f"Expected 'patch' node, got '{root.name}'")
+        return cls([_decode_op(node) for node in root.children])
+
+
+def diff(old: Node, new: Node) -> Patch:
+    """Строит патч, для которого apply(old, patch) даёт дерево, равное new
+    (включая типы скаляров и порядок атрибутов).
+
+    Поддеревья обоих деревьев нумеруются классами subtree_classes: совпавшее
+    поддерево пропускается за O(1) без обхода, а равенство номеров, в отличие
+    от хешей, означает точное совпадение. Дочерние списки выравниваются по
+    общим началу и концу, затем по уникальным в обоих списках классам (как в
+    patience diff); оставшиеся участки сопоставляются по позиции.
+    """
+    classes = subtree_classes(old, new)
+    ops: List[PatchOp] = []
+
+    # Операции над детьми узла выдаются раньше операций внутри этих детей,
+    # поэтому пути вложенных пар считаются в координатах нового дерева.
+    stack: List[Tuple[Node, Node, Path]] = [(old, new, ())]
+    while stack:
+        a, b, path = stack.pop()
+        if classes[id(a)] == classes[id(b)]:
+            continue
+        if a.name != b.name or a.is_leaf != b.is_leaf:
+            ops.append(PatchOp(REPLACE, path, node=b))
+            continue
+        if _attrs_key(a) != _attrs_key(b):
+            ops.append(PatchOp(ATTRS, path, attrs=dict(b.attrs)))
+        if a.is_leaf:
+            if scalar_key(a.scalar.value) != scalar_key(b.scalar.value):  # type: ignore
+                ops.append(PatchOp(VALUE, path, value=b.scalar))
+            continue
+
+        old_keys = [classes[id(c)] for c in a.children]
+        new_keys = [classes[id(c)] for c in b.children]
+        for o0, o1, n0, n1 in reversed(_segments(old_keys, new_keys)):
+            k = min(o1 - o0, n1 - n0)
+            for i in range(o1 - 1, o0 + k - 1, -1):
+                ops.append(PatchOp(DELETE, path, index=i))
+            for j in range(k, n1 - n0):
+                ops.append(PatchOp(INSERT, path, index=o0 + j, node=b.children[n0 + j]))
+            for i in range(k):
+                stack.append((a.children[o0 + i], b.children[n0 + i], path + (n0 + i,)))
+
+    return Patch(ops)
+
+
+def _attrs_key(node: Node) -> List[tuple]:
+    return [(k, scalar_key(v.value)) for k, v in node.attrs.items()]
+
+
+def apply(node: Node, patch: Patch) -> Node:
+    """Применяет патч к дереву на месте и возвращает корень
+    (новый, если патч заменяет корень целиком).
+    """
+    root = node
+    for op in patch.ops:
+        if op.kind == REPLACE and not op.path:
+            root = op.node  # type: ignore
+            continue
+
+        target = root
+        for index in op.path[:-1] if op.kind == REPLACE else op.path:
+            target = target.children[index]
+
+        match op.kind:
+            case "replace":
+                target.children[op.path[-1]] = op.node  # type: ignore
+            case "attrs":
+                target.attrs = dict(op.attrs)  # type: ignore
+            case "value":
+                target.scalar = op.value
+            case "insert":
+                target.children.insert(op.index, op.node)  # type: ignore
+            case "delete":
+                del target.children[op.index]  # type: ignore
+            case _:
+                raise ValueError(f"Unknown patch operation: {op.kind}")
+    return root
+
+
+def _segments(old: List[int], new: List[int]) -> List[Tuple[int, int, int, int]]:
+    """Участки (o0, o1, n0, n1) несовпадающих детей между якорями."""
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+
+    segments = []
+    o, n = start, start
+    for i, j in _anchors(old, new, start, old_end, new_end):
+        if i > o or j > n:
+            segments.append((o, i, n, j))
+        o, n = i + 1, j + 1
+    if old_end > o or new_end > n:
+        segments.append((o, old_end, n, new_end))
+    return segments
+
+
+def _anchors(
+    old: List[int], new: List[int], start: int, old_end: int, new_end: int
+) -> List[Tuple[int, int]]:
+    """Наибольшая возрастающая цепочка пар с классами, уникальными в обоих списках."""
+    counts: Dict[int, List[int]] = {}
+    for i in range(start, old_end):
+        entry = counts.setdefault(old[i], [0, 0, i])
+        entry[0] += 1
+    for j in range(start, new_end):
+        entry = counts.get(new[j])
+        if entry is not None:
+            entry[1] += 1
+            if entry[1] == 1:
+                entry.append(j)
+    pairs = sorted(
+        (e[2], e[3]) for e in counts.values() if e[0] == 1 and e[1] == 1
+    )
+
+    tails: List[int] = []
+    tail_pairs: List[int] = []
+    previous: List[int] = [-1] * len(pairs)
+    for p, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_pairs.append(p)
+        else:
+            tails[pos] = j
+            tail_pairs[pos] = p
+        previous[p] = tail_pairs[pos - 1] if pos else -1
+
+    chain: List[Tuple[int, int]] = []
+    p = tail_pairs[-1] if tail_pairs else -1
+    while p >= 0:
+        chain.append(pairs[p])
+        p = previous[p]
+    chain.reverse()
+    return chain
+
+
+def _encode_path(path: Path) -> Scalar:
+    return Scalar("/".join(map(str, path)))
+
+
+def _decode_path(node: Node) -> Path:
+    path = node.attrs.get("path")
+    if path is None or not isinstance(path.value, str):
+        raise ParserError(f"Patch operation '{node.name}' must have a path")
+    return tuple(int(part) for part in path.value.split("/")) if path.value else ()
+
+
+def _encode_op(op: PatchOp) -> Node:
+    attrs = {"path": _encode_path(op.path)}
+    if op.index is not None:
+        attrs["index"] = Scalar(op.index)
+    match op.kind:
+        case "replace" | "insert":
+            return Node(op.kind, attrs, children=[op.node])  # type: ignore
+        case "attrs":
+            return Node(op.kind, attrs, children=[Node("attrs", dict(op.attrs))])  # type: ignore
+        case "value":
+            return Node(op.kind, attrs, scalar=op.value)
+        case _:
+            return Node(op.kind, attrs)
+
+
+def _decode_op(node: Node) -> PatchOp:
+    path = _decode_path(node)
+    index = node.attrs.get("index")
+    match node.name:
+        case "replace" | "insert" | "attrs":
+            if len(node.children) != 1:
+                raise ParserError(f"Patch operation '{node.name}' must have one node")
+            child = node.children[0]
+            if node.name == ATTRS:
+                return PatchOp(ATTRS, path, attrs=dict(child.attrs))
+            return PatchOp(
+                node.name, path, index=None if index is None else int(index), node=child
+            )
+        case "value":
+            return PatchOp(VALUE, path, value=node.scalar)
+        case "delete":
+            if index is None:
+                raise ParserError("Patch operation 'delete' must have an index")
+            return PatchOp(DELETE, path, index=int(index))
+        case _:
+            raise ParserError(f"Unknown patch operation '{node.name}'")
@@ -0,0 +1,234 @@
+"""Потоковый (событийный) разбор S-выражений.
+
+Вход читается частями, дерево Node не строится. Вместо него выдаются события:
+
+    (START, name, attrs)  — открыт узел, attrs: Dict[str, Scalar];
+    (VALUE, scalar)       — значение листа;
+    (END, name)           — узел закрыт.
+
+START выдаётся после всех атрибутов узла — как только встречен первый
+ребёнок, значение или закрывающая скобка. Вход может содержать несколько
+выражений верхнего уровня подряд. Токены разбираются регулярным выражением
+по тем же правилам, что и Lexer; значения — LazyScalar, поэтому значения,
+которые никто не читает, не разбираются.
+"""
+
+import codecs
+import re
+from typing import Any, Iterable, Iterator, List, Tuple
+from .model import LazyScalar, Node, Scalar, decode_scalar
+from ..errors.sexp_erros import ParserError
+
+START = "start"
+VALUE = "value"
+END = "end"
+
+Event = Tuple[Any, ...]
+
+CHUNK_SIZE = 1 << 16
+
+# Виды токенов: номера групп _TOKEN, их возвращают next_token и EventParser.
+LPAREN, RPAREN, STRING, NUMBER, SYMBOL = 1, 2, 3, 4, 5
+
+_TOKEN = re.compile(
+    r'\s*(?:(\()|(\))|"([^"]*)"|(-?\d+(?:\.\d*)?)|([^\s()"][^\s()]*))'
+)
+_SPACE = re.compile(r"\s*")
+
+_SCALAR_KINDS = {STRING: "STRING", NUMBER: "NUMBER"}
+
+
+def next_token(text: str, pos: int) -> Tuple[int, str, int] | None:
+    """Токен, начинающийся в text с позиции pos (пробелы пропускаются):
+    (вид, текст, конец) или None, если токена нет — конец входа или
+    незакрытая строка. Текст строки — без кавычек."""
+    m = _TOKEN.match(text, pos)
+    if m is None:
+        return None
+    kind: int = m.lastindex  # type: ignore[assignment]
+    return kind, m.group(kind), m.end()
+
+
+def make_scalar(kind: int, text: str, lazy: bool = True) -> Scalar:
+    """Скаляр из токена вида kind; при lazy=True — LazyScalar."""
+    if kind in _SCALAR_KINDS:
+        type_name = _SCALAR_KINDS[kind]
+    elif kind == SYMBOL and text in ("true", "false"):
+        type_name = "BOOLEAN"
+    elif kind == SYMBOL and text == "null":
+        type_name = "NULL"
+    else:
+        raise ParserError(f"Expected scalar type, got {text!r}")
+    if lazy:
+        return LazyScalar(type_name, text)
+    return Scalar(decode_scalar(type_name, text))
+
+_PENDING, _OPEN, _LEAF = 0, 1, 2
+
+
+class EventParser:
+    """Инкрементальный разбор входа, поступающего частями.
+    >>> feed(chunk: str) -> List[Event]: события для завершённых токенов.
+    >>> close() -> List[Event]: дочитывает буфер и проверяет, что вход не оборвался.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        # Стек открытых узлов: [name, attrs, state].
+        self._stack: List[list] = []
+        self._paren = False
+        self._attr: str | None = None
+        self._attr_value: Scalar | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._stack)
+
+    def feed(self, chunk: str) -> List[Event]:
+        return self._run(self._buffer + chunk if self._buffer else chunk, final=False)
+
+    def close(self) -> List[Event]:
+        events = self._run(self._buffer, final=True)
+        if self._stack or self._paren:
+            raise ParserError("Unexpected end of input: unbalanced '('")
+        return events
+
+    def _run(self, text: str, final: bool) -> List[Event]:
+        events: List[Event] = []
+        pos = 0
+        end = len(text)
+        match = _TOKEN.match
+        while pos < end:
+            m = match(text, pos)
+            if m is None:
+                rest = _SPACE.match(text, pos).end()  # type: ignore
+                if rest == end:
+                    pos = end
+                    break
+                if final:
+                    raise ParserError(f"Unterminated string literal at {rest}")
+                break  # строка ещё не дочитана
+            if m.end() == end and not final and (m.lastindex or 0) >= NUMBER:
+                break  # число или символ могут продолжиться в следующей части
+            self._token(m.lastindex, m.group(m.lastindex), events)  # type: ignore
+            pos = m.end()
+        self._buffer = text[pos:]
+        return events
+
+    def _token(self, kind: int, text: str, events: List[Event]) -> None:
+        stack = self._stack
+
+        if self._paren:
+            self._paren = False
+            if kind != SYMBOL:
+                raise ParserError(f"Expected node name or attribute, got {text!r}")
+            if text.startswith(":"):
+                if not stack or stack[-1][2] != _PENDING:
+                    raise ParserError(f"Attribute {text!r} must precede children and value")
+                self._attr = text[1:]
+                return
+            if stack:
+                self._open(stack[-1], events)
+            stack.append([text, {}, _PENDING])
+            return
+
+        if self._attr is not None:
+            if self._attr_value is None:
+                self._attr_value = make_scalar(kind, text)
+                return
+            if kind != RPAREN:
+                raise ParserError(f"Expected ')' after attribute, got {text!r}")
+            stack[-1][1][self._attr] = self._attr_value
+            self._attr = None
+            self._attr_value = None
+            return
+
+        if kind == LPAREN:
+            if stack and stack[-1][2] == _LEAF:
+                raise ParserError("A node cannot have both value and children")
+            self._paren = True
+        elif kind == RPAREN:
+            if not stack:
+                raise ParserError("Unbalanced ')'")
+            frame = stack.pop()
+            self._open(frame, events)
+            events.append((END, frame[0]))
+        else:
+            if not stack:
+                raise ParserError(f"Unexpected input outside of expression: {text!r}")
+            frame = stack[-1]
+            if frame[2] != _PENDING:
+                raise ParserError("A node cannot have both value and children")
+            self._open(frame, events)
+            events.append((VALUE, make_scalar(kind, text)))
+            frame[2] = _LEAF
+
+    def _open(self, frame: list, events: List[Event]) -> None:
+        if frame[2] == _PENDING:
+            events.append((START, frame[0], frame[1]))
+            frame[2] = _OPEN
+
+def iter_chunks(source: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Части входа: source — строка, файловый объект (текстовый или бинарный,
+    UTF-8) или итерируемый набор строк/байтов."""
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+        return
+    if hasattr(source, "read"):
+        reader = source
+        source = iter(lambda: reader.read(chunk_size), reader.read(0))
+    decoder = None
+    for chunk in source:
+        if isinstance(chunk, (bytes, bytearray)):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def iter_events(source: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[Event]:
+    """События разбора source, см. iter_chunks и EventParser."""
+    parser = EventParser()
+    for chunk in iter_chunks(source, chunk_size):
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+class TreeBuilder:
+    """Инкрементальная сборка деревьев Node из событий EventParser.
+    >>> feed(events: Iterable[Event]) -> List[Node]: корни выражений, закрытых этими событиями.
+    """
+
+    def __init__(self):
+        self._stack: List[Node] = []
+
+    def feed(self, events: Iterable[Event]) -> List[Node]:
+        stack = self._stack
+        roots: List[Node] = []
+        for event in events:
+            kind = event[0]
+            if kind == START:
+                node = Node(event[1], event[2])
+                if stack:
+                    stack[-1].children.append(node)
+                stack.append(node)
+            elif kind == VALUE:
+                stack[-1].scalar = event[1]
+            else:
+                node = stack.pop()
+                if not stack:
+                    roots.append(node)
+        return roots
+
+
+def build(events: Iterable[Event]) -> Iterator[Node]:
+    """Собирает из событий деревья Node; выдаёт корни выражений верхнего уровня."""
+    builder = TreeBuilder()
+    for event in events:
+        yield from builder.feed((event,))
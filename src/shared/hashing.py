@@ -0,0 +1,46 @@
+from typing import Dict, Tuple
+from .model import Node, Scalar, scalar_key
+
+
+def share_subtrees(root: Node) -> Node:
+    """Объединяет одинаковые поддеревья (hash-consing): каждое уникальное поддерево
+    и каждый уникальный Scalar хранятся в одном экземпляре. Списки children
+    изменяются на месте, возвращается корень.
+
+    Общие поддеревья разделяются между всеми вхождениями, поэтому изменение
+    такого узла видно во всех местах документа.
+    """
+    nodes: Dict[tuple, Node] = {}
+    scalars: Dict[Tuple[type, object], Scalar] = {}
+    canonical: Dict[int, Node] = {}
+
+    def intern_scalar(scalar: Scalar) -> Scalar:
+        # Тип входит в ключ, чтобы dumps давал тот же текст, что и до объединения.
+        return scalars.setdefault(scalar_key(scalar.value), scalar)
+
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if not expanded:
+            if id(node) not in canonical:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+            continue
+
+        children = node.children
+        for i, child in enumerate(children):
+            children[i] = canonical[id(child)]
+        if node.attrs:
+            node.attrs = {k: intern_scalar(v) for k, v in node.attrs.items()}
+        if node.scalar is not None:
+            node.scalar = intern_scalar(node.scalar)
+
+        key = (
+            node.name,
+            tuple((k, id(v)) for k, v in node.attrs.items()),
+            None if node.scalar is None else id(node.scalar),
+            tuple(id(child) for child in children),
+        )
+        canonical[id(node)] = nodes.setdefault(key, node)
+
+    return canonical[id(root)]
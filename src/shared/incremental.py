@@ -0,0 +1,154 @@
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+from .model import Node
+from .parser import Lexer, Parser
+from ..errors.sexp_erros import ParserError
+
+
+class Document:
+    """Дерево Node, связанное с исходным текстом.
+    Для каждого узла хранится смещение относительно начала родителя и длина,
+    поэтому правка сдвигает только предков и следующих за правкой соседей,
+    а не все узлы после неё.
+    >>> doc = Document('(a (b 1) (c 2))')
+    >>> update(doc, 6, 7, "10")  # (a (b 10) (c 2)), разбирается только (b 10)
+    Дерево принадлежит документу: изменять его следует только через update.
+    """
+
+    def __init__(self, text: str):
+        self.text: str = text
+        self._spans: Dict[int, List[int]] = {}
+        self.root: Node = self._parse_all(text)
+
+    def span(self, path: Tuple[int, ...] = ()) -> Tuple[int, int]:
+        """Границы [start, end) узла по пути из индексов дочерних узлов."""
+        node = self.root
+        start = self._spans[id(node)][0]
+        for index in path:
+            node = node.children[index]
+            start += self._spans[id(node)][0]
+        return start, start + self._spans[id(node)][1]
+
+    def _parse_all(self, text: str) -> Node:
+        spans: Dict[int, Tuple[int, int]] = {}
+        root = _parse(text, spans)
+        self._spans.clear()
+        _store_spans(self._spans, root, spans, spans[id(root)][0])
+        return root
+
+
+def update(document: Document, edit_start: int, edit_end: int, new_text: str) -> Document:
+    """Заменяет text[edit_start:edit_end] на new_text и обновляет дерево.
+
+    Заново лексируется и разбирается только наименьшее поддерево, строго
+    содержащее правку (внутри его скобок); оно подставляется в существующее
+    дерево на место старого. Если после правки поддерево не разбирается как
+    один узел, область расширяется до родителя, в худшем случае до всего текста.
+    Если и весь текст не разбирается, документ не изменяется.
+    """
+    old_text = document.text
+    if not 0 <= edit_start <= edit_end <= len(old_text):
+        raise ValueError(f"Invalid edit range [{edit_start}, {edit_end})")
+
+    text = old_text[:edit_start] + new_text + old_text[edit_end:]
+    delta = len(new_text) - (edit_end - edit_start)
+    spans = document._spans
+
+    # chain: (node, parent, index in parent, absolute start) от корня вглубь
+    chain: List[Tuple[Node, Node | None, int, int]] = []
+    node = document.root
+    start = spans[id(node)][0]
+    parent: Node | None = None
+    index = -1
+    while start < edit_start and edit_end < start + spans[id(node)][1]:
+        chain.append((node, parent, index, start))
+        children = node.children
+        i = bisect_right(
+            children, edit_start - start - 1, key=lambda c: spans[id(c)][0]
+        ) - 1
+        if i < 0:
+            break
+        parent, index, node = node, i, children[i]
+        start += spans[id(node)][0]
+
+    for node, parent, index, start in reversed(chain):
+        end = start + spans[id(node)][1] + delta
+        new_spans: Dict[int, Tuple[int, int]] = {}
+        try:
+            new_node = _parse(text[start:end], new_spans)
+        except Exception:
+            # Любая ошибка разбора расширяет область до родителя.
+            continue
+        if new_spans[id(new_node)] != (0, end - start):
+            continue
+        _splice(document, chain, node, parent, index, new_node, new_spans, delta)
+        document.text = text
+        return document
+
+    document.root = document._parse_all(text)
+    document.text = text
+    return document
+
+
+def _splice(
+    document: Document,
+    chain: List[Tuple[Node, Node | None, int, int]],
+    old: Node,
+    parent: Node | None,
+    index: int,
+    new: Node,
+    new_spans: Dict[int, Tuple[int, int]],
+    delta: int,
+) -> None:
+    spans = document._spans
+    offset = spans[id(old)][0]
+
+    stack = [old]
+    while stack:
+        node = stack.pop()
+        del spans[id(node)]
+        stack.extend(node.children)
+    _store_spans(spans, new, new_spans, offset)
+
+    for node, level_parent, level_index, _ in chain:
+        if node is old:
+            if level_parent is not None:
+                for sibling in level_parent.children[level_index + 1 :]:
+                    spans[id(sibling)][0] += delta
+            break
+        spans[id(node)][1] += delta
+        if level_parent is not None:
+            for sibling in level_parent.children[level_index + 1 :]:
+                spans[id(sibling)][0] += delta
+
+    if parent is None:
+        document.root = new
+    else:
+        parent.children[index] = new
+
+
+def _parse(text: str, spans: Dict[int, Tuple[int, int]]) -> Node:
+    tokens = Lexer(text).tokenize()
+    parser = Parser(tokens, spans)
+    node = parser.parse()
+    if parser.pos != len(tokens) - 1:
+        raise ParserError("Expected end of input (EOF)")
+    return node
+
+
+def _store_spans(
+    spans: Dict[int, List[int]],
+    root: Node,
+    absolute: Dict[int, Tuple[int, int]],
+    root_offset: int,
+) -> None:
+    start, end = absolute[id(root)]
+    spans[id(root)] = [root_offset, end - start]
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        node_start = absolute[id(node)][0]
+        for child in node.children:
+            child_start, child_end = absolute[id(child)]
+            spans[id(child)] = [child_start - node_start, child_end - child_start]
+            stack.append(child)
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from typing import Callable, Iterator, List, Tuple
+from .model import Node
+
+
+@dataclass
+class Metrics:
+    """Счётчики и время (в секундах) по фазам одного вызова API.
+    Поля, не относящиеся к операции, остаются нулевыми.
+    """
+
+    operation: str = ""
+    tokenize_time: float = 0.0
+    token_count: int = 0
+    parse_time: float = 0.0
+    node_count: int = 0
+    max_depth: int = 0
+    spath_parse_time: float = 0.0
+    spath_eval_time: float = 0.0
+    nodes_visited: int = 0
+    schema_interpret_time: float = 0.0
+    validate_time: float = 0.0
+
+    def merge(self, other: "Metrics") -> None:
+        for f in fields(self):
+            if f.name == "operation":
+                continue
+            if f.name == "max_depth":
+                self.max_depth = max(self.max_depth, other.max_depth)
+            else:
+                setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+Callback = Callable[[Metrics], None]
+
+_collectors: ContextVar[Tuple[Metrics, ...]] = ContextVar("collectors", default=())
+_callbacks: List[Callback] = []
+
+
+def start(operation: str) -> Metrics | None:
+    """Возвращает новую запись метрик или None, если сбор метрик выключен."""
+    if not _callbacks and not _collectors.get():
+        return None
+    return Metrics(operation=operation)
+
+
+def finish(record: Metrics) -> None:
+    for collector in _collectors.get():
+        collector.merge(record)
+    for callback in list(_callbacks):
+        callback(record)
+
+
+@contextmanager
+def collect_metrics() -> Iterator[Metrics]:
+    """Суммирует метрики всех вызовов API внутри блока with.
+    >>> with collect_metrics() as m:
+    ...     loads(text)
+    >>> m.parse_time, m.node_count
+    """
+    total = Metrics(operation="total")
+    token = _collectors.set(_collectors.get() + (total,))
+    try:
+        yield total
+    finally:
+        _collectors.reset(token)
+
+
+def add_callback(callback: Callback) -> None:
+    """Регистрирует функцию, получающую Metrics после каждого вызова API."""
+    _callbacks.append(callback)
+
+
+def remove_callback(callback: Callback) -> None:
+    _callbacks.remove(callback)
+
+
+def tree_stats(root: Node) -> Tuple[int, int]:
+    """Возвращает число узлов и максимальную глубину дерева."""
+    count = 0
+    max_depth = 0
+    stack = [(root, 1)]
+    while stack:
+        node, depth = stack.pop()
+        count += 1
+        if depth > max_depth:
+            max_depth = depth
+        stack.extend((child, depth + 1) for child in node.children)
+    return count, max_depth
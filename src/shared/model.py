@@ -1,3 +1,5 @@
+import threading
+from types import MappingProxyType
 from typing import Any, Dict, List, Union
 
 
@@ -6,6 +8,8 @@ class Scalar:
     Позволяет хранить значение, получать его тип, делать сравнения и приведения к другим типам.
     """
 
+    __slots__ = ("_value",)
+
     def __init__(self, value: int | float | str | bool | None):
         self.value = value
 
@@ -47,6 +51,10 @@ class Scalar:
             return self.value == other.value
         return False
 
+    # Изменяемый скаляр не хешируется: его хеш мог бы измениться, пока он
+    # лежит в set или dict. Хешируется FrozenScalar.
+    __hash__ = None  # type: ignore[assignment]
+
     def __gt__(self, other: Any) -> bool:
         if (
             isinstance(other, Scalar)
@@ -75,6 +83,177 @@ class Scalar:
         return str(self.value)
 
 
+class LazyScalar(Scalar):
+    """Скаляр, который хранит исходный текст числа и разбирает его
+    только при первом обращении к значению (loads(..., lazy=True)).
+    Строки, true/false и null разбирать не нужно — их значение известно
+    сразу. После разбора текст отбрасывается и скаляр ведёт себя как обычный
+    Scalar; _value тоже вычисляется лениво, поэтому код, читающий _value
+    напрямую, работает без изменений.
+    """
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, kind: str, raw: str):
+        if kind == "NUMBER":
+            self._raw = raw
+        else:
+            self._value = decode_scalar(kind, raw)
+
+    def __getattr__(self, name: str):
+        if name != "_value":
+            raise AttributeError(name)
+        value = decode_scalar("NUMBER", self._raw)
+        self._value = value
+        del self._raw
+        return value
+
+    @Scalar.value.setter  # type: ignore[attr-defined]
+    def value(self, new_value: int | float | str | bool | None):
+        Scalar.value.fset(self, new_value)  # type: ignore[attr-defined]
+        if hasattr(self, "_raw"):
+            del self._raw
+
+
+def decode_scalar(kind: str, raw: str) -> int | float | str | bool | None:
+    """Значение скаляра по типу токена (TokenTypes) и его тексту."""
+    if kind == "NUMBER":
+        return float(raw) if "." in raw else int(raw)
+    if kind == "BOOLEAN":
+        return raw == "true"
+    if kind == "NULL":
+        return None
+    return raw
+
+
+class FrozenScalar(Scalar):
+    """Scalar, значение которого нельзя изменить после создания."""
+
+    __slots__ = ()
+
+    def __init__(self, value: int | float | str | bool | None):
+        if not isinstance(value, (int, float, str, bool)) and value is not None:
+            raise ValueError("Scalar value must be int, float, str, bool, or None")
+        object.__setattr__(self, "_value", value)
+
+    value = property(Scalar.value.fget)  # type: ignore
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("FrozenScalar is immutable")
+
+    def __hash__(self) -> int:
+        return hash(self._value)
+
+    def __reduce__(self):
+        return FrozenScalar, (self._value,)
+
+    @classmethod
+    def of(cls, value: Any) -> "FrozenScalar":
+        if isinstance(value, FrozenScalar):
+            return value
+        if isinstance(value, Scalar):
+            return cls(value.value)
+        return cls(value)
+
+
+INDEX_THRESHOLD = 32
+
+
+class ChildList(list):
+    """Список дочерних узлов, который считает свои изменения.
+    Номер версии позволяет индексу имён у Node понять, что список менялся.
+    Парсеры сразу собирают детей в ChildList, и Node берёт его без копирования.
+    """
+
+    __slots__ = ("_version",)
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._version = 0
+
+    def __reduce__(self):
+        return ChildList, (list(self),)
+
+    def append(self, item):
+        self._version += 1
+        super().append(item)
+
+    def extend(self, items):
+        self._version += 1
+        super().extend(items)
+
+    def insert(self, index, item):
+        self._version += 1
+        super().insert(index, item)
+
+    def pop(self, index=-1):
+        self._version += 1
+        return super().pop(index)
+
+    def remove(self, item):
+        self._version += 1
+        super().remove(item)
+
+    def clear(self):
+        self._version += 1
+        super().clear()
+
+    def sort(self, *args, **kwargs):
+        self._version += 1
+        super().sort(*args, **kwargs)
+
+    def reverse(self):
+        self._version += 1
+        super().reverse()
+
+    def __setitem__(self, index, value):
+        self._version += 1
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._version += 1
+        super().__delitem__(index)
+
+    def __iadd__(self, items):
+        self._version += 1
+        return super().__iadd__(items)
+
+    def __imul__(self, n):
+        self._version += 1
+        return super().__imul__(n)
+
+
+class _FrozenChildList(ChildList):
+    """Список детей замороженного узла: любые изменения запрещены."""
+
+    __slots__ = ()
+
+    def _reject(self, *args, **kwargs):
+        raise TypeError("Children of a frozen node cannot be modified")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _reject
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _reject
+
+    def __reduce__(self):
+        return _FrozenChildList, (list(self),)
+
+
+class _NameIndex:
+    __slots__ = ("children", "version", "epoch", "buckets")
+
+    def __init__(self, children: ChildList, epoch: int):
+        self.children = children
+        self.version = children._version
+        self.epoch = epoch
+        self.buckets: Dict[str, List["Node"]] = {}
+        for child in children:
+            bucket = self.buckets.get(child._name)
+            if bucket is None:
+                self.buckets[child._name] = [child]
+            else:
+                bucket.append(child)
+
+
 class Node:
     """Представление узла дерева.
     Узел может иметь имя, атрибуты (словарь скаляров), дочерние узлы и значение (скаляр).
@@ -82,9 +261,33 @@ class Node:
     >>> is_leaf() -> bool: возвращает True, если узел является листом (имеет значение).
     >>> add_child(child: Node): добавляет дочерний узел.
     >>> get_childs(name: str) -> List[Node]: возвращает список дочерних узлов с заданным именем.
+    >>> children_named(name: str) -> List[Node]: то же без копирования (только для чтения).
     >>> to_sexp() -> str: возвращает строковое представление узла в формате S-expr.
+    Переданный непустой список детей узел хранит как есть, без копирования.
+    Узлы сравниваются структурно (имя, атрибуты, значение, дочерние узлы).
+    Поэтому remove, index, count и `in` у children тоже структурные:
+    children.remove(x) удаляет первого ребёнка, равного x, а не обязательно
+    сам x; для поиска именно этого объекта сравнивайте через `is`.
+    Хешируются только неизменяемые узлы: замороженные (freeze) и
+    PersistentNode, их хеш вычисляется один раз. Изменяемый Node, как и
+    Scalar, не хешируется: хеш нельзя было бы ни кэшировать (изменение
+    глубже в поддереве узел не видит), ни пересчитывать за O(n) на каждый
+    вызов. Чтобы положить узел в set или dict, заморозьте его; для хешей
+    всех поддеревьев за один обход есть subtree_hashes.
+    У узлов с INDEX_THRESHOLD и более детьми при первом поиске по имени
+    строится индекс имя -> дети. Он сбрасывается при изменении children
+    (ChildList). Узел не знает родителя, поэтому переименование узла,
+    который уже попал в какой-либо индекс, сбрасывает все индексы сразу;
+    переименование остальных узлов (например, при построении дерева)
+    индексы не трогает.
+    freeze() делает поддерево неизменяемым, после чего его можно читать
+    из нескольких потоков без блокировок (см. freeze).
     """
 
+    _rename_epoch = 0
+    _name_index: _NameIndex | None = None
+    _indexed = False  # узел попал в индекс имён родителя
+
     def __init__(
         self,
         name: str,
@@ -92,11 +295,11 @@ class Node:
         children: List["Node"] | None = None,
         scalar: Scalar | None = None,
     ):
-        if scalar and children:
+        if children and scalar:
             raise ValueError("A node cannot have both value and children")
         self.name = name
         self.attrs = attrs or {}
-        self.children = children or []
+        self.children = children if children else ChildList()
         self.scalar = scalar
 
     @property
@@ -105,18 +308,48 @@ class Node:
 
     @name.setter
     def name(self, new_name: str):
-        if not isinstance(new_name, str) or not new_name:
-            raise ValueError("Node name must be a non-empty string")
-        if " " in new_name or "(" in new_name or ")" in new_name:
-            raise ValueError("Node name cannot contain spaces or parentheses")
-        if new_name.startswith(":"):
-            raise ValueError("Node name cannot start with a colon")
+        check_name(new_name)
+        if self._indexed and self._name != new_name:
+            Node._rename_epoch += 1
         self._name = new_name
 
     @property
     def is_leaf(self) -> bool:
         return self.scalar is not None
 
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self) -> "Node":
+        """Делает узел и всё его поддерево неизменяемыми, на месте.
+        Присваивание атрибутов узла, изменение children и attrs, а также
+        значений скаляров после этого вызывают ошибку. Ленивые скаляры
+        разбираются сразу, поэтому чтение замороженного дерева ничего в нём
+        не записывает; единственная запись — однократное построение индекса
+        имён под блокировкой. Обычные скаляры, общие с другими деревьями,
+        тоже замораживаются; ленивые заменяются замороженными копиями.
+        Возвращает self.
+        """
+        stack: List[Node] = [self]
+        while stack:
+            node = stack.pop()
+            if type(node) is _FrozenNode:
+                continue
+            children = node.children
+            if type(children) is not ChildList:
+                children = ChildList(children)
+            children.__class__ = _FrozenChildList
+            node.children = children
+            node.attrs = MappingProxyType(
+                {k: _freeze_scalar(v) for k, v in node.attrs.items()}
+            )
+            node.scalar = _freeze_scalar(node.scalar)
+            node.__dict__.pop("_name_index", None)
+            node.__class__ = _FrozenNode
+            stack.extend(children)
+        return self
+
     def add_child(self, *args: "Node"):
         if self.is_leaf:
             raise ValueError("Cannot add children to a leaf node")
@@ -126,8 +359,30 @@ class Node:
             self.children.append(arg)
 
     def get_childs_by_name(self, name: str) -> List["Node"]:
-        childs: List["Node"] = self.children
-        return [child for child in childs if child.name == name]
+        return list(self.children_named(name))
+
+    def children_named(self, name: str) -> List["Node"]:
+        index = self._child_index()
+        if index is None:
+            return [child for child in self.children if child._name == name]
+        return index.buckets.get(name, [])
+
+    def _child_index(self) -> _NameIndex | None:
+        children = self.children
+        if len(children) < INDEX_THRESHOLD or type(children) is not ChildList:
+            return None
+        index = self._name_index
+        if (
+            index is None
+            or index.children is not children
+            or index.version != children._version
+            or index.epoch != Node._rename_epoch
+        ):
+            index = self._name_index = _NameIndex(children, Node._rename_epoch)
+            for child in children:
+                if not child._indexed:
+                    child._indexed = True
+        return index
 
     @property
     def get_childs(self) -> List["Node"]:
@@ -144,6 +399,26 @@ class Node:
             children: str = " ".join(child.to_sexp() for child in self.children)
             return f"({" ".join(filter(None, [self.name, attrs, children]))})"
 
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            if (
+                a.name != b.name
+                or a.scalar != b.scalar
+                or len(a.children) != len(b.children)
+                or a.attrs != b.attrs
+            ):
+                return False
+            stack.extend(zip(a.children, b.children))
+        return True
+
+    __hash__ = None  # type: ignore[assignment]
+
     def __repr__(self):
         return (
             f"Node(name={self.name!r}, attrs={self.attrs!r}, "
@@ -152,3 +427,167 @@ class Node:
 
     def __str__(self):
         return self.to_sexp()
+
+
+_INDEX_LOCK = threading.Lock()
+
+
+class _FrozenNode(Node):
+    """Замороженный узел, см. Node.freeze."""
+
+    _indexed = True  # переименовать нельзя, отмечать в индексе не нужно
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"Cannot modify frozen node '{self.name}'")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"Cannot modify frozen node '{self.name}'")
+
+    @property
+    def frozen(self) -> bool:
+        return True
+
+    def freeze(self) -> "Node":
+        return self
+
+    def _child_index(self) -> _NameIndex | None:
+        # Чтение без блокировки: индекс публикуется одним присваиванием уже
+        # построенным и больше не меняется. Строится один раз под блокировкой.
+        index = self._name_index
+        if index is not None or len(self.children) < INDEX_THRESHOLD:
+            return index
+        with _INDEX_LOCK:
+            index = self._name_index
+            if index is None:
+                index = _NameIndex(self.children, Node._rename_epoch)
+                object.__setattr__(self, "_name_index", index)
+        return index
+
+    def __hash__(self) -> int:
+        cached = self.__dict__.get("_hash")
+        if cached is None:
+            cached = subtree_hashes(self)[id(self)]
+            object.__setattr__(self, "_hash", cached)
+        return cached
+
+    def __reduce__(self):
+        return _unpickle_frozen, (
+            self.name,
+            dict(self.attrs),
+            list(self.children),
+            self.scalar,
+        )
+
+
+def _unpickle_frozen(name, attrs, children, scalar) -> Node:
+    return Node(name, attrs, children, scalar).freeze()
+
+
+def _freeze_scalar(scalar: Scalar | None) -> Scalar | None:
+    if scalar is None or type(scalar) is FrozenScalar:
+        return scalar
+    value = scalar._value
+    if type(scalar) is not Scalar:
+        # У LazyScalar другой набор слотов, класс на месте не сменить.
+        return FrozenScalar(value)
+    scalar.__class__ = FrozenScalar
+    object.__setattr__(scalar, "_value", value)
+    return scalar
+
+
+def check_name(name: str) -> None:
+    if not isinstance(name, str) or not name:
+        raise ValueError("Node name must be a non-empty string")
+    if " " in name or "(" in name or ")" in name:
+        raise ValueError("Node name cannot contain spaces or parentheses")
+    if name.startswith(":"):
+        raise ValueError("Node name cannot start with a colon")
+
+
+def subtree_hashes(root: Node, exact: bool = False) -> Dict[int, int]:
+    """Структурные хеши всех поддеревьев root за один обход: id(node) -> hash.
+    Совпадающие по Node.__eq__ поддеревья получают одинаковый хеш.
+    При exact=True в хеш входят типы скаляров и порядок атрибутов, то есть
+    одинаковый хеш имеют поддеревья с одинаковым результатом to_sexp().
+    """
+    hashes: Dict[int, int] = {}
+    stack: List[tuple] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            if exact:
+                attrs: Any = tuple(
+                    (k, type(v.value), v.value) for k, v in node.attrs.items()
+                )
+                scalar: Any = (
+                    None
+                    if node.scalar is None
+                    else (type(node.scalar.value), node.scalar.value)
+                )
+            else:
+                attrs = (
+                    frozenset([(k, v._value) for k, v in node.attrs.items()])
+                    if node.attrs
+                    else None
+                )
+                scalar = None if node.scalar is None else (node.scalar.value,)
+            hashes[id(node)] = hash(
+                (
+                    node.name,
+                    attrs,
+                    scalar,
+                    tuple([hashes[id(child)] for child in node.children]),
+                )
+            )
+        elif id(node) not in hashes:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children)
+    return hashes
+
+
+def subtree_classes(
+    *roots: Node,
+    classes: Dict[int, int] | None = None,
+    numbers: Dict[tuple, int] | None = None,
+) -> Dict[int, int]:
+    """Номера классов одинаковых поддеревьев всех roots за один обход:
+    id(node) -> номер. Одинаковый номер получают поддеревья с одинаковым
+    результатом to_sexp() (типы скаляров и порядок атрибутов учитываются).
+    Ключ класса сравнивается в словаре целиком, поэтому, в отличие от хеша
+    subtree_hashes, совпадение номеров точно. Общие поддеревья обходятся один раз.
+    Переданные classes и numbers (ключ класса -> номер) дополняются на месте:
+    так номера поддеревьев, посчитанных в разных вызовах, сравнимы, а уже
+    пронумерованные поддеревья не обходятся повторно.
+    """
+    if numbers is None:
+        numbers = {}
+    if classes is None:
+        classes = {}
+    number = numbers.setdefault
+    for root in roots:
+        stack: List[tuple] = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                attrs = node.attrs
+                scalar = node.scalar
+                key = (
+                    node.name,
+                    tuple([(k, scalar_key(v._value)) for k, v in attrs.items()])
+                    if attrs
+                    else None,
+                    None if scalar is None else scalar_key(scalar._value),
+                    tuple([classes[id(child)] for child in node.children]),
+                )
+                classes[id(node)] = number(key, len(numbers))
+            elif id(node) not in classes:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+    return classes
+
+
+def scalar_key(value: Any) -> tuple:
+    """Ключ точного сравнения значения скаляра: 1, 1.0 и true различаются,
+    float сравнивается по repr, чтобы не склеивать 0.0 и -0.0.
+    """
+    return type(value), repr(value) if isinstance(value, float) else value
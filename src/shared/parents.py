@@ -0,0 +1,32 @@
+from typing import Dict, Iterator
+from .model import Node
+
+
+class ParentMap:
+    """Внешняя карта родителей, строится один раз обходом дерева.
+    Node не хранит ссылку на родителя, поэтому для навигации вверх
+    (SPath `..` и `ancestor::`) используется эта карта.
+    >>> parent(node) -> Node | None: родитель узла за O(1).
+    >>> ancestors(node) -> Iterator[Node]: предки от ближайшего к корню, O(depth).
+    Для поддеревьев, общих у нескольких родителей (share_subtrees), хранится
+    один из родителей.
+    """
+
+    def __init__(self, root: Node):
+        self.root = root
+        self._parents: Dict[int, Node] = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for child in node.children:
+                self._parents[id(child)] = node
+                stack.append(child)
+
+    def parent(self, node: Node) -> Node | None:
+        return self._parents.get(id(node))
+
+    def ancestors(self, node: Node) -> Iterator[Node]:
+        parent = self._parents.get(id(node))
+        while parent is not None:
+            yield parent
+            parent = self._parents.get(id(parent))
@@ -1,14 +1,11 @@
 from typing import List, Tuple, Dict
-from ..shared.model import Node, Scalar
+from ..shared.model import ChildList, LazyScalar, Node, Scalar
 from ..enums.parser_enums import TokenTypes, SCALAR_TYPES
-import logging
 from dataclasses import dataclass
 from ..errors.sexp_erros import ParserError
 from ..core.parser import BaseParser
 from ..core.lexer import BaseLexer
 
-logging.basicConfig(level=logging.DEBUG)
-
 
 @dataclass
 class Token:
@@ -64,6 +61,23 @@ class Lexer(BaseLexer):
 
 
 class Parser(BaseParser):
+    """Парсер списка токенов в дерево Node.
+    Если передан словарь spans, в него записываются границы каждого узла
+    в исходном тексте: id(node) -> (start, end).
+    При lazy=True значения листьев и атрибутов не разбираются сразу,
+    а сохраняются как LazyScalar с текстом токена.
+    """
+
+    def __init__(
+        self,
+        tokens: List[Token],
+        spans: Dict[int, Tuple[int, int]] | None = None,
+        lazy: bool = False,
+    ):
+        super().__init__(tokens)
+        self.spans = spans
+        self.lazy = lazy
+
     def parse(self) -> Node:
         node = self._parse_node()
         self._expect_eof(TokenTypes.EOF.name)
@@ -94,6 +108,8 @@ class Parser(BaseParser):
 
         if token.type not in SCALAR_TYPES:
             raise ParserError(f"Expected scalar type, got {token}")
+        if self.lazy:
+            return LazyScalar(token.type, token.value)
         if token.type == TokenTypes.STRING.name:
             return Scalar(token.value)
         elif token.type == TokenTypes.NUMBER.name:
@@ -109,11 +125,11 @@ class Parser(BaseParser):
         raise ParserError(f"Expected scalar type, got {token}")
 
     def _parse_node(self) -> Node:
-        self._expect(TokenTypes.LPAREN.name)
+        start = self._expect(TokenTypes.LPAREN.name).pos
 
         name: str = self._expect(TokenTypes.SYMBOL.name).value
         attrs: Dict[str, Scalar] = {}
-        children: List[Node] | None = []
+        children: List[Node] = ChildList()
         leaf_value: Scalar | None = None
 
         while self._is_attr():
@@ -124,6 +140,9 @@ class Parser(BaseParser):
         else:
             while self._peek().type == TokenTypes.LPAREN.name:
                 children.append(self._parse_node())
-        self._expect(TokenTypes.RPAREN.name)
+        end = self._expect(TokenTypes.RPAREN.name).pos + 1
 
-        return Node(name=name, attrs=attrs, children=children, scalar=leaf_value)
+        node = Node(name=name, attrs=attrs, children=children, scalar=leaf_value)
+        if self.spans is not None:
+            self.spans[id(node)] = (start, end)
+        return node
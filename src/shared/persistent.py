@@ -0,0 +1,217 @@
+"""Неизменяемые узлы с общими поддеревьями (persistent-структура).
+
+    base = from_node(loads(config_text))
+    v2 = set_in(base, ("server", "port"), 8080)
+    v3 = set_in(v2, ("server", ":host"), "example.org")
+
+set_in копирует только узлы на пути от корня до изменяемого места, все
+остальные поддеревья у версий общие, поэтому память на версию растёт
+с глубиной изменения, а не с размером документа. Узлы и скаляры нельзя
+изменить после создания, так что версии можно без блокировок читать из
+нескольких потоков.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+from .model import FrozenScalar, Node, Scalar, check_name
+
+PathSegment = int | str
+
+
+class PersistentNode:
+    """Неизменяемый вариант Node: children — кортеж, attrs — mappingproxy
+    из FrozenScalar; scalar принимает Scalar или значение, None — нет значения.
+    Хеш структурный и вычисляется один раз при создании (из уже посчитанных
+    хешей детей), сравнение сначала сверяет хеши.
+    >>> set_in(path, value) -> PersistentNode: новая версия, см. set_in.
+    >>> to_node() -> Node: изменяемая копия.
+    """
+
+    __slots__ = ("name", "attrs", "children", "scalar", "_hash")
+
+    def __init__(
+        self,
+        name: str,
+        attrs: Mapping[str, Any] | None = None,
+        children: Iterable["PersistentNode"] = (),
+        scalar: Any = None,
+    ):
+        children = tuple(children)
+        if scalar is not None and children:
+            raise ValueError("A node cannot have both value and children")
+        for child in children:
+            if not isinstance(child, PersistentNode):
+                raise ValueError("Child must be a PersistentNode")
+        check_name(name)
+        frozen = {k: FrozenScalar.of(v) for k, v in attrs.items()} if attrs else {}
+        scalar = None if scalar is None else FrozenScalar.of(scalar)
+
+        set_ = object.__setattr__
+        set_(self, "name", name)
+        set_(self, "attrs", MappingProxyType(frozen))
+        set_(self, "children", children)
+        set_(self, "scalar", scalar)
+        set_(
+            self,
+            "_hash",
+            hash(
+                (
+                    name,
+                    frozenset(frozen.items()) if frozen else None,
+                    None if scalar is None else (scalar.value,),
+                    tuple([child._hash for child in children]),
+                )
+            ),
+        )
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("PersistentNode is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("PersistentNode is immutable")
+
+    def __reduce__(self):
+        return PersistentNode, (self.name, dict(self.attrs), self.children, self.scalar)
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.scalar is not None
+
+    def get_childs_by_name(self, name: str) -> List["PersistentNode"]:
+        return [child for child in self.children if child.name == name]
+
+    def set_in(self, path: Sequence[PathSegment], value: Any) -> "PersistentNode":
+        return set_in(self, path, value)
+
+    def to_node(self) -> Node:
+        return to_node(self)
+
+    def to_sexp(self) -> str:
+        return to_node(self).to_sexp()
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, PersistentNode):
+            return NotImplemented
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            if (
+                a._hash != b._hash
+                or a.name != b.name
+                or a.scalar != b.scalar
+                or len(a.children) != len(b.children)
+                or a.attrs != b.attrs
+            ):
+                return False
+            stack.extend(zip(a.children, b.children))
+        return True
+
+    def __repr__(self):
+        return (
+            f"PersistentNode(name={self.name!r}, attrs={dict(self.attrs)!r}, "
+            f"children={list(self.children)!r}, value={self.scalar!r})"
+        )
+
+    def __str__(self):
+        return self.to_sexp()
+
+
+def from_node(root: Node) -> PersistentNode:
+    """Неизменяемая копия дерева Node. Одинаковые (по id) поддеревья, например
+    после share_subtrees, превращаются в один PersistentNode."""
+    built: Dict[int, PersistentNode] = {}
+    stack: List[Tuple[Node, bool]] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            built[id(node)] = PersistentNode(
+                node.name,
+                node.attrs,
+                [built[id(child)] for child in node.children],
+                node.scalar,
+            )
+        elif id(node) not in built:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children)
+    return built[id(root)]
+
+
+def to_node(root: PersistentNode) -> Node:
+    """Изменяемая копия: каждое вхождение общего поддерева копируется отдельно."""
+
+    def copy(node: PersistentNode) -> Node:
+        return Node(
+            node.name,
+            {k: Scalar(v.value) for k, v in node.attrs.items()},
+            None,
+            None if node.scalar is None else Scalar(node.scalar.value),
+        )
+
+    result = copy(root)
+    stack = [(root, result)]
+    while stack:
+        src, dst = stack.pop()
+        for child in src.children:
+            out = copy(child)
+            dst.children.append(out)
+            stack.append((child, out))
+    return result
+
+
+def set_in(
+    root: PersistentNode, path: Sequence[PathSegment], value: Any
+) -> PersistentNode:
+    """Возвращает новый корень, в котором по пути path стоит value.
+
+    Сегменты пути: int — индекс ребёнка, str — первый ребёнок с таким именем,
+    ":name" (только последним сегментом) — атрибут. Если value —
+    PersistentNode, он заменяет узел целиком, иначе задаёт значение листа
+    или атрибута. Пустой путь с PersistentNode возвращает сам value.
+    Копируются только узлы на пути, остальные поддеревья общие с root.
+    """
+    path = list(path)
+    attr = None
+    if path and isinstance(path[-1], str) and path[-1].startswith(":"):
+        if isinstance(value, PersistentNode):
+            raise ValueError("Attribute value must be a scalar")
+        attr = path.pop()[1:]
+
+    trail: List[Tuple[PersistentNode, int]] = []
+    node = root
+    for segment in path:
+        index = _child_index(node, segment)
+        trail.append((node, index))
+        node = node.children[index]
+
+    if attr is not None:
+        attrs = dict(node.attrs)
+        attrs[attr] = FrozenScalar.of(value)
+        new = PersistentNode(node.name, attrs, node.children, node.scalar)
+    elif isinstance(value, PersistentNode):
+        new = value
+    else:
+        if node.children:
+            raise ValueError(f"Cannot set value of non-leaf node '{node.name}'")
+        new = PersistentNode(node.name, node.attrs, (), FrozenScalar.of(value))
+
+    for parent, index in reversed(trail):
+        children = list(parent.children)
+        children[index] = new
+        new = PersistentNode(parent.name, parent.attrs, children, parent.scalar)
+    return new
+
+
+def _child_index(node: PersistentNode, segment: PathSegment) -> int:
+    if isinstance(segment, int):
+        if not 0 <= segment < len(node.children):
+            raise IndexError(f"'{node.name}' has no child #{segment}")
+        return segment
+    for i, child in enumerate(node.children):
+        if child.name == segment:
+            return i
+    raise KeyError(f"'{node.name}' has no child '{segment}'")
@@ -0,0 +1,108 @@
+import re
+from typing import Iterator, List, Tuple
+from ..errors.sexp_erros import ParserError
+
+
+_SPECIAL = re.compile(r'[()"]')
+# Сколько символов iter_record_spans сканирует до выдачи найденных границ.
+_WINDOW = 1 << 16
+
+
+def _scan(
+    text: str,
+    pos: int,
+    depth: int,
+    in_string: bool,
+    start: int,
+    spans: List[Tuple[int, int]],
+    stop: int | None = None,
+) -> Tuple[int, int, bool, int]:
+    """Сканирует text с pos до stop (по умолчанию до конца) и дописывает в
+    spans границы завершённых выражений верхнего уровня. Строки
+    обрабатываются так же, как в BaseLexer._string: всё между парными
+    кавычками пропускается. Возвращает новое состояние (pos, depth, in_string, start).
+    """
+    end = len(text) if stop is None else min(stop, len(text))
+    while pos < end:
+        if in_string:
+            quote = text.find('"', pos, end)
+            if quote < 0:
+                return end, depth, in_string, start
+            in_string = False
+            pos = quote + 1
+            continue
+
+        match = _SPECIAL.search(text, pos, end)
+        if match is None:
+            if depth == 0 and text[pos:end].strip():
+                raise ParserError(f"Unexpected input outside of expression at {pos}")
+            return end, depth, in_string, start
+
+        i = match.start()
+        if depth == 0 and text[pos:i].strip():
+            raise ParserError(f"Unexpected input outside of expression at {pos}")
+
+        ch = match.group()
+        if ch == '"':
+            if depth == 0:
+                raise ParserError(f"Unexpected string outside of expression at {i}")
+            in_string = True
+        elif ch == "(":
+            if depth == 0:
+                start = i
+            depth += 1
+        else:
+            if depth == 0:
+                raise ParserError(f"Unbalanced ')' at position {i}")
+            depth -= 1
+            if depth == 0:
+                spans.append((start, i + 1))
+        pos = i + 1
+    return pos, depth, in_string, start
+
+
+def skip_expression(text: str, pos: int) -> int:
+    """Пропускает остаток выражения, открывающая скобка которого уже прочитана:
+    pos — любая позиция внутри него вне строки. Возвращает позицию сразу после
+    парной закрывающей скобки. Токены не создаются.
+    """
+    depth = 1
+    search = _SPECIAL.search
+    while True:
+        match = search(text, pos)
+        if match is None:
+            raise ParserError("Unexpected end of input: unbalanced '('")
+        i = match.start()
+        ch = match.group()
+        if ch == '"':
+            quote = text.find('"', i + 1)
+            if quote < 0:
+                raise ParserError("Unterminated string literal")
+            pos = quote + 1
+        elif ch == "(":
+            depth += 1
+            pos = i + 1
+        else:
+            depth -= 1
+            pos = i + 1
+            if depth == 0:
+                return pos
+
+
+def iter_record_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """Выдаёт границы [start, end) S-выражений верхнего уровня в text по мере
+    сканирования, не дожидаясь конца входа. Выражения не разбираются,
+    проверяется только баланс скобок и строк.
+    """
+    pos, depth, in_string, start = 0, 0, False, 0
+    while pos < len(text):
+        spans: List[Tuple[int, int]] = []
+        pos, depth, in_string, start = _scan(
+            text, pos, depth, in_string, start, spans, pos + _WINDOW
+        )
+        yield from spans
+    if in_string:
+        raise ParserError("Unterminated string literal")
+    if depth:
+        raise ParserError("Unexpected end of input: unbalanced '('")
+
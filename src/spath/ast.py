@@ -11,6 +11,21 @@ class CompareOp(Enum):
     NEQ = "!="
 
 
+class AggregateFunc(Enum):
+    COUNT = "count"
+    SUM = "sum"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+    DISTINCT = "distinct"
+
+
+class Axis(Enum):
+    CHILD = "child"
+    PARENT = "parent"
+    ANCESTOR = "ancestor"
+
+
 class FilterTarget(Enum):
     FIELD = "field"
     ATTRIBUTE = "attribute"
@@ -29,9 +44,17 @@ class Step:
     name: Optional[str]
     recursive: bool
     filters: List[Filter]
+    axis: Axis = Axis.CHILD
 
 
 @dataclass
 class SPath:
     absolute: bool
     steps: List[Step]
+    attribute: Optional[str] = None
+
+
+@dataclass
+class Aggregate:
+    func: AggregateFunc
+    path: SPath
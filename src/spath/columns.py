@@ -0,0 +1,153 @@
+from typing import Any, Dict, Sequence
+from .ast import SPath
+from .engine import SPathEngine
+from .spath_lexer import SPathLexer
+from .spath_parser import SPathParser
+from ..shared.model import Node
+
+try:
+    import numpy as np
+except ImportError:  # numpy — необязательная зависимость (extra "numpy")
+    np = None  # type: ignore
+
+
+def extract_columns(
+    document: Node,
+    path: SPath | str,
+    fields: Sequence[str] = (),
+    attrs: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Собирает значения листьев и атрибутов всех узлов, найденных по path,
+    в типизированные массивы numpy за один проход: узлы берутся из
+    SPathEngine.iterate по одному, значения копятся блоками по BLOCK_SIZE
+    строк и переносятся в массивы столбцов срезами. Полный список узлов и
+    значений не строится.
+
+    Для каждого поля берётся первый дочерний лист с этим именем (как в фильтре
+    SPath `[field=...]`), атрибуты возвращаются под ключом ":name".
+    Результат — numpy.ma.MaskedArray по каждому ключу: маска отмечает узлы,
+    у которых значения нет (или оно null). Тип массива выводится по значениям:
+    bool, int64, float64 (при смешении int и float), str; иначе object.
+    """
+    if np is None:
+        raise ImportError(
+            "extract_columns requires numpy: pip install 'sexp-repr[numpy]'"
+        )
+    if isinstance(path, str):
+        path = SPathParser(SPathLexer(path).tokenize()).parse()
+
+    field_columns = {name: _Column() for name in fields}
+    attr_columns = {name: _Column() for name in attrs}
+    columns = [*field_columns.values(), *attr_columns.values()]
+
+    rows = 0
+    for node in SPathEngine().iterate(document, path):
+        if field_columns:
+            found: Dict[str, Any] = {}
+            for child in node.children:
+                name = child.name
+                if name in field_columns and name not in found and child.scalar is not None:
+                    found[name] = child.scalar._value
+                    if len(found) == len(field_columns):
+                        break
+            for name, column in field_columns.items():
+                column.block.append(found.get(name))
+        for name, column in attr_columns.items():
+            scalar = node.attrs.get(name)
+            column.block.append(None if scalar is None else scalar._value)
+        rows += 1
+        if rows % BLOCK_SIZE == 0:
+            for column in columns:
+                column.flush()
+
+    result: Dict[str, Any] = {}
+    for name, column in field_columns.items():
+        result[name] = column.finish(rows)
+    for name, column in attr_columns.items():
+        result[f":{name}"] = column.finish(rows)
+    return result
+
+
+BLOCK_SIZE = 4096
+
+# Вид значения -> dtype массива; строки копятся как object и в конце
+# переводятся в str, чтобы не пересоздавать массив при более длинной строке.
+_KINDS = {bool: "bool", int: "int", float: "float", str: "str"}
+_DTYPES = {"bool": bool, "int": "int64", "float": "float64", "str": object, "object": object}
+_FILLS = {"bool": False, "int": 0, "float": 0.0, "str": None, "object": None}
+
+
+class _Column:
+    """Столбец: массив и маска растут удвоением, новые значения копятся в
+    block (None — значения нет) и переносятся в массив срезом.
+    """
+
+    __slots__ = ("kind", "data", "mask", "size", "block")
+
+    def __init__(self):
+        self.kind: str | None = None
+        self.data: Any = np.zeros(0, dtype="float64")
+        self.mask: Any = np.ones(0, dtype=bool)
+        self.size = 0
+        self.block: list = []
+
+    def flush(self) -> None:
+        block = self.block
+        if not block:
+            return
+        start, end = self.size, self.size + len(block)
+        if end > len(self.mask):
+            self._grow(max(end, 2 * len(self.mask)))
+        for kind in {_KINDS.get(type(v), "object") for v in block if v is not None}:
+            self._convert(kind)
+        if self.kind is not None:
+            fill = _FILLS[self.kind]
+            values = [fill if v is None else v for v in block]
+            try:
+                self.data[start:end] = np.array(values, dtype=self.data.dtype)
+            except OverflowError:
+                self._convert("object")
+                self.data[start:end] = np.array(values, dtype=object)
+        self.mask[start:end] = np.fromiter(
+            (v is None for v in block), dtype=bool, count=len(block)
+        )
+        self.size = end
+        block.clear()
+
+    def _grow(self, capacity: int) -> None:
+        mask = np.ones(capacity, dtype=bool)
+        mask[: self.size] = self.mask[: self.size]
+        data = _allocate(capacity, self.data.dtype)
+        data[: self.size] = self.data[: self.size]
+        self.mask, self.data = mask, data
+
+    def _convert(self, kind: str) -> None:
+        if self.kind is None or kind == self.kind:
+            target = kind
+        elif {self.kind, kind} == {"int", "float"}:
+            target = "float"
+        else:
+            target = "object"
+        if target == self.kind:
+            return
+        data = self.data.astype(_DTYPES[target])
+        if data.dtype == object:
+            data[self.mask] = None
+        self.data = data
+        self.kind = target
+
+    def finish(self, rows: int) -> Any:
+        self.flush()
+        mask = self.mask[:rows]
+        data = self.data[:rows]
+        if self.kind == "str":
+            data[mask] = ""
+            data = data.astype(str)
+        return np.ma.MaskedArray(data, mask=mask)
+
+
+def _allocate(capacity: int, dtype: Any) -> Any:
+    # Пропуски заполняются 0, False или None (у столбцов object).
+    if np.dtype(dtype) == object:
+        return np.full(capacity, None, dtype=object)
+    return np.zeros(capacity, dtype=dtype)
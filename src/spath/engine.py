@@ -1,74 +1,389 @@
-from .ast import Filter, FilterTarget, SPath, Step, CompareOp
+from itertools import chain
+from time import perf_counter
+from typing import Any, Iterable, Iterator, Sequence
+from .ast import (
+    Aggregate,
+    AggregateFunc,
+    Axis,
+    Filter,
+    FilterTarget,
+    SPath,
+    Step,
+    CompareOp,
+)
+from .explain import ExplainReport, StepReport, format_path, format_step, shortcut
 from ..shared.model import Node
+from ..shared.metrics import Metrics
+from ..shared.parents import ParentMap
+
+
+_MISSING = object()
+
+
+class _StepTrie:
+    # Узел префиксного дерева запросов: ends — номера запросов, которые
+    # заканчиваются здесь, edges — следующие шаги, общие для нескольких запросов.
+    __slots__ = ("ends", "edges")
+
+    def __init__(self):
+        self.ends: list[int] = []
+        self.edges: dict[tuple, tuple[Step, "_StepTrie"]] = {}
+
+
+def _step_key(step: Step) -> tuple:
+    return (
+        step.name,
+        step.recursive,
+        step.axis,
+        tuple((f.target, f.key, f.op, type(f.value), f.value) for f in step.filters),
+    )
 
 
 class SPathEngine:
-    def evaluate(self, root: Node, spath: SPath) -> list[Node]:
+    def evaluate(
+        self, root: Node, spath: SPath, stats: Metrics | None = None
+    ) -> list[Node]:
         current = [root]
+        parents = self._parent_map(root, spath)
 
         for step in spath.steps:
-            current = self._apply_step(current, step)
+            current = self._apply_step(current, step, stats, parents)
 
         return current
 
-    def _apply_step(self, nodes: list[Node], step: Step) -> list[Node]:
-        result: list[Node] = []
+    def evaluate_many(
+        self, root: Node, spaths: Sequence[SPath], stats: Metrics | None = None
+    ) -> list[list[Node]]:
+        """Вычисляет несколько запросов за общий проход: одинаковые префиксы
+        шагов выполняются один раз (префиксное дерево), а рекурсивные шаги
+        с одного входа делят между собой обход потомков. Результат каждого
+        запроса совпадает с evaluate.
+        """
+        trie = _StepTrie()
+        for i, spath in enumerate(spaths):
+            current = trie
+            for step in spath.steps:
+                key = _step_key(step)
+                edge = current.edges.get(key)
+                if edge is None:
+                    edge = current.edges[key] = (step, _StepTrie())
+                current = edge[1]
+            current.ends.append(i)
 
-        for node in nodes:
-            if step.name is None:
-                candidates = [node]
+        parents = None
+        if any(step.axis is not Axis.CHILD for spath in spaths for step in spath.steps):
+            parents = ParentMap(root)
+
+        results: list[list[Node]] = [[] for _ in spaths]
+        stack: list[tuple[_StepTrie, list[Node]]] = [(trie, [root])]
+        while stack:
+            current, nodes = stack.pop()
+            for i in current.ends:
+                results[i] = list(nodes)
+            if not nodes:
+                continue
+
+            shared: list[tuple[Step, _StepTrie]] = []
+            for step, sub in current.edges.values():
+                if step.axis is Axis.CHILD and step.recursive and step.name is not None:
+                    shared.append((step, sub))
+                else:
+                    stack.append((sub, self._apply_step(nodes, step, stats, parents)))
+
+            if shared:
+                outputs = self._apply_recursive_many(
+                    nodes, [step for step, _ in shared], stats
+                )
+                stack.extend((sub, output) for (_, sub), output in zip(shared, outputs))
 
-            elif step.recursive:
-                candidates = [node] + self._descendants(node)
+        return results
 
+    def _apply_recursive_many(
+        self, nodes: list[Node], steps: list[Step], stats: Metrics | None = None
+    ) -> list[list[Node]]:
+        # Шаги группируются по имени. Шаги с фильтром-равенством дополнительно
+        # раскладываются по (цель, ключ) -> значение -> шаги, так что для узла
+        # проверяются только шаги с подходящим значением, а не все подряд.
+        by_name: dict[str, tuple[list[int], dict[tuple, dict[Any, list[int]]]]] = {}
+        for i, step in enumerate(steps):
+            plain, keyed = by_name.setdefault(step.name, ([], {}))  # type: ignore
+            eq = next((f for f in step.filters if f.op is CompareOp.EQ), None)
+            if eq is None:
+                plain.append(i)
             else:
-                candidates = [node] + node.children
+                keyed.setdefault((eq.target, eq.key), {}).setdefault(eq.value, []).append(i)
+        outputs: list[list[Node]] = [[] for _ in steps]
 
-            for cand in candidates:
-                if step.name is not None and cand.name != step.name:
+        # Обход потомков общий с _iter_step (_candidates), сопоставление своё:
+        # один кандидат проверяется сразу для всех шагов группы.
+        step = steps[0]
+        for node in nodes:
+            for cand in self._candidates(node, step):
+                if stats is not None:
+                    stats.nodes_visited += 1
+                group = by_name.get(cand.name)
+                if group is None:
                     continue
-                if self._apply_filters(cand, step.filters):
-                    result.append(cand)
+                plain, keyed = group
+                matched = plain
+                if keyed:
+                    matched = list(plain)
+                    for (target, key), by_value in keyed.items():
+                        lhs = self._filter_lhs(cand, target, key)
+                        if lhs is not _MISSING:
+                            matched.extend(by_value.get(lhs, ()))
+                    matched.sort()
+                for i in matched:
+                    if self._apply_filters(cand, steps[i].filters):
+                        outputs[i].append(cand)
+
+        return outputs
+
+    def iterate(
+        self, root: Node, spath: SPath, stats: Metrics | None = None
+    ) -> Iterator[Node]:
+        """Ленивый вариант evaluate: узлы выдаются по одному в том же порядке,
+        промежуточные списки не строятся.
+        """
+        current: Iterator[Node] = iter((root,))
+        parents = self._parent_map(root, spath)
+
+        for step in spath.steps:
+            current = self._iter_step(current, step, stats, parents)
+
+        return current
+
+    def _parent_map(self, root: Node, spath: SPath) -> ParentMap | None:
+        if all(step.axis is Axis.CHILD for step in spath.steps):
+            return None
+        return ParentMap(root)
+
+    def values(self, root: Node, spath: SPath) -> Iterator[Any]:
+        """Значения найденных узлов: атрибута spath.attribute, если он задан,
+        иначе значения листьев (узлы без значения пропускаются).
+        """
+        return self._values(self.iterate(root, spath), spath.attribute)
+
+    def _values(self, nodes: Iterable[Node], attribute: str | None) -> Iterator[Any]:
+        for node in nodes:
+            if attribute is not None:
+                scalar = node.attrs.get(attribute)
+            else:
+                scalar = node.scalar
+            if scalar is not None:
+                yield scalar.value
 
-        return result
+    def aggregate(
+        self, root: Node, aggregate: Aggregate, stats: Metrics | None = None
+    ) -> Any:
+        """Вычисляет агрегатную функцию потоково, не собирая список узлов.
+        count без атрибута считает узлы; sum и avg учитывают только числа;
+        min и max — все значения, кроме null; distinct возвращает уникальные
+        значения в порядке первого появления.
+        """
+        return self.fold(aggregate, self.iterate(root, aggregate.path, stats))
 
-    def _descendants(self, node: Node) -> list[Node]:
-        result = []
+    def fold(self, aggregate: Aggregate, nodes: Iterable[Node]) -> Any:
+        """Агрегатная функция над уже найденными узлами пути aggregate.path."""
+        func = aggregate.func
+        attribute = aggregate.path.attribute
+
+        if func is AggregateFunc.COUNT:
+            items = nodes if attribute is None else self._values(nodes, attribute)
+            return sum(1 for _ in items)
+
+        if func is AggregateFunc.DISTINCT:
+            seen: dict = {}
+            for value in self._values(nodes, attribute):
+                seen.setdefault((type(value), value), value)
+            return list(seen.values())
+
+        if func in (AggregateFunc.SUM, AggregateFunc.AVG):
+            total: int | float = 0
+            count = 0
+            for value in self._values(nodes, attribute):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    total += value
+                    count += 1
+            if func is AggregateFunc.SUM:
+                return total
+            return total / count if count else None
+
+        best = None
+        for value in self._values(nodes, attribute):
+            if value is None:
+                continue
+            try:
+                if (
+                    best is None
+                    or (func is AggregateFunc.MIN and value < best)
+                    or (func is AggregateFunc.MAX and value > best)
+                ):
+                    best = value
+            except TypeError:
+                raise ValueError(
+                    f"Cannot compare {type(value).__name__} with {type(best).__name__} in {func.value}()"
+                )
+        return best
+
+    def _candidates(
+        self,
+        node: Node,
+        step: Step,
+        parents: ParentMap | None = None,
+        visited: set[int] | None = None,
+    ) -> Iterator[Node]:
+        """Кандидаты шага для одного входного узла, включая сам узел у шагов
+        вниз. Для шагов вверх общие предки обходятся один раз: дойдя до уже
+        просмотренного (visited) узла, выше можно не подниматься. Итого
+        O(depth) на узел без повторов.
+        """
+        if step.axis is Axis.CHILD:
+            if step.name is None:
+                return iter((node,))
+            if step.recursive:
+                return chain((node,), self._iter_descendants(node))
+            return chain((node,), self._children(node, step.name))
+        assert parents is not None and visited is not None
+        if step.axis is Axis.PARENT:
+            parent = parents.parent(node)
+            ancestors: Iterable[Node] = () if parent is None else (parent,)
+        else:
+            ancestors = parents.ancestors(node)
+        return self._unvisited(ancestors, visited)
+
+    def _unvisited(self, nodes: Iterable[Node], visited: set[int]) -> Iterator[Node]:
+        for node in nodes:
+            if id(node) in visited:
+                return
+            visited.add(id(node))
+            yield node
+
+    def _iter_step(
+        self,
+        nodes: Iterable[Node],
+        step: Step,
+        stats: Metrics | StepReport | None = None,
+        parents: ParentMap | None = None,
+    ) -> Iterator[Node]:
+        """Один шаг запроса над входными узлами — общий для evaluate, iterate,
+        explain и evaluate_many. stats — Metrics (считаются просмотренные
+        кандидаты) или StepReport (счётчики explain), может быть None.
+        """
+        name = step.name
+        filters = step.filters
+        report = stats if isinstance(stats, StepReport) else None
+        metrics = stats if report is None else None
+        visited: set[int] | None = None if step.axis is Axis.CHILD else set()
+
+        indexed = (
+            report is not None
+            and step.axis is Axis.CHILD
+            and name is not None
+            and not step.recursive
+        )
+
+        for node in nodes:
+            if indexed and node._child_index() is not None:
+                report.indexed += 1
+            for cand in self._candidates(node, step, parents, visited):
+                if report is not None:
+                    report.candidates += 1
+                elif metrics is not None:
+                    metrics.nodes_visited += 1
+                if name is not None and cand.name != name:
+                    continue
+                if report is not None:
+                    report.name_matched += 1
+                passed = True
+                for flt in filters:
+                    if report is not None:
+                        report.filters_run += 1
+                    if not self._match_filter(cand, flt):
+                        passed = False
+                        break
+                if passed:
+                    if report is not None and filters:
+                        report.filters_passed += 1
+                    yield cand
+
+    def _iter_descendants(self, node: Node) -> Iterator[Node]:
         stack = list(node.children)
 
         while stack:
             cur = stack.pop()
-            result.append(cur)
+            yield cur
             stack.extend(cur.children)
 
-        return result
+    def _apply_step(
+        self,
+        nodes: list[Node],
+        step: Step,
+        stats: Metrics | StepReport | None = None,
+        parents: ParentMap | None = None,
+    ) -> list[Node]:
+        return list(self._iter_step(nodes, step, stats, parents))
+
+    def explain(self, root: Node, spath: SPath) -> ExplainReport:
+        """Выполняет запрос как evaluate и возвращает отчёт по каждому шагу."""
+        report = ExplainReport(path=format_path(spath))
+        current = [root]
+        started = perf_counter()
+        parents = self._parent_map(root, spath)
+
+        for i, step in enumerate(spath.steps):
+            stats = StepReport(
+                step=format_step(step, i == 0, spath.absolute),
+                source=(
+                    "parent"
+                    if step.axis is Axis.PARENT
+                    else "ancestors"
+                    if step.axis is Axis.ANCESTOR
+                    else "self"
+                    if step.name is None
+                    else "descendants" if step.recursive else "children"
+                ),
+                input_size=len(current),
+            )
+            step_started = perf_counter()
+            current = self._apply_step(current, step, stats, parents)
+            stats.elapsed = perf_counter() - step_started
+            stats.output_size = len(current)
+            stats.shortcut = shortcut(step, stats)
+            report.steps.append(stats)
+
+        report.elapsed = perf_counter() - started
+        report.result_size = len(current)
+        return report
+
+    def _children(self, node: Node, name: str) -> list[Node]:
+        # Дети с нужным именем из индекса, если он есть у узла; иначе все дети.
+        index = node._child_index()
+        if index is None:
+            return node.children
+        return index.buckets.get(name, [])
 
     def _apply_filters(self, node: Node, filters: list[Filter]) -> bool:
         return all(self._match_filter(node, f) for f in filters)
 
     def _match_filter(self, node: Node, flt: Filter) -> bool:
-        if flt.target is FilterTarget.ATTRIBUTE:
-            if flt.key not in node.attrs:
-                return False
-            lhs = node.attrs[flt.key].value
-
-        elif flt.target is FilterTarget.FIELD:
-            fields = [
-                c.scalar.value for c in node.children if c.name == flt.key and c.is_leaf  # type: ignore
-            ]
-            if not fields:
-                return False
-            lhs = fields[0]
+        lhs = self._filter_lhs(node, flt.target, flt.key)
+        if lhs is _MISSING:
+            return False
+        return self._compare(lhs, flt.op, flt.value)
 
-        else:
-            print("!!!")
-            print("!!!")
-            print("!!!")
-            print(flt.target.__class__.__module__)
-            print(FilterTarget.__module__)
-            raise ValueError(f"Unknown filter target: {flt.target}")
+    def _filter_lhs(self, node: Node, target: FilterTarget, key: str) -> Any:
+        if target is FilterTarget.ATTRIBUTE:
+            scalar = node.attrs.get(key)
+            return _MISSING if scalar is None else scalar.value
 
-        return self._compare(lhs, flt.op, flt.value)
+        if target is FilterTarget.FIELD:
+            for child in node.children_named(key):
+                if child.scalar is not None:
+                    return child.scalar.value
+            return _MISSING
+
+        raise ValueError(f"Unknown filter target: {target}")
 
     def _compare(self, lhs, op: CompareOp, rhs) -> bool:
         if op is CompareOp.EQ:
@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+from .ast import Axis, Filter, FilterTarget, SPath, Step
+
+
+@dataclass
+class StepReport:
+    step: str
+    source: str
+    input_size: int = 0
+    candidates: int = 0
+    name_matched: int = 0
+    filters_run: int = 0
+    filters_passed: int = 0
+    output_size: int = 0
+    elapsed: float = 0.0
+    indexed: int = 0
+    shortcut: Optional[str] = None
+
+
+@dataclass
+class ExplainReport:
+    path: str
+    steps: List[StepReport] = field(default_factory=list)
+    result_size: int = 0
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        header = (
+            f"{'step':<24} {'source':<12} {'input':>7} {'cands':>8} {'named':>7} "
+            f"{'filters':>8} {'passed':>7} {'output':>7} {'ms':>9}  shortcut"
+        )
+        lines = [f"EXPLAIN ANALYZE {self.path}", header, "-" * len(header)]
+        for s in self.steps:
+            lines.append(
+                f"{s.step:<24} {s.source:<12} {s.input_size:>7} {s.candidates:>8} "
+                f"{s.name_matched:>7} {s.filters_run:>8} {s.filters_passed:>7} "
+                f"{s.output_size:>7} {s.elapsed * 1e3:>9.3f}  {s.shortcut or '-'}"
+            )
+        lines.append(f"result: {self.result_size} node(s) in {self.elapsed * 1e3:.3f} ms")
+        return "\n".join(lines)
+
+
+def format_filter(flt: Filter) -> str:
+    prefix = ":" if flt.target is FilterTarget.ATTRIBUTE else ""
+    value = flt.value
+    if isinstance(value, str):
+        literal = f'"{value}"'
+    elif value is None:
+        literal = "null"
+    elif isinstance(value, bool):
+        literal = "true" if value else "false"
+    else:
+        literal = str(value)
+    return f"[{prefix}{flt.key}{flt.op.value}{literal}]"
+
+
+def format_step(step: Step, first: bool, absolute: bool) -> str:
+    if step.recursive:
+        axis = "//"
+    elif not first or absolute:
+        axis = "/"
+    else:
+        axis = ""
+    if step.axis is Axis.PARENT:
+        name = ".." if step.name is None else f"parent::{step.name}"
+    elif step.axis is Axis.ANCESTOR:
+        name = f"ancestor::{step.name}"
+    else:
+        name = step.name if step.name is not None else "."
+    return axis + name + "".join(format_filter(f) for f in step.filters)
+
+
+def format_path(spath: SPath) -> str:
+    text = "".join(
+        format_step(step, i == 0, spath.absolute) for i, step in enumerate(spath.steps)
+    )
+    if spath.attribute is not None:
+        text += f"/:{spath.attribute}"
+    return text
+
+
+def shortcut(step: Step, report: StepReport) -> Optional[str]:
+    """Способ доступа, которым движок реально выполнил шаг (по заполненному
+    отчёту), или None, если шаг перебирал кандидатов без сокращений.
+    """
+    if report.input_size == 0:
+        return "empty input, step skipped"
+    if step.axis is not Axis.CHILD:
+        return "parent map, O(depth) per node"
+    if step.name is None and not step.filters:
+        return "identity step"
+    if report.indexed:
+        return f"child name index on {report.indexed} of {report.input_size} node(s)"
+    return None
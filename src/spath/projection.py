@@ -0,0 +1,114 @@
+from typing import Dict, List, Tuple
+from .ast import SPath
+from .stream import State, StreamMatcher
+from ..errors.sexp_erros import ParserError
+from ..shared.events import LPAREN, RPAREN, SYMBOL, make_scalar, next_token
+from ..shared.model import Node, Scalar
+from ..shared.scanner import skip_expression
+
+
+class _Frame:
+    __slots__ = ("node", "state", "build", "keep", "had_children")
+
+    def __init__(self, node: Node, state: State | None, build: bool):
+        self.node = node
+        self.state = state
+        self.build = build
+        self.keep = False
+        # Были ли дети, в том числе пропущенные и не попавшие в node.children.
+        self.had_children = False
+
+
+def project(text: str, spath: SPath | str, lazy: bool = False) -> Node:
+    """Разбирает только ту часть документа, которая нужна для пути spath.
+
+    Строятся корень, узлы на пути к найденным поддеревьям и сами найденные
+    поддеревья целиком; остальные поддеревья пропускаются подсчётом скобок
+    (scanner.skip_expression), без токенов и узлов. Поддерево пропускается,
+    как только по имени (или по атрибутам) ясно, что в нём нет совпадений.
+    path(project(text, p), p) даёт те же узлы, что path(loads(text), p).
+    Поддерживается то же подмножество SPath, что и в StreamMatcher.
+    Синтаксис пропущенных поддеревьев не проверяется — только парность
+    скобок и закрытие строк (skip_expression).
+    """
+    matcher = StreamMatcher(spath)
+
+    def token(pos: int) -> Tuple[int, str, int]:
+        found = next_token(text, pos)
+        if found is None:
+            if text.find('"', pos) >= 0:
+                raise ParserError("Unterminated string literal")
+            raise ParserError("Unexpected end of input")
+        return found
+
+    def attrs_at(pos: int) -> Tuple[Dict[str, Scalar], int]:
+        # Атрибуты (:key value) идут сразу после имени узла.
+        attrs: Dict[str, Scalar] = {}
+        while True:
+            paren = next_token(text, pos)
+            if paren is None or paren[0] != LPAREN:
+                return attrs, pos
+            key = next_token(text, paren[2])
+            if key is None or key[0] != SYMBOL or not key[1].startswith(":"):
+                return attrs, pos
+            kind, raw, pos = token(key[2])
+            attrs[key[1][1:]] = make_scalar(kind, raw, lazy)
+            kind, raw, pos = token(pos)
+            if kind != RPAREN:
+                raise ParserError(f"Expected ')' after attribute, got {raw!r}")
+
+    kind, raw, pos = token(0)
+    if kind != LPAREN:
+        raise ParserError(f"Expected token of type LPAREN, got {raw!r}")
+    kind, name, pos = token(pos)
+    if kind != SYMBOL:
+        raise ParserError(f"Expected token of type SYMBOL, got {name!r}")
+    attrs, pos = attrs_at(pos)
+    state = matcher.start(name, attrs)
+    root = _Frame(Node(name, attrs), state, state is not None and matcher.selects(state))
+    stack: List[_Frame] = [root]
+
+    while stack:
+        frame = stack[-1]
+        kind, raw, pos = token(pos)
+
+        if kind == LPAREN:
+            if frame.node.scalar is not None:
+                raise ParserError("A node cannot have both value and children")
+            frame.had_children = True
+            kind, name, pos = token(pos)
+            if kind != SYMBOL or name.startswith(":"):
+                raise ParserError(f"Expected node name, got {name!r}")
+            if not frame.build and not (
+                frame.state is not None and matcher.may_enter(frame.state, name)
+            ):
+                pos = skip_expression(text, pos)
+                continue
+            attrs, pos = attrs_at(pos)
+            state = None if frame.state is None else matcher.enter(frame.state, name, attrs)
+            if not frame.build and state is None:
+                pos = skip_expression(text, pos)
+                continue
+            build = frame.build or (state is not None and matcher.selects(state))
+            stack.append(_Frame(Node(name, attrs), state, build))
+
+        elif kind == RPAREN:
+            stack.pop()
+            node = frame.node
+            if frame.state is not None and matcher.selects(frame.state) and matcher.accepts(node):
+                frame.keep = True
+            if stack:
+                parent = stack[-1]
+                if frame.keep:
+                    parent.keep = True
+                if frame.keep or parent.build:
+                    parent.node.children.append(node)
+
+        else:
+            if frame.had_children or frame.node.scalar is not None:
+                raise ParserError("A node cannot have both value and children")
+            frame.node.scalar = make_scalar(kind, raw, lazy)
+
+    if text[pos:].strip():
+        raise ParserError("Expected end of input (EOF)")
+    return root.node
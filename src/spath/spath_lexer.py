@@ -35,6 +35,12 @@ class SPathLexer(BaseLexer):
                 case "]":
                     tokens.append(Token(SPathTypes.RBRACKET.name, ch, self.pos))
                     self._advance()
+                case "(":
+                    tokens.append(Token(SPathTypes.LPAREN.name, ch, self.pos))
+                    self._advance()
+                case ")":
+                    tokens.append(Token(SPathTypes.RPAREN.name, ch, self.pos))
+                    self._advance()
                 case '"':
                     tokens.append(self._string(token_type=SPathTypes.STRING.name))
                 case _ if ch.isdigit() or (ch == "-" and self._peek(1).isdigit()):
@@ -55,6 +61,8 @@ class SPathLexer(BaseLexer):
             else:
                 break
 
+        if not value:
+            raise ParserError(f"Unexpected character '{self._peek()}' at position {start_pos}")
         if value in ("true", "false"):
             return Token(SPathTypes.BOOLEAN.name, value, start_pos)
         elif value == "null":
@@ -10,6 +10,9 @@ from ..spath.ast import (
     Filter,
     FilterTarget,
     CompareOp,
+    Aggregate,
+    AggregateFunc,
+    Axis,
 )
 
 
@@ -22,11 +25,36 @@ TYPES_TO_PYTYPES: dict = {
 
 
 class SPathParser(BaseParser):
-    def parse(self) -> SPath:
+    def parse(self) -> SPath | Aggregate:
+        if self._is_aggregate():
+            aggregate = self._parse_aggregate()
+            self._expect(SPathTypes.EOF.name)
+            return aggregate
         path = self._parse_path()
         self._expect_eof(SPathTypes.EOF.name)
         return path
 
+    def _is_aggregate(self) -> bool:
+        t1 = self._peek()
+        t2 = self._peek(1)
+        return (
+            t1 is not None
+            and t2 is not None
+            and t1.type == SPathTypes.IDENT.name
+            and t2.type == SPathTypes.LPAREN.name
+        )
+
+    def _parse_aggregate(self) -> Aggregate:
+        token = self._expect(SPathTypes.IDENT.name)
+        try:
+            func = AggregateFunc(token.value)
+        except ValueError:
+            raise ParserError(f"Unknown function '{token.value}' at position {token.pos}")
+        self._expect(SPathTypes.LPAREN.name)
+        path = self._parse_path()
+        self._expect(SPathTypes.RPAREN.name)
+        return Aggregate(func=func, path=path)
+
     def _parse_path(self) -> SPath:
         absolute = False
         steps: List[Step] = []
@@ -45,31 +73,49 @@ class SPathParser(BaseParser):
         ):
             steps.append(self._parse_step(recursive=False))
 
+        attribute = None
         while self._peek_type() in (
             SPathTypes.SLASH.name,
             SPathTypes.DOUBLE_SLASH.name,
         ):
             recursive = self._peek_type() == SPathTypes.DOUBLE_SLASH.name
             self._advance()
+            if not recursive and self._peek_type() == SPathTypes.COLON.name:
+                self._advance()
+                attribute = self._expect(SPathTypes.IDENT.name).value
+                break
             steps.append(self._parse_step(recursive=recursive))
 
         if not steps:
             raise ParserError("Empty path")
 
-        return SPath(absolute=absolute, steps=steps)
+        return SPath(absolute=absolute, steps=steps, attribute=attribute)
 
     def _parse_step(self, recursive: bool) -> Step:
         token = self._peek()
+        axis = Axis.CHILD
 
         if token.type == SPathTypes.DOT.name:
             self._advance()
             name = None
+            if self._peek_type() == SPathTypes.DOT.name:
+                self._advance()
+                axis = Axis.PARENT
         elif token.type == SPathTypes.IDENT.name:
-            name = token.value
             self._advance()
+            if self._is_axis(token):
+                axis = Axis(token.value)
+                self._advance()
+                self._advance()
+                name = self._expect(SPathTypes.IDENT.name).value
+            else:
+                name = token.value
         else:
             raise ParserError(f"Expected step, got {token}")
 
+        if recursive and axis is not Axis.CHILD:
+            raise ParserError(f"'//' cannot be followed by {axis.value} axis")
+
         filters = []
         while self._peek_type() == SPathTypes.LBRACKET.name:
             filters.append(self._parse_filter())
@@ -78,6 +124,18 @@ class SPathParser(BaseParser):
             name=name,
             recursive=recursive,
             filters=filters,
+            axis=axis,
+        )
+
+    def _is_axis(self, token) -> bool:
+        t1 = self._peek()
+        t2 = self._peek(1)
+        return (
+            token.value in (Axis.PARENT.value, Axis.ANCESTOR.value)
+            and t1 is not None
+            and t2 is not None
+            and t1.type == SPathTypes.COLON.name
+            and t2.type == SPathTypes.COLON.name
         )
 
     def _parse_filter(self) -> Filter:
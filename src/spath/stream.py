@@ -0,0 +1,190 @@
+from typing import Any, FrozenSet, Iterable, Iterator, List, Tuple
+from .ast import Aggregate, Axis, FilterTarget, SPath, Step
+from .engine import SPathEngine
+from .spath_lexer import SPathLexer
+from .spath_parser import SPathParser
+from ..shared.events import END, START, VALUE, Event
+from ..shared.model import Node
+
+_EMPTY: FrozenSet[int] = frozenset()
+
+# Состояние сопоставления открытого узла: (states, deep).
+# states — число пройденных шагов, после которых узел входит в
+# промежуточный результат; deep — состояния узла и его предков, из которых
+# следующий шаг рекурсивный (//).
+State = Tuple[FrozenSet[int], FrozenSet[int]]
+
+
+class StreamMatcher:
+    """Сопоставление SPath с потоком событий разбора (shared.events) без
+    построения всего дерева. Узел выдаётся, как только прочитана его
+    закрывающая скобка; строится только поддерево узла, который может
+    подойти под путь, остальное отбрасывается.
+
+    Поддерживаемое подмножество: шаги `name`, `//name`, `.`, фильтры по
+    атрибутам на любом шаге, фильтры по дочерним полям — только на последнем
+    шаге (проверяются при закрытии узла), завершающий `/:attr`. Оси `..`,
+    `parent::`, `ancestor::` и агрегатные функции не поддерживаются.
+
+    Каждое выражение верхнего уровня считается отдельным документом.
+    Найденные узлы — те же, что вернул бы evaluate, но каждый выдаётся один
+    раз, в порядке закрытия (вложенный узел раньше внешнего).
+
+    Для разборщиков, которые сами обходят вход (spath.projection), есть
+    пошаговый интерфейс; None вместо State значит, что ни узел, ни его
+    потомки под путь не подойдут:
+    >>> start(name, attrs) -> State | None: состояние корня.
+    >>> enter(parent: State, name, attrs) -> State | None: состояние ребёнка.
+    >>> may_enter(parent: State, name) -> bool: может ли подойти ребёнок с таким именем, до чтения атрибутов.
+    >>> selects(state: State) -> bool: узел выбран путём, если пройдёт accepts.
+    >>> accepts(node: Node) -> bool: фильтры по дочерним полям на закрытом узле.
+    """
+
+    def __init__(self, spath: SPath | str):
+        if isinstance(spath, str):
+            spath = SPathParser(SPathLexer(spath).tokenize()).parse()
+        if isinstance(spath, Aggregate):
+            raise ValueError("Aggregate functions are not supported in streaming mode")
+        steps = spath.steps
+        for i, step in enumerate(steps):
+            if step.axis is not Axis.CHILD:
+                raise ValueError(f"Axis {step.axis.value} is not supported in streaming mode")
+            if i < len(steps) - 1 and any(
+                f.target is FilterTarget.FIELD for f in step.filters
+            ):
+                raise ValueError(
+                    "Field filters are supported only on the last step in streaming mode"
+                )
+        self.spath = spath
+        self._steps: List[Step] = steps
+        self._final = len(steps)
+        last = steps[-1] if steps else None
+        self._field_filters = (
+            [f for f in last.filters if f.target is FilterTarget.FIELD] if last else []
+        )
+        self._engine = SPathEngine()
+
+    def match(self, events: Iterable[Event]) -> Iterator[Any]:
+        """Найденные узлы (или значения атрибута для пути с `/:attr`)."""
+        attribute = self.spath.attribute
+        for node in self._match(events):
+            if attribute is None:
+                yield node
+            elif attribute in node.attrs:
+                yield node.attrs[attribute]
+
+    def start(self, name: str, attrs: dict) -> State | None:
+        states = self._closure({0}, name, attrs)
+        deep = self._deep(_EMPTY, states)
+        return (states, deep) if states or deep else None
+
+    def enter(self, parent: State, name: str, attrs: dict) -> State | None:
+        p_states, p_deep = parent
+        states = self._enter(p_states, p_deep, name, attrs)
+        deep = self._deep(p_deep, states)
+        return (states, deep) if states or deep else None
+
+    def may_enter(self, parent: State, name: str) -> bool:
+        p_states, p_deep = parent
+        # Под активным шагом // совпадение может найтись в любом потомке.
+        if p_deep:
+            return True
+        for i in p_states:
+            if i < self._final:
+                step = self._steps[i]
+                if not step.recursive and step.name == name:
+                    return True
+        return False
+
+    def selects(self, state: State) -> bool:
+        return self._final in state[0]
+
+    def accepts(self, node: Node) -> bool:
+        return all(self._engine._match_filter(node, f) for f in self._field_filters)
+
+    def _match(self, events: Iterable[Event]) -> Iterator[Node]:
+        final = self._final
+        # Кадр открытого узла: (state, node). node — строящийся Node или
+        # None, если узел и его предки не могут попасть в результат.
+        stack: List[Tuple[State | None, Node | None]] = []
+        dead = (None, None)
+
+        for event in events:
+            kind = event[0]
+            if kind == START:
+                name, attrs = event[1], event[2]
+                if not stack:
+                    state = self.start(name, attrs)
+                    parent = None
+                else:
+                    p_state, parent = stack[-1]
+                    if p_state is None and parent is None:
+                        stack.append(dead)
+                        continue
+                    state = None if p_state is None else self.enter(p_state, name, attrs)
+
+                node = None
+                if parent is not None or (state is not None and final in state[0]):
+                    node = Node(name, attrs)
+                    if parent is not None:
+                        parent.children.append(node)
+                stack.append((state, node))
+
+            elif kind == VALUE:
+                node = stack[-1][1]
+                if node is not None:
+                    node.scalar = event[1]
+
+            elif kind == END:
+                state, node = stack.pop()
+                if state is not None and final in state[0] and self.accepts(node):  # type: ignore
+                    yield node  # type: ignore
+
+    def _matches(self, step: Step, name: str, attrs: dict) -> bool:
+        if step.name is not None and step.name != name:
+            return False
+        for flt in step.filters:
+            if flt.target is FilterTarget.ATTRIBUTE:
+                scalar = attrs.get(flt.key)
+                if scalar is None or not self._engine._compare(
+                    scalar.value, flt.op, flt.value
+                ):
+                    return False
+        return True
+
+    def _enter(
+        self, p_states: FrozenSet[int], p_deep: FrozenSet[int], name: str, attrs: dict
+    ) -> FrozenSet[int]:
+        steps = self._steps
+        entered = set()
+        for i in p_states:
+            if i < self._final:
+                step = steps[i]
+                if step.name is not None and not step.recursive and self._matches(step, name, attrs):
+                    entered.add(i + 1)
+        for i in p_deep:
+            if self._matches(steps[i], name, attrs):
+                entered.add(i + 1)
+        return self._closure(entered, name, attrs) if entered else _EMPTY
+
+    def _closure(self, states: set, name: str, attrs: dict) -> FrozenSet[int]:
+        # Шаг может выбрать и сам текущий узел (см. SPathEngine._apply_step),
+        # поэтому из каждого состояния пробуем следующий шаг на том же узле.
+        steps = self._steps
+        pending = list(states)
+        while pending:
+            i = pending.pop()
+            if i < self._final and i + 1 not in states:
+                if self._matches(steps[i], name, attrs):
+                    states.add(i + 1)
+                    pending.append(i + 1)
+        return frozenset(states)
+
+    def _deep(self, p_deep: FrozenSet[int], states: FrozenSet[int]) -> FrozenSet[int]:
+        steps = self._steps
+        own = [
+            i
+            for i in states
+            if i < self._final and steps[i].recursive and steps[i].name is not None
+        ]
+        return p_deep.union(own) if own else p_deep
@@ -1,68 +1,126 @@
-from typing import List
+import sys
+from typing import Iterator, List, TextIO, Tuple
 from rich.text import Text
 from rich.console import Console
 from src.shared.model import Node
-from typing import List
 from src.visualizer.styles import TreeStyle, UNICODE_STYLE, ASCII_STYLE
 
+PIPE_COLOR = "#B6B6B6"
+NAME_COLOR = "#5BB8FF"
+KEY_COLOR = "#FF5555"
+ATTR_COLOR = "#DDB500"
+VALUE_COLOR = "#3ED77B"
+
+NODE, VALUE, MORE = "node", "value", "more"
+
+Row = Tuple[str, str, str, object]
+
 
 class TreeRenderer:
-    def __init__(self, askii=False):
-        style = TreeStyle = ASCII_STYLE if askii else UNICODE_STYLE
+    """Вывод дерева Node в консоль.
+    >>> render(root): строит весь текст и печатает его одним вызовом.
+    >>> stream(root, file): печатает дерево построчно, не держа его в памяти целиком.
+    max_depth и max_children ограничивают вывод; скрытые узлы заменяются строкой "… N more".
+    """
+
+    def __init__(
+        self,
+        askii=False,
+        max_depth: int | None = None,
+        max_children: int | None = None,
+        color: bool = True,
+    ):
+        style: TreeStyle = ASCII_STYLE if askii else UNICODE_STYLE
         self.style = style
+        self.max_depth = max_depth
+        self.max_children = max_children
+        self.color = color
 
-    def render(self, root: "Node") -> None:
-        console = Console()
+    def render(self, root: "Node", file: TextIO | None = None) -> None:
+        console = Console(file=file)
         text = Text()
-        self._render_node(root, text, pipes=[], is_last=True)
+        for row in self._rows(root):
+            self._append_row(text, row)
+            text.append("\n")
         console.print(text)
 
-    def _render_node(
-        self,
-        node: "Node",
-        out: Text,
-        pipes: List[bool],
-        is_last: bool,
-    ) -> None:
-        for has_pipe in pipes[:-1]:
-            out.append(
-                self.style.trunk if has_pipe else self.style.space,
-                style="#B6B6B6",
-            )
-
-        if pipes:
-            out.append(
-                self.style.leaf if is_last else self.style.branch,
-                style="#B6B6B6",
-            )
-
-        out.append(node.name, style="#5BB8FF")
-
-        if node.attrs:
-            for k, v in node.attrs.items():
-                out.append(" ")
-                out.append(f":{k}=", style="#FF5555")
-                out.append(str(v), style="#DDB500")
+    def stream(self, root: "Node", file: TextIO | None = None) -> None:
+        if not self.color:
+            out = file or sys.stdout
+            write = out.write
+            for row in self._rows(root):
+                write(self._plain_row(row))
+                write("\n")
+            return
+
+        console = Console(file=file)
+        for row in self._rows(root):
+            text = Text()
+            self._append_row(text, row)
+            console.print(text)
 
-        out.append("\n")
+    def _rows(self, root: "Node") -> Iterator[Row]:
+        style = self.style
+        max_children = self.max_children
+        yield "", "", NODE, root
 
+        # frame: [node, next child index, prefix of child rows, depth of children]
+        stack: List[list] = []
+        yield from self._open(stack, root, "", 1)
+
+        while stack:
+            frame = stack[-1]
+            node, i, prefix, depth = frame
+            count = len(node.children)
+            shown = count if max_children is None else min(count, max_children)
+
+            if i < shown:
+                frame[1] = i + 1
+                child = node.children[i]
+                last = i == count - 1
+                yield prefix, style.leaf if last else style.branch, NODE, child
+                child_prefix = prefix + (style.space if last else style.trunk)
+                yield from self._open(stack, child, child_prefix, depth + 1)
+                continue
+
+            stack.pop()
+            if shown < count:
+                yield prefix, style.leaf, MORE, f"… {count - shown} more"
+
+    def _open(
+        self, stack: List[list], node: "Node", prefix: str, depth: int
+    ) -> Iterator[Row]:
         if node.is_leaf:
-            for has_pipe in pipes:
-                out.append(
-                    self.style.trunk if has_pipe else self.style.space,
-                    style="#B6B6B6",
-                )
-            out.append(self.style.leaf, style="#B6B6B6")
-            out.append(str(node.scalar), style="#3ED77B")
-            out.append("\n")
+            yield prefix, self.style.leaf, VALUE, node.scalar
+        elif node.children:
+            if self.max_depth is not None and depth > self.max_depth:
+                yield prefix, self.style.leaf, MORE, f"… {len(node.children)} more"
+            else:
+                stack.append([node, 0, prefix, depth])
+
+    def _plain_row(self, row: Row) -> str:
+        prefix, connector, kind, item = row
+        if kind == NODE:
+            attrs = "".join(f" :{k}={v}" for k, v in item.attrs.items())  # type: ignore
+            return f"{prefix}{connector}{item.name}{attrs}"  # type: ignore
+        return f"{prefix}{connector}{item}"
+
+    def _append_row(self, out: Text, row: Row) -> None:
+        if not self.color:
+            out.append(self._plain_row(row))
             return
 
-        count = len(node.children)
-        for i, child in enumerate(node.children):
-            last = i == count - 1
-            self._render_node(
-                child,
-                out,
-                pipes=pipes + [not last],
-                is_last=last,
-            )
+        prefix, connector, kind, item = row
+        if prefix or connector:
+            out.append(prefix + connector, style=PIPE_COLOR)
+
+        if kind == NODE:
+            out.append(item.name, style=NAME_COLOR)  # type: ignore
+            for k, v in item.attrs.items():  # type: ignore
+                out.append(" ")
+                out.append(f":{k}=", style=KEY_COLOR)
+                out.append(str(v), style=ATTR_COLOR)
+        elif kind == VALUE:
+            out.append(str(item), style=VALUE_COLOR)
+        else:
+            out.append(str(item), style=PIPE_COLOR)
@@ -0,0 +1,36 @@
+import pytest
+from src.api.core import loads
+from src.shared.model import Node
+
+
+@pytest.fixture
+def constraints_schema() -> Node:
+    """Схема магазина с ограничениями unique, key и keyref."""
+    return loads(
+        """
+(schema
+  (element
+    (:name "shop")
+    (children
+      (element
+        (:name "users")
+        (max_occurs 1)
+        (children
+          (element
+            (:name "user")
+            (min_occurs 0)
+            (attrs (attr (:name "id") (type "number")))
+            (children (element (:name "email") (type "string") (min_occurs 0) (max_occurs 1))))))
+      (element
+        (:name "orders")
+        (max_occurs 1)
+        (children
+          (element
+            (:name "order")
+            (min_occurs 0)
+            (attrs (attr (:name "user_id") (type "number")))))))
+    (key (:name "user_key") (selector "users/user") (field ":id"))
+    (unique (:name "user_email") (selector "//user") (field "email"))
+    (keyref (:name "order_user") (:refer "user_key") (selector "orders/order") (field ":user_id"))))
+"""
+    )
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from src.api.aio import aiterload, aload, apath, avalidate
+from src.api.core import dumps, loads
+from src.errors.sexp_erros import ParserError
+
+
+records = ['(city (:name "Омск") "Сибирь")', '(note "a ) b")', "(n 1.5)"]
+
+
+def stream(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+async def collect(data: bytes, **kwargs) -> list[str]:
+    return [dumps(node) async for node in aiterload(stream(data), **kwargs)]
+
+
+def test_aiterload_small_chunks():
+    data = " ".join(records).encode("utf-8")
+    assert asyncio.run(collect(data, chunk_size=3)) == records
+    assert asyncio.run(collect(data, offload=True)) == records
+
+
+def test_aload():
+    async def main():
+        node = await aload(stream(records[0].encode("utf-8")), chunk_size=5)
+        assert dumps(node) == records[0]
+        with pytest.raises(ParserError):
+            await aload(stream(b"(a 1) (b 2)"))
+        with pytest.raises(ParserError):
+            await aload(stream(b"(a (b 1)"))
+
+    asyncio.run(main())
+
+
+def test_apath_avalidate():
+    async def main():
+        document = loads('(person (:name "Alice"))')
+        schema = loads(
+            '(schema (element (:name "person") (attrs (attr (:name "name") (type "string")))))'
+        )
+        assert await avalidate(document, schema)
+        assert dumps(await apath(document, "/person")) == dumps(document)
+
+    asyncio.run(main())
+
+
+def test_aiterload_large_record_in_small_chunks():
+    big = "(big " + " ".join(f'(item "s{i} )(")' for i in range(5000)) + ")"
+    data = ("(a 1)" + big + "(b 2)").encode("utf-8")
+    assert asyncio.run(collect(data, chunk_size=64)) == ["(a 1)", big, "(b 2)"]
+
+
+def test_aiterload_yields_records_before_the_stream_ends():
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"(a 1) (b (c")
+        records = aiterload(reader)
+        assert dumps(await records.__anext__()) == "(a 1)"
+        reader.feed_data(b" 2))")
+        reader.feed_eof()
+        assert [dumps(node) async for node in records] == ["(b (c 2))"]
+
+    asyncio.run(main())
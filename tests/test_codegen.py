@@ -0,0 +1,149 @@
+import pytest
+from src.api.core import decode, loads, validate
+from src.errors.sexp_erros import ParserError, ValidationError
+from src.sexp_schema.codegen import Decoder, Record, generate_classes
+from src.sexp_schema.interpreter import Interpreter
+
+schema_text = """
+(schema
+  (element
+    (:name "book")
+    (attrs
+      (attr (:name "lang") (type "string") (required false)))
+    (children
+      (element (:name "title") (type "string") (required true) (max_occurs 1))
+      (element
+        (:name "author")
+        (type "string")
+        (max_occurs 1)
+        (attrs
+          (attr (:name "born") (type "number") (required false))))
+      (element (:name "year") (type "number") (min_occurs 0) (max_occurs 1))
+      (element
+        (:name "tags")
+        (min_occurs 0)
+        (max_occurs 1)
+        (children
+          (element (:name "tag") (type "string") (min_occurs 0)))))))
+"""
+
+book = """
+(book
+  (:lang "ru")
+  (title "Война и мир")
+  (author (:born 1828) "Лев Толстой")
+  (year 1869)
+  (tags (tag "classic") (tag "novel")))
+"""
+
+
+def decoder() -> Decoder:
+    return Decoder(Interpreter(loads(schema_text)).interpret())
+
+
+def test_generated_classes_are_slotted():
+    classes = decoder().classes
+    assert set(classes) == {"Book", "Author", "Tags"}
+    assert classes["Book"].__slots__ == ("lang", "title", "author", "year", "tags")
+    assert classes["Author"].__slots__ == ("born", "value")
+    assert classes["Book"]._types == {"author": classes["Author"], "tags": classes["Tags"]}
+    item = classes["Tags"]()
+    assert item.tag == [] and not hasattr(item, "__dict__")
+    with pytest.raises(TypeError):
+        classes["Tags"](tags=[])
+
+
+def test_decode_builds_typed_objects():
+    schema = loads(schema_text)
+    result = decode(book, schema)
+    assert isinstance(result, Record)
+    assert result.lang == "ru"
+    assert result.title == "Война и мир"
+    assert result.author.born == 1828 and result.author.value == "Лев Толстой"
+    assert result.year == 1869
+    assert result.tags.tag == ["classic", "novel"]
+
+    minimal = decode('(book (title "t") (author "a"))', schema)
+    assert minimal.lang is None and minimal.year is None and minimal.tags is None
+    assert minimal.author.born is None
+
+
+def test_decode_shares_classes_with_generate_classes():
+    first = decode(book, loads(schema_text))
+    second = decode(book, loads(schema_text))
+    assert first == second
+    classes = generate_classes(Interpreter(loads(schema_text)).interpret())
+    assert isinstance(first, classes["Book"]) and isinstance(second.author, classes["Author"])
+    assert decoder().classes["Book"] is not classes["Book"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '(novel (title "t") (author "a"))',
+        '(book (:isbn "x") (title "t") (author "a"))',
+        '(book (:lang 1) (title "t") (author "a"))',
+        '(book (author "a"))',
+        '(book (title "t") (title "u") (author "a"))',
+        '(book (title 1) (author "a"))',
+        '(book (title) (author "a"))',
+        '(book (title "t") (author "a") (pages 10))',
+        '(book (title "t") (author "a") (tags "x"))',
+    ],
+)
+def test_decode_rejects_what_validator_rejects(text):
+    schema = loads(schema_text)
+    with pytest.raises(ValidationError):
+        validate(loads(text), schema)
+    with pytest.raises(ValidationError):
+        decode(text, schema)
+
+
+def test_decode_syntax_errors():
+    with pytest.raises(ParserError):
+        decoder().decode('(book (title "t") (author "a")')
+    with pytest.raises(ParserError):
+        decoder().decode('(book (title "t") (author "a")) (book)')
+
+
+def test_decode_enforces_identity_constraints(constraints_schema):
+    shop = decode(
+        '(shop (users (user (:id 1) (email "a")) (user (:id 2))) (orders (order (:user_id 2))))',
+        constraints_schema,
+    )
+    assert [user.id for user in shop.users.user] == [1, 2]
+    for text in [
+        "(shop (users (user (:id 1)) (user (:id 1))) (orders))",
+        '(shop (users (user (:id 1) (email "a")) (user (:id 2) (email "a"))) (orders))',
+        "(shop (users (user (:id 1))) (orders (order (:user_id 7))))",
+    ]:
+        with pytest.raises(ValidationError):
+            decode(text, constraints_schema)
+
+
+def test_decode_and_validate_report_the_same_occurrence_errors():
+    schema = loads(schema_text)
+    text = '(book (title "t") (title "u") (author "a"))'
+    with pytest.raises(ValidationError, match=r"maximum is 1 \(parent 'book'\)"):
+        validate(loads(text), schema)
+    with pytest.raises(ValidationError, match=r"maximum is 1 \(parent 'book'\)"):
+        decode(text, schema)
+
+
+def test_decode_events_reads_a_stream():
+    import io
+
+    from src.shared.events import iter_events
+
+    books = decoder()
+    result = books.decode_events(iter_events(io.StringIO(book), chunk_size=7))
+    assert result == books.decode(book)
+
+
+def test_decoder_cache_is_keyed_on_schema_structure():
+    from src.sexp_schema.codegen import decoder_for
+
+    first = Interpreter(loads(schema_text)).interpret()
+    assert decoder_for(first) is decoder_for(Interpreter(loads(schema_text)).interpret())
+    changed = Interpreter(loads(schema_text.replace("(max_occurs 1)", "(max_occurs 2)", 1))).interpret()
+    assert decoder_for(changed) is not decoder_for(first)
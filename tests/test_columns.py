@@ -0,0 +1,67 @@
+import pytest
+from src.api.core import loads
+
+np = pytest.importorskip("numpy")
+from src.spath.columns import extract_columns  # noqa: E402
+
+
+doc = loads(
+    "(log"
+    " (reading (:sensor 1) (:ok true) (value 1.5) (ts 10) (unit \"C\"))"
+    " (reading (:sensor 2) (value 2) (ts 11))"
+    " (reading (:sensor 3) (:ok false) (ts 12) (unit \"F\"))"
+    " (other (value 100)))"
+)
+
+
+def test_extract_columns():
+    cols = extract_columns(doc, "/log/reading", fields=["value", "ts", "unit"], attrs=["sensor", "ok"])
+    assert set(cols) == {"value", "ts", "unit", ":sensor", ":ok"}
+
+    assert cols["ts"].dtype == np.int64
+    assert cols["ts"].tolist() == [10, 11, 12]
+
+    assert cols["value"].dtype == np.float64
+    assert cols["value"].mask.tolist() == [False, False, True]
+    assert cols["value"].compressed().tolist() == [1.5, 2.0]
+
+    assert cols["unit"].tolist() == ["C", None, "F"]
+    assert cols[":sensor"].tolist() == [1, 2, 3]
+    assert cols[":ok"].dtype == bool
+    assert cols[":ok"].mask.tolist() == [False, True, False]
+
+
+def test_extract_columns_no_matches():
+    cols = extract_columns(doc, "//missing", fields=["value"])
+    assert len(cols["value"]) == 0
+
+
+@pytest.mark.parametrize("block_size", [4096, 7])
+def test_extract_columns_missing_values_and_mixed_types(monkeypatch, block_size):
+    from src.spath import columns
+
+    monkeypatch.setattr(columns, "BLOCK_SIZE", block_size)
+    rows = [
+        "(row (:n 1) (i 1) (f 1) (m 1) (b true) (s \"x\"))",
+        "(row (:n null) (i null) (f 2.5) (m \"a\") (s null))",
+        "(row (:n 3) (f 3) (m true) (b 1) (s \"long\") (s \"second\"))",
+        "(row (i 9223372036854775808))",
+    ]
+    text = "(t " + " ".join(rows * 40) + ")"
+    cols = extract_columns(loads(text), "/t/row", fields=["i", "f", "m", "b", "s", "z"], attrs=["n"])
+    count = len(rows) * 40
+    assert all(len(col) == count for col in cols.values())
+
+    assert cols["f"].dtype == np.float64
+    assert cols["f"][:4].tolist() == [1.0, 2.5, 3.0, None]
+    assert cols["i"].dtype == object  # не помещается в int64
+    assert cols["i"][:4].tolist() == [1, None, None, 2**63]
+    assert cols["m"].dtype == object
+    assert cols["m"][:4].tolist() == [1, "a", True, None]
+    assert cols["b"].dtype == object  # bool и int не смешиваются
+    assert cols["s"].dtype.kind == "U"
+    assert cols["s"][:4].tolist() == ["x", None, "long", None]
+    assert cols["z"].mask.all() and cols["z"].dtype == np.float64
+    assert cols[":n"].dtype == np.int64
+    assert cols[":n"][:4].tolist() == [1, None, 3, None]
+    assert cols[":n"].data[1] == 0
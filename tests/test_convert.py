@@ -0,0 +1,86 @@
+import json
+import pytest
+from src.api.core import dumps, loads
+from src.shared.convert import from_json, from_python, to_json, to_python
+from src.shared.model import Node, Scalar
+
+
+sexp = '(person (:name "Alice") (:age 30) (score 1.5) (active true) (note null) (tags))'
+
+
+def test_to_python():
+    assert to_python(loads(sexp)) == {
+        "name": "person",
+        "attrs": {"name": "Alice", "age": 30},
+        "children": [
+            {"name": "score", "value": 1.5},
+            {"name": "active", "value": True},
+            {"name": "note", "value": None},
+            {"name": "tags"},
+        ],
+    }
+
+
+def test_roundtrip():
+    node = loads(sexp)
+    assert dumps(from_python(to_python(node))) == sexp
+    assert dumps(from_json(to_json(node))) == sexp
+    assert json.loads(to_json(node)) == to_python(node)
+
+
+def test_deep_tree():
+    root = node = Node("a")
+    for _ in range(5000):
+        child = Node("a")
+        node.add_child(child)
+        node = child
+    assert from_python(to_python(root)) == root
+
+
+def test_deep_tree_json_hits_recursion_limit():
+    root = node = Node("a")
+    for _ in range(5000):
+        child = Node("a")
+        node.add_child(child)
+        node = child
+    with pytest.raises(RecursionError):
+        to_json(root)
+    with pytest.raises(RecursionError):
+        from_json('{"name": "a", "children": [' * 5000 + '{"name": "a"}' + "]}" * 5000)
+
+
+def test_to_json_matches_json_dumps():
+    node = loads(sexp)
+    node.add_child(Node("q", scalar=Scalar('a"b\\n\u00e9')))
+    for ensure_ascii in (False, True):
+        expected = json.dumps(to_python(node), ensure_ascii=ensure_ascii)
+        assert to_json(node, ensure_ascii=ensure_ascii) == expected
+    text = ' { "children" : [ {"name": "x", "value": 1e2}, {"attrs": null, "name": "y"} ] , "name": "r" } '
+    assert dumps(from_json(text)) == "(r (x 100.0) (y))"
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        from_python({"attrs": {}})
+    with pytest.raises(ValueError):
+        from_python({"name": "a", "value": 1, "children": [{"name": "b"}]})
+    with pytest.raises(ValueError):
+        from_python({"name": "a", "value": [1, 2]})
+    with pytest.raises(ValueError):
+        from_python({"name": "a", "extra": 1})
+    for text in [
+        '{"name": "a"',
+        '{"name": "a",}',
+        '{"name": "a"} x',
+        '{"name": "a", "children": [{"name": "b"}}',
+        '{"name": "a", "children": [{"name": "b"},]}',
+        '{"name": "a", "value": [1]}',
+        '{"name": "a", "attrs": {"b": 1,}}',
+        '{"name": "a", "value": 1, "children": [{"name": "b"}]}',
+        '{"name": "a", "extra": 1}',
+        "[]",
+    ]:
+        with pytest.raises(ValueError):
+            from_json(text)
+
+
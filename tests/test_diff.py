@@ -0,0 +1,77 @@
+import random
+from src.api.core import loads, dumps
+from src.shared.diff import Patch, apply, diff
+
+
+old_text = (
+    '(shop (:name "S") (orders'
+    ' (order (:id 1) (total 10) (item "a"))'
+    ' (order (:id 2) (total 20) (item "b"))'
+    ' (order (:id 3) (total 30) (item "c"))'
+    ' (order (:id 4) (total 40) (item "d"))))'
+)
+
+
+def roundtrip(old: str, new: str) -> Patch:
+    patch = diff(loads(old), loads(new))
+    assert dumps(apply(loads(old), patch)) == dumps(loads(new))
+    decoded = Patch.from_sexp(patch.to_sexp())
+    assert dumps(apply(loads(old), decoded)) == dumps(loads(new))
+    return patch
+
+
+def test_no_changes():
+    assert not diff(loads(old_text), loads(old_text))
+    assert Patch.from_sexp(Patch().to_sexp()).ops == []
+
+
+def test_small_edits():
+    patch = roundtrip(old_text, old_text.replace("(total 30)", "(total 31)"))
+    assert len(patch) == 1 and patch.ops[0].kind == "value"
+    assert patch.ops[0].path == (0, 2, 0)
+
+    patch = roundtrip(old_text, old_text.replace('(:name "S")', '(:name "T") (:open true)'))
+    assert [op.kind for op in patch.ops] == ["attrs"]
+
+    new = old_text.replace(' (order (:id 2)', ' (order (:id 9) (total 0)) (order (:id 2)')
+    patch = roundtrip(old_text, new)
+    assert [op.kind for op in patch.ops] == ["insert"]
+
+    patch = roundtrip(old_text, old_text.replace(' (order (:id 3) (total 30) (item "c"))', ""))
+    assert [op.kind for op in patch.ops] == ["delete"]
+
+
+def test_type_and_structure_changes():
+    roundtrip("(a (b 1))", "(a (b 1.0))")
+    roundtrip("(a (b 1))", "(a (b (c 1)))")
+    roundtrip("(a (b 1))", "(x (b 1))")
+    roundtrip("(a (b 1) (c 2))", "(a (c 2) (b 1))")
+    roundtrip("(a (:x 1) (:y 2))", "(a (:y 2) (:x 1))")
+
+
+def test_hash_collisions_are_not_matches():
+    # В CPython hash(-1) == hash(-2).
+    patch = roundtrip("(a (x -1))", "(a (x -2))")
+    assert [op.kind for op in patch.ops] == ["value"]
+    roundtrip("(a (x -1) (y 1) (x -1))", "(a (x -2) (y 1) (x -1))")
+    roundtrip("(a (b 0.0))", "(a (b -0.0))")
+
+
+def test_random_edits():
+    rnd = random.Random(7)
+    base = loads(old_text)
+    for _ in range(50):
+        new = loads(old_text)
+        orders = new.children[0].children
+        for _ in range(rnd.randint(1, 4)):
+            action = rnd.choice(["del", "dup", "swap", "edit"])
+            if action == "del" and orders:
+                orders.pop(rnd.randrange(len(orders)))
+            elif action == "dup" and orders:
+                orders.insert(rnd.randrange(len(orders) + 1), loads(dumps(rnd.choice(orders))))
+            elif action == "swap" and len(orders) > 1:
+                i, j = rnd.sample(range(len(orders)), 2)
+                orders[i], orders[j] = orders[j], orders[i]
+            elif orders:
+                rnd.choice(orders).children[0].scalar.value = rnd.randint(0, 5)
+        roundtrip(dumps(base), dumps(new))
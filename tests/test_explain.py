@@ -0,0 +1,55 @@
+from src.api.core import explain, loads, path
+from src.spath.explain import format_path
+from src.spath.spath_lexer import SPathLexer
+from src.spath.spath_parser import SPathParser
+
+
+sexp = (
+    '(book (:lang "ru") (title "Война и мир") (author (:born 1828) "Лев Толстой")'
+    ' (year 1869) (tags (tag "classic") (tag "novel")))'
+)
+node = loads(sexp)
+
+
+def test_explain_steps():
+    report = explain(node, "book/tags/tag")
+    assert [s.step for s in report.steps] == ["book", "/tags", "/tag"]
+    assert [s.input_size for s in report.steps] == [1, 1, 1]
+    assert [s.output_size for s in report.steps] == [1, 1, 2]
+    assert report.result_size == len(path(node, "book/tags/tag"))
+    assert report.steps[0].candidates == 5
+
+
+def test_explain_filters():
+    report = explain(node, '//tag[:x="y"]')
+    step = report.steps[0]
+    assert step.source == "descendants"
+    assert step.candidates == 7
+    assert step.name_matched == 2
+    assert step.filters_run == 2
+    assert step.filters_passed == 0
+    assert report.result_size == 0
+    assert step.shortcut is None
+
+
+def test_explain_reports_child_name_index():
+    from src.shared.model import INDEX_THRESHOLD
+
+    wide = loads("(root " + " ".join(f"(item {i})" for i in range(INDEX_THRESHOLD)) + ")")
+    step = explain(wide, "/root/item").steps[1]
+    assert step.indexed == 1
+    assert step.candidates == INDEX_THRESHOLD + 1
+    assert step.shortcut == "child name index on 1 of 1 node(s)"
+    assert explain(node, "/book/tags").steps[1].shortcut is None
+
+
+def test_explain_text():
+    text = str(explain(sexp, "/book/author[:born=1828]"))
+    assert text.startswith("EXPLAIN ANALYZE /book/author[:born=1828]")
+    assert "result: 1 node(s)" in text
+
+
+def test_format_path_roundtrip():
+    for p in ["/book/title", "//tag", ".", 'book//author[:born=1828][name!="x"]']:
+        spath = SPathParser(SPathLexer(p).tokenize()).parse()
+        assert format_path(spath) == p
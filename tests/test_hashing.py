@@ -0,0 +1,36 @@
+from src.api.core import loads, dumps
+from src.shared.hashing import share_subtrees
+from src.shared.model import subtree_hashes
+
+
+text = (
+    "(orders"
+    ' (order (:id 1) (address (city "Omsk") (zip 644000)) (qty 1))'
+    ' (order (:id 2) (address (city "Omsk") (zip 644000)) (qty 1.0))'
+    ' (order (:id 1) (address (city "Omsk") (zip 644000)) (qty 1)))'
+)
+
+
+def test_subtree_hashes():
+    root = loads(text)
+    hashes = subtree_hashes(root)
+    first, second, third = root.children
+    assert hashes[id(first)] == hashes[id(third)]
+    assert hashes[id(first.children[0])] == hashes[id(second.children[0])]
+    assert hashes[id(first)] == hash(first.freeze())
+
+
+def test_share_subtrees():
+    root = loads(text, share_subtrees=True)
+    first, second, third = root.children
+    assert first is third
+    assert first.children[0] is second.children[0]
+    assert first.children[1] is not second.children[1]
+    assert dumps(root) == dumps(loads(text))
+
+
+def test_share_subtrees_keeps_types():
+    root = share_subtrees(loads("(r (a 1) (a true) (a 1.0) (a 1))"))
+    assert dumps(root) == "(r (a 1) (a true) (a 1.0) (a 1))"
+    assert root.children[0] is root.children[3]
+    assert root.children[0] is not root.children[1]
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+
+def test_api_import_is_lazy_and_side_effect_free():
+    code = (
+        "import logging, sys\n"
+        "import src.api.core\n"
+        "heavy = [m for m in sys.modules if m.split('.')[0] in ('rich', 'asyncio')"
+        " or m.startswith(('src.spath', 'src.sexp_schema', 'src.visualizer'))]\n"
+        "assert not heavy, heavy\n"
+        "assert not logging.getLogger().handlers\n"
+        "from src.api import apath, to_json, path\n"
+        "assert path('(a (b 1))', '/a/b').scalar.value == 1\n"
+        "assert 'src.spath.engine' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
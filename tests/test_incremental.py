@@ -0,0 +1,73 @@
+import pytest
+import random
+from src.api.core import loads, dumps
+from src.errors.sexp_erros import ParserError
+from src.shared.incremental import Document, update
+
+
+text = '(shop (:name "S") (order (:id 1) (total 10)) (order (:id 2) (total 20)) (note "a (b) c"))'
+
+
+def check(doc: Document) -> None:
+    assert dumps(doc.root) == dumps(loads(doc.text))
+    stack = [((), doc.root)]
+    while stack:
+        path, node = stack.pop()
+        start, end = doc.span(path)
+        assert dumps(loads(doc.text[start:end])) == dumps(node)
+        stack.extend((path + (i,), c) for i, c in enumerate(node.children))
+
+
+def test_spans():
+    check(Document(text))
+
+
+def test_update_reparses_smallest_subtree():
+    doc = Document(text)
+    first, second, note = doc.root.children
+    start = text.index("20")
+    update(doc, start, start + 2, "2000")
+    check(doc)
+    assert doc.root.children[0] is first
+    assert doc.root.children[2] is note
+    assert doc.root.children[1] is second
+    assert doc.root.children[1].children[0].scalar.value == 2000
+
+
+def test_update_widens_region():
+    doc = Document(text)
+    start = text.index("(total 10)")
+    update(doc, start, start + len("(total 10)"), "(total 10) (qty 3)")
+    check(doc)
+    assert [c.name for c in doc.root.children[0].children] == ["total", "qty"]
+
+    update(doc, 0, len(doc.text), "(other 1)")
+    check(doc)
+    assert doc.root.name == "other"
+
+
+def test_invalid_edit_keeps_document():
+    doc = Document(text)
+    with pytest.raises(ParserError, match="Expected token of type RPAREN"):
+        update(doc, text.index("(total 10)"), text.index("(total 10)") + 1, "")
+    assert doc.text == text
+    check(doc)
+
+
+def test_random_edits():
+    rnd = random.Random(3)
+    doc = Document(text)
+    for _ in range(200):
+        pos = rnd.randrange(len(doc.text))
+        if doc.text[pos].isdigit():
+            end = pos
+            while end < len(doc.text) and doc.text[end].isdigit():
+                end += 1
+            update(doc, pos, end, str(rnd.randint(0, 999)))
+        elif doc.text[pos] == ")" and rnd.random() < 0.5:
+            before = doc.text
+            try:
+                update(doc, pos, pos, " (x 1)")
+            except Exception:
+                assert doc.text == before
+        check(doc)
@@ -0,0 +1,59 @@
+import pytest
+from src.api.core import loads_many, iterload, dumps
+from src.errors.sexp_erros import ParserError
+from src.shared.scanner import iter_record_spans
+
+
+records = [
+    '(person (:name "Alice") (:age 30))',
+    '(note "has ) and ( inside")',
+    "(order (item 1) (item 2.5) (flag true) (empty null))",
+]
+text = "\n".join(records) + "\n"
+
+
+def test_record_spans():
+    spans = list(iter_record_spans(text))
+    assert [text[s:e] for s, e in spans] == records
+
+
+def test_record_spans_are_yielded_while_scanning(monkeypatch):
+    from src.shared import scanner
+
+    monkeypatch.setattr(scanner, "_WINDOW", 5)
+    assert [text[s:e] for s, e in iter_record_spans(text)] == records
+    spans = iter_record_spans(text + "(unbalanced")
+    assert text[slice(*next(spans))] == records[0]
+    with pytest.raises(ParserError):
+        list(spans)
+
+
+def test_loads_many():
+    nodes = loads_many(text)
+    assert [dumps(n) for n in nodes] == records
+    assert loads_many("  \n") == []
+
+
+def test_loads_many_workers():
+    big = " ".join(records * 50)
+    nodes = loads_many(big, workers=2)
+    assert [dumps(n) for n in nodes] == records * 50
+    nested = '(r (:k "v") (a (b (c 1) (d)) (e null)) (f)) (x) (y -1.5)'
+    assert loads_many(nested, workers=2) == loads_many(nested)
+
+
+def test_iterload_lazy():
+    it = iterload(text)
+    assert dumps(next(it)) == records[0]
+
+
+def test_invalid_records():
+    with pytest.raises(ParserError):
+        loads_many("(a 1) junk (b 2)")
+    with pytest.raises(ParserError):
+        loads_many("(a 1) (b 2")
+    with pytest.raises(ParserError):
+        loads_many('(a "1)')
+    with pytest.raises(ParserError):
+        loads_many("(a 1))")
+
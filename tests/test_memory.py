@@ -0,0 +1,15 @@
+from benchmarks.generators import wide
+from benchmarks.memory import run_sample
+
+
+def test_memory_footprint_stays_bounded():
+    results = {r.operation: r for r in run_sample(wide(500), top=3, only=None)}
+    assert {"loads", "dumps", "validate"} <= results.keys()
+
+    loads = results["loads"]
+    assert loads.peak_bytes >= loads.retained_bytes > 0
+    assert loads.top and loads.top[0]["where"].startswith("src")
+    # Дерево wide: ~700 B/node на CPython 3.12; запас — против шума версий.
+    assert loads.retained_per_node < 1500
+    # validate ничего не удерживает и не строит копий документа.
+    assert results["validate"].peak_per_node < 100
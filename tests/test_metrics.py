@@ -0,0 +1,57 @@
+from src.api.core import loads, path, validate, collect_metrics
+from src.shared import metrics
+from src.shared.metrics import Metrics
+
+
+text = '(book (:lang "ru") (title "Война и мир") (tags (tag "classic") (tag "novel")))'
+
+
+def test_disabled_by_default():
+    assert metrics.start("loads") is None
+
+
+def test_collect_loads():
+    with collect_metrics() as m:
+        loads(text)
+    assert m.token_count == 23
+    assert m.node_count == 5
+    assert m.max_depth == 3
+    assert m.tokenize_time > 0 and m.parse_time > 0
+    assert metrics.start("loads") is None
+
+
+def test_collect_path_and_validate():
+    document = loads(text)
+    schema = loads(
+        '(schema (element (:name "person") (attrs (attr (:name "name") (type "string")))))'
+    )
+    person = loads('(person (:name "Alice"))')
+    with collect_metrics() as m:
+        path(document, "//tag")
+        validate(person, schema)
+    assert m.nodes_visited == 5
+    assert m.spath_parse_time > 0 and m.spath_eval_time > 0
+    assert m.schema_interpret_time > 0 and m.validate_time > 0
+    assert m.token_count == 0
+
+
+def test_callbacks():
+    records: list[Metrics] = []
+    metrics.add_callback(records.append)
+    try:
+        path(text, "book/title")
+    finally:
+        metrics.remove_callback(records.append)
+    assert [r.operation for r in records] == ["loads", "path"]
+    assert records[1].nodes_visited == 6
+
+
+def test_collect_aggregate_and_attribute_paths():
+    document = loads(text)
+    counts = []
+    for spath in ("//tag", "count(//tag)", "//tag/:k", "/book", "/book/:lang"):
+        with collect_metrics() as m:
+            path(document, spath)
+        counts.append(m.nodes_visited)
+    assert counts[0] == counts[1] == counts[2] == 5
+    assert counts[3] == counts[4] > 0
@@ -52,3 +52,120 @@ def test_invalid_node_name():
 #         Node("test", None, None, [1, 2, 3])
 #     with pytest.raises(ValueError):
 #         Node("test", {"key": "value"})
+
+
+def test_node_equality_and_hash():
+    a = Node("person", {"name": Scalar("Bob")}, [Node("age", scalar=Scalar(22))])
+    b = Node("person", {"name": Scalar("Bob")}, [Node("age", scalar=Scalar(22))])
+    c = Node("person", {"name": Scalar("Bob")}, [Node("age", scalar=Scalar(23))])
+    assert a == b and a != c
+    assert Node("x", scalar=Scalar(None)) != Node("x")
+    a.freeze(), b.freeze(), c.freeze()
+    assert hash(a) == hash(b)
+    assert len({a, b, c}) == 2
+    assert hash(a.attrs["name"]) == hash(b.attrs["name"])
+
+
+def test_mutable_nodes_and_scalars_are_unhashable():
+    from src.api.core import loads
+    from src.shared.model import subtree_hashes
+
+    a = loads("(r (x (y 1)))")
+    with pytest.raises(TypeError):
+        hash(a)
+    with pytest.raises(TypeError):
+        hash(Scalar(1))
+    a.children[0].children[0].scalar.value = 2
+    b = loads("(r (x (y 2)))")
+    assert subtree_hashes(a)[id(a)] == subtree_hashes(b)[id(b)]
+    assert hash(a.freeze()) == hash(b.freeze())
+
+    c = Node("person", children=[Node("age", scalar=Scalar(22)), Node("city")])
+    c.children.remove(Node("age", scalar=Scalar(22)))  # структурно: удаляется равный ребёнок
+    assert [child.name for child in c.children] == ["city"]
+
+
+def test_children_list_is_aliased():
+    from src.shared.model import ChildList
+
+    lst = [Node("y")]
+    n = Node("r", children=lst)
+    lst.append(Node("z"))
+    assert n.children is lst
+    assert [child.name for child in n.children] == ["y", "z"]
+
+    own = ChildList([Node("y")])
+    assert Node("r", children=own).children is own
+    assert type(Node("r").children) is ChildList
+
+
+def test_child_name_index_invalidation():
+    from src.shared.model import INDEX_THRESHOLD, ChildList
+
+    root = Node("root", children=ChildList(Node(f"n{i % 3}") for i in range(INDEX_THRESHOLD)))
+    assert len(root.get_childs_by_name("n0")) == len(range(0, INDEX_THRESHOLD, 3))
+    assert root._name_index is not None
+
+    extra = Node("n0")
+    root.add_child(extra)
+    assert root.get_childs_by_name("n0")[-1] is extra
+    del root.children[-1]
+    assert all(n is not extra for n in root.get_childs_by_name("n0"))
+
+    root.children[0].name = "renamed"
+    assert root.get_childs_by_name("renamed") == [root.children[0]]
+
+    root.children = [Node("n0")]
+    assert len(root.get_childs_by_name("n0")) == 1
+
+    small = Node("small", children=[Node("a"), Node("b")])
+    assert small.get_childs_by_name("a")[0].name == "a"
+    assert small._name_index is None
+
+
+def test_child_list_is_adopted_and_slotted():
+    from src.api.core import loads
+    from src.shared.model import ChildList
+
+    root = loads("(root " + " ".join(f"(n{i % 3} {i})" for i in range(40)) + ")")
+    assert type(root.children) is ChildList and not hasattr(root.children, "__dict__")
+    children = ChildList([Node("a")])
+    assert Node("x", children=children).children is children
+    assert "_name_index" not in Node("x").__dict__
+
+    epoch = Node._rename_epoch
+    other = Node("other")
+    other.name = "renamed"
+    assert Node._rename_epoch == epoch
+    assert len(root.children_named("n0")) == 14
+    root.children[0].name = "n1"
+    assert Node._rename_epoch == epoch + 1
+    assert len(root.children_named("n1")) == 14
+
+
+def test_freeze_rejects_mutation():
+    from concurrent.futures import ThreadPoolExecutor
+    from src.api.core import loads, path
+    from src.shared.model import INDEX_THRESHOLD
+
+    items = " ".join(f"(item (:id {i}) (v {i % 4}))" for i in range(INDEX_THRESHOLD))
+    doc = loads(f"(r {items})", lazy=True).freeze()
+    item = doc.children[0]
+    assert doc.frozen and item.frozen and not Node("x").frozen
+
+    with pytest.raises(AttributeError):
+        doc.name = "other"
+    with pytest.raises(TypeError):
+        doc.add_child(Node("x"))
+    with pytest.raises(TypeError):
+        del doc.children[0]
+    with pytest.raises(TypeError):
+        item.attrs["id"] = Scalar(1)  # type: ignore
+    with pytest.raises(AttributeError):
+        item.children[0].scalar.value = 5
+
+    with ThreadPoolExecutor(4) as pool:
+        counts = set(pool.map(lambda i: path(doc, f"count(/r/item[v={i % 4}])"), range(40)))
+    assert counts == {INDEX_THRESHOLD // 4}
+    assert doc._name_index is not None
+    assert hash(doc) == hash(loads(f"(r {items})").freeze())
@@ -0,0 +1,45 @@
+import pickle
+import pytest
+from src.api.core import loads
+from src.shared.persistent import PersistentNode, from_node, set_in, to_node
+
+text = (
+    '(config (server (:env "prod") (host "a.example") (port 80))'
+    ' (db (host "db.example") (port 5432)) (flags (debug false)))'
+)
+
+
+def test_roundtrip_and_hash():
+    base = from_node(loads(text))
+    assert to_node(base) == loads(text)
+    assert base.to_sexp() == text
+    assert base == from_node(loads(text)) and hash(base) == hash(from_node(loads(text)))
+    assert pickle.loads(pickle.dumps(base)) == base
+
+
+def test_set_in_shares_unchanged_subtrees():
+    base = from_node(loads(text))
+    v2 = set_in(base, ("server", "port"), 8080)
+    v3 = v2.set_in(("server", ":env"), "dev")
+
+    assert base.children[0].children[1].scalar.value == 80
+    assert v2.children[0].children[1].scalar.value == 8080
+    assert v3.children[0].attrs["env"].value == "dev"
+    assert v2.children[1] is base.children[1] and v3.children[2] is base.children[2]
+    assert v2.children[0].children[0] is base.children[0].children[0]
+    assert set_in(base, (1,), PersistentNode("db")).children[1].children == ()
+    assert v2 != base and set_in(v2, ("server", "port"), 80) == base
+
+
+def test_immutable_and_errors():
+    base = from_node(loads(text))
+    with pytest.raises(AttributeError):
+        base.name = "other"
+    with pytest.raises(AttributeError):
+        base.children[0].attrs["env"].value = "dev"
+    with pytest.raises(TypeError):
+        base.children[0].attrs["env"] = "dev"  # type: ignore
+    with pytest.raises(KeyError):
+        set_in(base, ("missing", "port"), 1)
+    with pytest.raises(ValueError):
+        set_in(base, ("server",), 1)
@@ -0,0 +1,59 @@
+import pytest
+from src.api.core import loads, path
+
+text = (
+    '(root (meta (version "1.0") (note "skip ( me )"))'
+    ' (orders (order (:id 1) (total 10) (items (item "a")))'
+    ' (order (:id 2) (total 5) (items (item "b") (item "c"))))'
+    " (users (user (:id 1) (name \"u1\")) (user (:id 2) (name \"u2\"))))"
+)
+
+
+def test_projection_keeps_only_selected_subtrees():
+    doc = loads(text, project="/root/orders/order[:id=2]")
+    assert str(doc) == (
+        '(root (orders (order (:id 2) (total 5) (items (item "b") (item "c")))))'
+    )
+    assert str(loads(text, project="//name")) == (
+        '(root (users (user (:id 1) (name "u1")) (user (:id 2) (name "u2"))))'
+    )
+    assert str(loads(text, project="/root/missing")) == "(root)"
+
+
+def test_projection_matches_full_parse():
+    full = loads(text)
+    for query in [
+        "/root/orders/order",
+        "//order[total=10]",
+        "//item",
+        "//users//name",
+        "/root/meta/:version",
+        "root",
+        "//.",
+    ]:
+        assert path(loads(text, project=query), query) == path(full, query)
+    lazy = loads(text, project="//total", lazy=True)
+    assert sorted(n.scalar.value for n in path(lazy, "//total")) == [5, 10]
+
+
+def test_projection_errors():
+    with pytest.raises(Exception):
+        loads("(root (a 1) (b", project="/root/a")
+    with pytest.raises(Exception):
+        loads('(root (a 1) (b "x))', project="/root/a")
+    with pytest.raises(Exception):
+        loads("(root (a 1)) trailing", project="/root/a")
+    with pytest.raises(ValueError):
+        loads(text, project="//item/..")
+
+
+def test_projection_value_after_skipped_children():
+    from src.errors.sexp_erros import ParserError
+
+    for project in ("/a/z", "//z"):
+        with pytest.raises(ParserError):
+            loads("(a (b 1) 2)", project=project)
+    with pytest.raises(ParserError):
+        loads("(a (b (:x) 1))", project="//z")
+    # Пропущенные поддеревья синтаксически не проверяются.
+    assert path(loads("(a (b 1 2) (z 1))", project="/a/z"), "/a/z").scalar.value == 1
@@ -71,3 +71,26 @@ def test_scalar_comparison():
         s1 < s3  # type: ignore
     with pytest.raises(TypeError):
         s1 > s3  # type: ignore
+
+
+def test_lazy_scalar():
+    from src.api.core import loads, dumps
+    from src.shared.model import LazyScalar
+
+    text = '(r (:id 7) (a 1) (b 2.5) (c "x") (d true) (e null) (f -3))'
+    lazy = loads(text, lazy=True)
+    assert isinstance(lazy.attrs["id"], LazyScalar)
+    assert lazy.children[0].scalar._raw == "1"
+    assert [c.scalar.value for c in lazy.children] == [1, 2.5, "x", True, None, -3]
+    assert lazy.attrs["id"]._value == 7
+    assert lazy == loads(text) and dumps(lazy) == text
+    lazy.children[0].scalar.value = 5
+    assert lazy.children[0].scalar.value == 5
+    assert not hasattr(lazy.children[0].scalar, "__dict__")
+    assert not hasattr(lazy.children[1].scalar, "_raw")
+
+    unread = loads(text, lazy=True)
+    unread.children[0].scalar.value = 9
+    assert not hasattr(unread.children[0].scalar, "_raw")
+    frozen = loads(text, lazy=True).freeze()
+    assert frozen == loads(text) and hash(frozen) == hash(loads(text).freeze())
@@ -1,5 +1,6 @@
 import pytest
 from sexp_repr import path, loads, dumps
+from src.api.core import explain
 
 sexp = dumps(
     loads(
@@ -43,3 +44,109 @@ def test_attribute():
     # assert p1.attrs["lang"].value == "ru"
     # p2 = path(sexp, "book/author[:born=1828]")
     # assert p2.attrs["born"].value == 1828
+
+
+orders = loads(
+    "(shop"
+    ' (user (:id 1) (:country "ru"))'
+    ' (user (:id 2) (:country "de"))'
+    ' (user (:id 3) (:country "ru"))'
+    " (orders"
+    ' (order (:user_id 1) (total 10) (status "open"))'
+    ' (order (:user_id 2) (total 2.5) (status "closed"))'
+    ' (order (:user_id 1) (total 7) (status "open"))))'
+)
+
+
+def test_aggregates():
+    assert path(orders, "count(//order)") == 3
+    assert path(orders, "sum(//order/total)") == 19.5
+    assert path(orders, "avg(//order/total)") == 6.5
+    assert path(orders, "min(//order/total)") == 2.5
+    assert path(orders, "max(//order/total)") == 10
+    assert path(orders, "count(//missing)") == 0
+    assert path(orders, "max(//missing)") is None
+    assert sorted(path(orders, "distinct(//user/:country)")) == ["de", "ru"]
+    assert path(orders, "count(//order/:user_id)") == 3
+    assert path(orders, 'count(//order[status="open"])') == 2
+    assert path(orders, 'min(//order/status)') == "closed"
+
+
+def test_attribute_step():
+    ids = path(orders, "/shop/user/:id")
+    assert [s.value for s in ids] == [1, 2, 3]
+
+
+def test_iterate_matches_evaluate():
+    from src.spath.engine import SPathEngine
+    from src.spath.spath_lexer import SPathLexer
+    from src.spath.spath_parser import SPathParser
+
+    engine = SPathEngine()
+    for p in ["//order", "shop/orders/order/total", "//orders//total", "."]:
+        spath = SPathParser(SPathLexer(p).tokenize()).parse()
+        assert list(engine.iterate(orders, spath)) == engine.evaluate(orders, spath)
+
+
+def test_aggregate_errors():
+    with pytest.raises(Exception, match="Unknown function"):
+        path(orders, "median(//order/total)")
+    with pytest.raises(Exception, match="RPAREN"):
+        path(orders, "count(//order")
+    with pytest.raises(Exception, match="Unexpected character"):
+        path(orders, "//order/@id")
+
+
+def test_parent_and_ancestor_axes():
+    assert path(orders, "//total/..") == path(orders, "//order")
+    assert path(orders, "count(//total/..)") == 3
+    assert path(orders, '//status/parent::order[status="closed"]/:user_id').value == 2
+    assert path(orders, "count(//total/ancestor::orders)") == 1
+    assert path(orders, "//total/ancestor::shop") is orders
+    assert path(orders, "count(//order/ancestor::order)") == 0
+
+
+def test_axis_format_and_errors():
+    from src.spath.explain import format_path
+    from src.spath.spath_lexer import SPathLexer
+    from src.spath.spath_parser import SPathParser
+
+    for p in ["//total/..", "//total/ancestor::order[:user_id=1]", "/a/b/parent::a"]:
+        spath = SPathParser(SPathLexer(p).tokenize()).parse()
+        assert format_path(spath) == p
+    with pytest.raises(Exception, match="cannot be followed"):
+        path(orders, "//..")
+
+
+def test_child_steps_on_indexed_node():
+    wide = loads(
+        "(r " + " ".join(f"(item (id {i}) (v {i % 2}))" for i in range(100)) + " (other))"
+    )
+    assert path(wide, "/r/item[id=42]/v").scalar.value == 0
+    assert path(wide, "count(/r/item[v=1])") == 50
+    assert path(wide, "/r/other").name == "other"
+    report = explain(wide, "/r/other")
+    assert report.steps[1].candidates == 2
+
+
+def test_path_many_matches_path():
+    from src.api.core import path_many
+
+    queries = [
+        "//order",
+        "//order/total",
+        "/shop/orders/order/total",
+        'count(//order[status="open"])',
+        "//order[:user_id=1]/total",
+        "//order[:user_id=2]",
+        "//order[:user_id=1][status=\"closed\"]",
+        "sum(//order/total)",
+        "distinct(//user/:country)",
+        "/shop/user/:id",
+        "//user[:country=\"ru\"]",
+        "//total/..",
+        "//missing",
+        ".",
+    ]
+    assert path_many(orders, queries) == [path(orders, q) for q in queries]
+    assert path_many(orders, []) == []
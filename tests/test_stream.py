@@ -0,0 +1,57 @@
+import io
+import pytest
+from src.api.core import dumps, iterpath, loads, path
+from src.shared.events import END, START, VALUE, build, iter_events
+
+log = (
+    '(log (event (:level "error") (msg "disk full") (code 12))'
+    ' (event (:level "info") (msg "ok") (code 0))'
+    ' (group (event (:level "error") (msg "nested") (code 7))))'
+)
+
+
+def test_events_roundtrip_any_chunk_size():
+    for size in (1, 2, 5, 1 << 16):
+        assert [dumps(n) for n in build(iter_events(log + " (b 1)", size))] == [
+            dumps(loads(log)),
+            "(b 1)",
+        ]
+    events = list(iter_events('(a (:x 1) (b "s"))'))
+    assert [e[0] for e in events] == [START, START, VALUE, END, END]
+    assert events[0][2]["x"].value == 1
+
+
+def test_events_errors():
+    for bad in ["(a", '(a "x', "(a 1 2)", "(a 1 (b))", ")", "(a (b) (:x 1))"]:
+        with pytest.raises(Exception):
+            list(iter_events(bad))
+
+
+def test_iterpath_matches_path():
+    for query in [
+        '//event[:level="error"]',
+        "//group//event",
+        "/log/event[code=0]",
+        "//event/msg",
+        "//event/:level",
+    ]:
+        expected = path(log, query)
+        expected = expected if isinstance(expected, list) else [expected]
+        got = list(iterpath(log, query, chunk_size=3))
+        assert sorted(map(str, got)) == sorted(map(str, expected))
+
+
+def test_iterpath_sources_and_order():
+    data = io.BytesIO(log.encode())
+    msgs = [e.children[0].scalar.value for e in iterpath(data, '//event[:level="error"]')]
+    assert msgs == ["disk full", "nested"]
+    assert [n.name for n in iterpath("(a (a (b)))", "//a")] == ["a", "a"]
+
+
+def test_iterpath_unsupported():
+    with pytest.raises(ValueError):
+        list(iterpath(log, "//event[code=0]/msg[:x=1]/.."))
+    with pytest.raises(ValueError):
+        list(iterpath(log, "//event[code=0]/msg"))
+    with pytest.raises(ValueError):
+        list(iterpath(log, "count(//event)"))
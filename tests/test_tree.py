@@ -0,0 +1,61 @@
+import io
+from src.api.core import loads, tree
+from src.shared.model import Node
+from src.visualizer.cli import TreeRenderer
+
+
+sexp = '(book (:lang "ru") (title "War") (tags (tag "classic") (tag "novel") (tag "epic")))'
+
+
+def render(**kwargs) -> list[str]:
+    out = io.StringIO()
+    tree(sexp, stream=True, file=out, color=False, **kwargs)
+    return out.getvalue().splitlines()
+
+
+def test_stream_plain():
+    assert render() == [
+        "book :lang=ru",
+        "├── title",
+        "│   └── War",
+        "└── tags",
+        "    ├── tag",
+        "    │   └── classic",
+        "    ├── tag",
+        "    │   └── novel",
+        "    └── tag",
+        "        └── epic",
+    ]
+
+
+def test_max_children_and_depth():
+    assert render(max_children=1) == [
+        "book :lang=ru",
+        "├── title",
+        "│   └── War",
+        "└── … 1 more",
+    ]
+    assert render(max_depth=1) == [
+        "book :lang=ru",
+        "├── title",
+        "│   └── War",
+        "└── tags",
+        "    └── … 3 more",
+    ]
+
+
+def test_render_matches_stream():
+    out = io.StringIO()
+    TreeRenderer(askii=True, color=False).render(loads(sexp), file=out)
+    assert out.getvalue().splitlines()[:3] == ["book :lang=ru", "|-- title", "|   `-- War"]
+
+
+def test_stream_deep_tree():
+    root = node = Node("a")
+    for _ in range(5000):
+        child = Node("a")
+        node.add_child(child)
+        node = child
+    out = io.StringIO()
+    TreeRenderer(color=False).stream(root, out)
+    assert len(out.getvalue().splitlines()) == 5001
@@ -1,6 +1,8 @@
 import pytest
 from src.api.core import loads, validate, dumps
-from src.errors.sexp_erros import ValidationError
+from src.errors.sexp_erros import InterpreterError, ValidationError
+from src.sexp_schema.interpreter import Interpreter
+from src.sexp_schema.validator import Validator
 from src.shared.model import Node, Scalar
 
 test_schema_sexp = """
@@ -76,3 +78,142 @@ def test_validate_3():
     assert validate(document, schema)
     document.attrs = {}
     assert validate(document, schema)
+
+
+def test_validate_constraints(constraints_schema):
+    document = loads(
+        '(shop (users (user (:id 1) (email "a")) (user (:id 2)) (user (:id 3) (email "b")))'
+        " (orders (order (:user_id 2)) (order (:user_id 1)) (order)))"
+    )
+    assert validate(document, constraints_schema)
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("(shop (users (user (:id 1)) (user (:id 1))) (orders))", "Duplicate value 1"),
+        ("(shop (users (user (:id 1)) (user)) (orders))", "requires field ':id'"),
+        (
+            '(shop (users (user (:id 1) (email "a")) (user (:id 2) (email "a"))) (orders))',
+            "Duplicate value 'a' for unique 'user_email'",
+        ),
+        (
+            "(shop (users (user (:id 1))) (orders (order (:user_id 1)) (order (:user_id 7))))",
+            "value 7 does not match any 'user_key'",
+        ),
+    ],
+)
+def test_validate_constraint_violations(text, message, constraints_schema):
+    with pytest.raises(ValidationError, match=message):
+        validate(loads(text), constraints_schema)
+
+
+def test_constraint_scope_is_declaring_element():
+    schema = loads(
+        '(schema (element (:name "groups") (children (element (:name "group")'
+        ' (children (element (:name "item") (min_occurs 0) (attrs (attr (:name "id") (type "number")))))'
+        ' (unique (:name "item_id") (selector "item") (field ":id"))))))'
+    )
+    assert validate(
+        loads("(groups (group (item (:id 1)) (item (:id 2))) (group (item (:id 1))))"), schema
+    )
+    with pytest.raises(ValidationError):
+        validate(loads("(groups (group (item (:id 1)) (item (:id 1))))"), schema)
+
+
+@pytest.mark.parametrize(
+    "declaration",
+    [
+        '(unique (selector "a") (field ":id"))',
+        '(unique (:name "u") (field ":id"))',
+        '(unique (:name "u") (selector "a//b") (field ":id"))',
+        '(keyref (:name "r") (selector "a") (field ":id"))',
+        '(keyref (:name "r") (:refer "missing") (selector "a") (field ":id"))',
+        '(unique (:name "u") (selector "a") (field ":id")) (key (:name "u") (selector "a") (field ":id"))',
+    ],
+)
+def test_invalid_constraint_declarations(declaration):
+    schema = loads(f'(schema (element (:name "root") {declaration}))')
+    with pytest.raises(InterpreterError):
+        validate(loads("(root)"), schema)
+
+
+repeated_schema = """
+(schema
+  (element
+    (:name "orders")
+    (children
+      (element
+        (:name "item")
+        (min_occurs 0)
+        (attrs (attr (:name "qty") (type "number")))
+        (children
+          (element (:name "price") (type "number") (max_occurs 1))
+          (element (:name "flag") (type "boolean") (min_occurs 0)))))
+    (unique (:name "item_qty") (selector "item") (field ":qty"))))
+"""
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "(orders (item (:qty 1) (price 10)) (item (:qty 2) (price 10)) (item (:qty 3) (price 10)))",
+        "(orders (item (:qty 1) (price 10)) (item (:qty 1) (price 10)))",
+        "(orders (item (:qty 1) (price 10) (flag true)) (item (:qty 2) (price 10) (flag 1)))",
+        "(orders (item (:qty 1) (price 10)) (item (:qty 2) (price 10) (price 10)))",
+    ],
+)
+def test_memoized_validation_gives_same_answers(text):
+    schema = loads(repeated_schema)
+    for share in (False, True):
+        document = loads(text, share_subtrees=share)
+        answers = []
+        for memo_size in (0, 1, 1024):
+            try:
+                answers.append(validate(document, schema, memo_size=memo_size))
+            except ValidationError as error:
+                answers.append(str(error))
+        assert answers[0] == answers[1] == answers[2]
+
+
+def test_memo_is_bounded_and_skips_repeated_subtrees():
+    schema = Interpreter(
+        loads(
+            '(schema (element (:name "root") (children (element (:name "group") (min_occurs 0)'
+            ' (children (element (:name "item") (min_occurs 0) (type "number")))))))'
+        )
+    ).interpret()
+    text = "(root " + " ".join(f"(group (item {i % 3}) (item 7))" for i in range(30)) + ")"
+    validator = Validator(loads(text), schema, memo_size=2)
+    checked = []
+    original = validator._check_children
+
+    def counting(document, *args):
+        checked.append(document.name)
+        original(document, *args)
+
+    validator._check_children = counting
+    assert validator.validate()
+    # Три класса group по кругу не помещаются в LRU из двух записей.
+    assert len(validator._memo) == 0
+    assert checked.count("group") == 30
+    validator.memo_size = 8
+    checked.clear()
+    assert validator.validate()
+    assert checked.count("group") == 3  # по одной проверке на класс
+
+
+def test_memo_classes_are_computed_per_subtree():
+    schema = Interpreter(
+        loads(
+            '(schema (element (:name "root") (children (element (:name "group") (min_occurs 0)'
+            ' (children (element (:name "item") (min_occurs 0) (type "number")))))))'
+        )
+    ).interpret()
+    document = loads("(root (group (item 1) (item 2)) (group (item 1) (item 2)) (group (item 3)))")
+    validator = Validator(document, schema, memo_size=8)
+    first, second, third = document.children
+    assert validator._class_of(first) == validator._class_of(second)
+    assert len(validator._classes) == 6  # две группы и их листья, без корня и третьей
+    assert validator._class_of(third) != validator._class_of(first)
+    assert validator.validate() and validator._classes == {}